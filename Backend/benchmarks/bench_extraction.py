@@ -0,0 +1,142 @@
+"""
+Extraction Benchmark
+Throughput (pages/second) and accuracy of utils.article_extraction over the
+saved pages in benchmarks/corpus, against the BeautifulSoup html.parser
+extraction the URL narrative analyzer used before. Accuracy is scored per
+page from corpus/expected.json: title, author, site name and publish date
+must match, the body must contain the expected sentences, leave out the
+listed boilerplate and reach a minimum length. Runs offline
+
+Run from Backend/:  python -m benchmarks.bench_extraction
+"""
+
+import re
+import json
+import time
+import asyncio
+from pathlib import Path
+
+from utils import article_extraction
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+CORPUS = Path(__file__).parent / "corpus"
+ROUNDS = 50
+CHECKS = ("title", "author", "site_name", "published_date", "body_contains", "body_excludes", "min_words")
+
+
+def load_corpus():
+    expected = json.loads((CORPUS / "expected.json").read_text(encoding="utf-8"))
+    return [(name, (CORPUS / name).read_bytes(), spec) for name, spec in expected.items()]
+
+
+def _baseline(html: bytes, url: str):
+    # The previous extractor: html.parser, title/meta lookups, then <article>, class-regex divs, all <p>
+    soup = BeautifulSoup(html, "html.parser")
+    title = ""
+    if soup.find("h1"):
+        title = soup.find("h1").get_text(strip=True)
+    elif soup.find("meta", attrs={"property": "og:title"}):
+        title = soup.find("meta", attrs={"property": "og:title"}).get("content", "")
+    elif soup.find("title"):
+        title = soup.find("title").get_text(strip=True)
+    site = soup.find("meta", attrs={"property": "og:site_name"})
+    author = soup.find("meta", attrs={"name": "author"}) or soup.find("meta", attrs={"property": "article:author"})
+    date = (soup.find("meta", attrs={"property": "article:published_time"})
+            or soup.find("meta", attrs={"name": "publishdate"}) or soup.find("time"))
+
+    body = []
+    article = soup.find("article")
+    if article:
+        body = [p.get_text(strip=True) for p in article.find_all("p") if len(p.get_text(strip=True)) > 40]
+    if len(body) < 3:
+        for area in soup.find_all(["div"], class_=re.compile(r"(story|article|content|body|post|entry)", re.I))[:5]:
+            for p in area.find_all("p"):
+                text = p.get_text(strip=True)
+                if len(text) > 40 and text not in body:
+                    body.append(text)
+    if len(body) < 3:
+        for p in soup.find_all("p"):
+            text = p.get_text(strip=True)
+            if len(text) > 40 and text not in body and not any(
+                    skip in text.lower() for skip in ["cookie", "subscribe", "newsletter", "follow us", "share this"]):
+                body.append(text)
+    content = " ".join(body[:20])
+    return {
+        "title": title,
+        "author": author.get("content", "") if author else "",
+        "site_name": site.get("content", "") if site else "",
+        "published_date": (date.get("content", "") or date.get("datetime", "")) if date else "",
+        "content": content,
+        "word_count": len(content.split()),
+    }
+
+
+def score(result, spec):
+    """Which checks pass for one page."""
+    normalized = " ".join(result["content"].split())
+    return {
+        "title": result["title"] == spec["title"],
+        "author": result["author"] == spec["author"],
+        "site_name": result["site_name"] == spec["site_name"],
+        "published_date": (result["published_date"] or "").startswith(spec["published_date"])
+                          and bool(result["published_date"]) == bool(spec["published_date"]),
+        "body_contains": all(phrase in normalized for phrase in spec["body_contains"]),
+        "body_excludes": not any(phrase in normalized for phrase in spec["body_excludes"]),
+        "min_words": result["word_count"] >= spec["min_words"],
+    }
+
+
+def _throughput(fn, corpus):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for _, html, spec in corpus:
+            fn(html, spec["url"])
+    return ROUNDS * len(corpus) / (time.perf_counter() - started)
+
+
+async def _pool_throughput(corpus):
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        article_extraction.extract_async(html, spec["url"])
+        for _ in range(ROUNDS) for _, html, spec in corpus
+    ))
+    return ROUNDS * len(corpus) / (time.perf_counter() - started)
+
+
+def _report(label, fn, corpus):
+    passed = {check: 0 for check in CHECKS}
+    failures = []
+    for name, html, spec in corpus:
+        result = score(fn(html, spec["url"]), spec)
+        for check, ok in result.items():
+            passed[check] += ok
+        missed = [check for check, ok in result.items() if not ok]
+        if missed:
+            failures.append(f"{name}: {', '.join(missed)}")
+    total = sum(passed.values())
+    pages_ok = len(corpus) - len(failures)
+    print(f"{label:<22}{_throughput(fn, corpus):>10.0f} pages/s   "
+          f"accuracy {total}/{len(CHECKS) * len(corpus)} checks ({total / (len(CHECKS) * len(corpus)):.0%}), "
+          f"{pages_ok}/{len(corpus)} pages fully correct")
+    for check in CHECKS:
+        print(f"{'':<22}  {check:<16}{passed[check]}/{len(corpus)}")
+    for failure in failures:
+        print(f"{'':<22}  miss  {failure}")
+
+
+def run():
+    corpus = load_corpus()
+    print(f"corpus={len(corpus)} pages  rounds={ROUNDS}  workers={article_extraction.EXTRACTION_WORKERS}")
+    if BS4_AVAILABLE:
+        _report("bs4 html.parser (old)", _baseline, corpus)
+    _report("lxml engine", article_extraction.extract, corpus)
+    print(f"{'lxml engine, pool':<22}{asyncio.run(_pool_throughput(corpus)):>10.0f} pages/s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,122 @@
+"""
+Serialization Benchmark
+Encode time and payload size for the /news and /journalist/{name} response
+shapes: the previous path (stringify _id, jsonable_encoder, json.dumps as
+JSONResponse renders it) against utils.serialization.dumps, plus gzip/Brotli
+sizes from utils.compression. Uses synthetic documents shaped like stored ones,
+so it runs without a database
+
+Run from Backend/:  python -m benchmarks.bench_serialization
+"""
+
+import json
+import copy
+import time
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from utils import compression, serialization
+
+ROUNDS = 200
+random.seed(7)
+
+WORDS = ("government policy market election court climate health startup budget reform inflation "
+         "minister parliament cricket technology science education monsoon railway investment").split()
+
+
+def _sentence(n: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def news_payload(count: int = 100):
+    now = datetime.utcnow()
+    articles = [{
+        "_id": ObjectId(),
+        "title": _sentence(12),
+        "description": _sentence(45),
+        "url": f"https://news.example.com/{i}/{random.getrandbits(40):x}",
+        "image": f"https://img.example.com/{i}.jpg",
+        "source": random.choice(["thehindu", "ndtv", "reuters", "indianexpress"]),
+        "publishedAt": (now - timedelta(minutes=i * 7)).strftime("%Y-%m-%d %H:%M:%S"),
+        "category": "general",
+        "fetchedAt": now - timedelta(minutes=i),
+        "story_cluster_id": f"{random.getrandbits(64):016x}",
+    } for i in range(count)]
+    return {"status": "success", "category": "general", "source": "database", "count": count, "articles": articles}
+
+
+def journalist_payload():
+    profile = {
+        "biography": " ".join(_sentence(30) for _ in range(8)),
+        "mainTopics": random.sample(WORDS, 6),
+        "ideologicalBias": "Centrist",
+        "haloScore": {"score": 78, "level": "High", "description": _sentence(25)},
+        "notableWorks": [{"title": _sentence(8), "year": 2015 + i, "summary": _sentence(40)} for i in range(12)],
+        "controversies": [{"title": _sentence(6), "details": _sentence(50), "date": datetime(2020, 1, 1) + timedelta(days=i * 40)} for i in range(6)],
+        "digitalPresence": {"profileImage": "https://img.example.com/p.jpg", "twitter": "@example", "followers": 120000},
+        "writingTone": "Analytical",
+        "ethicalAssessment": " ".join(_sentence(30) for _ in range(4)),
+    }
+    articles = [{
+        "title": _sentence(12), "url": f"https://news.example.com/a/{i}", "snippet": _sentence(40),
+        "date": datetime(2024, 1, 1) + timedelta(days=i), "source": "example",
+    } for i in range(150)]
+    return {"status": "success", "journalist": {
+        "_id": ObjectId(),
+        "name": "Example Journalist",
+        "analysis_timestamp": datetime.utcnow(),
+        "articlesAnalyzed": len(articles),
+        "aiProfile": profile,
+        "scrapedData": {"articles_count": len(articles), "raw_data": {"articles": articles}},
+    }}
+
+
+def _before(payload):
+    # What the routes did: copy ids to str in Python, then FastAPI's encoder and JSONResponse.render
+    payload = copy.copy(payload)
+    for doc in payload.get("articles", []):
+        doc["_id"] = str(doc["_id"])
+    if "journalist" in payload:
+        payload["journalist"]["_id"] = str(payload["journalist"]["_id"])
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _after(payload):
+    return serialization.dumps(payload)
+
+
+def _time(fn, make_payload):
+    payloads = [make_payload() for _ in range(ROUNDS)]
+    started = time.perf_counter()
+    for payload in payloads:
+        body = fn(payload)
+    return (time.perf_counter() - started) / ROUNDS * 1000, body
+
+
+def _compress_time(body, encoding):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        out = compression.compress(body, encoding)
+    return (time.perf_counter() - started) / ROUNDS * 1000, len(out)
+
+
+def run():
+    print(f"orjson={serialization.ORJSON_AVAILABLE} brotli={compression.BROTLI_AVAILABLE} rounds={ROUNDS}")
+    print(f"{'endpoint':<20}{'path':<8}{'encode ms':>11}{'bytes':>10}")
+    for label, make_payload in (("/news (100)", news_payload), ("/journalist/{name}", journalist_payload)):
+        before_ms, before_body = _time(_before, make_payload)
+        after_ms, after_body = _time(_after, make_payload)
+        print(f"{label:<20}{'before':<8}{before_ms:>11.3f}{len(before_body):>10}")
+        print(f"{'':<20}{'after':<8}{after_ms:>11.3f}{len(after_body):>10}   ({before_ms / after_ms:.1f}x faster)")
+        encodings = ["gzip"] + (["br"] if compression.BROTLI_AVAILABLE else [])
+        for encoding in encodings:
+            ms, size = _compress_time(after_body, encoding)
+            print(f"{'':<20}{encoding:<8}{ms:>11.3f}{size:>10}   ({size / len(after_body):.0%} of raw)")
+
+
+if __name__ == "__main__":
+    run()
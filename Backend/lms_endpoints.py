@@ -2,15 +2,15 @@
 # DataHalo LMS Endpoints - Media Literacy Assignment Management
 # Focus: Teacher-Student management with AI Assignment Generator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 import random
 import string
-import requests
 import os
 import logging
+from utils import http_client, llm_gateway, pagination, http_cache, database as db_pool
 
 # Setup logger
 logger = logging.getLogger("DataHalo")
@@ -19,6 +19,7 @@ router = APIRouter(prefix="/lms", tags=["LMS"])
 
 # These will be initialized by main.py
 db = None
+read_db = None  # Motor handle when available, else the sync db (used via utils.database helpers)
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
@@ -29,10 +30,11 @@ submissions_collection = None
 ai_learning_dataset = None
 case_studies_collection = None
 
-def init_lms(database):
-    """Initialize LMS with database connection from main.py"""
-    global db, courses_collection, assignments_collection, submissions_collection, ai_learning_dataset, case_studies_collection
+def init_lms(database, async_database=None):
+    """Initialize LMS with the shared database connection (and optional async handle) from main.py"""
+    global db, read_db, courses_collection, assignments_collection, submissions_collection, ai_learning_dataset, case_studies_collection
     db = database
+    read_db = async_database if async_database is not None else database
     courses_collection = db["courses"]
     assignments_collection = db["assignments"]
     submissions_collection = db["submissions"]
@@ -40,6 +42,18 @@ def init_lms(database):
     case_studies_collection = db["case_studies"]
     logger.info("LMS: Initialized with shared database connection")
 
+# Field sets for paged listings: "list" is what the dashboards render, "detail" the full document
+COURSE_FIELDS = {
+    "list": {"title": 1, "description": 1, "subject": 1, "teacher_id": 1, "teacher_name": 1,
+             "invite_code": 1, "students": 1, "created_at": 1, "updated_at": 1},
+    "detail": None,
+}
+SUBMISSION_FIELDS = {
+    # The raw answers/content bodies are only needed when grading a single submission
+    "list": {"answers": 0, "content": 0},
+    "detail": None,
+}
+
 # ==================== MODELS ==================== #
 
 class Resource(BaseModel):
@@ -105,7 +119,7 @@ async def extract_content_from_url(url: str) -> str:
                 import io
                 from pypdf import PdfReader
                 
-                response = requests.get(url, timeout=30)
+                response = await http_client.get(url, timeout=30)
                 if response.status_code == 200:
                     pdf_file = io.BytesIO(response.content)
                     reader = PdfReader(pdf_file)
@@ -123,25 +137,14 @@ async def extract_content_from_url(url: str) -> str:
                 return f"PDF: {url} (Please paste the text content directly)"
         
         # For regular URLs, try to fetch content
-        response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
+        response = await http_client.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
         if response.status_code == 200:
-            # Try to extract clean text from HTML
+            # Try to extract clean text from HTML (article body, else the page's block text)
             try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style", "nav", "footer", "header"]):
-                    script.decompose()
-                
-                # Get text from article/main content
-                article = soup.find('article') or soup.find('main') or soup.find('body')
-                if article:
-                    text = article.get_text(separator='\n', strip=True)
-                    # Clean up extra whitespace
-                    lines = [line.strip() for line in text.split('\n') if line.strip()]
-                    text = '\n'.join(lines)
-                    return text[:8000]  # Limit to 8000 chars
+                from utils import article_extraction
+                page = await article_extraction.extract_async(response.content, url)
+                if page['text']:
+                    return page['text'][:8000]  # Limit to 8000 chars
             except:
                 pass
             
@@ -364,15 +367,9 @@ Generate the assignment now. Return ONLY valid JSON, no markdown, no explanation
 
 REMEMBER: If you create generic questions not tied to the specific resource content, the assignment will FAIL."""
 
-        # Step 3: Call AI
-        headers = {
-            "Authorization": f"Bearer {NVIDIA_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-                "model": "qwen/qwen3-coder-480b-a35b-instruct",
-            "messages": [
+        # Step 3: Call AI (increased timeout, retried by the gateway)
+        content = await llm_gateway.chat_completion(
+            [
                 {
                     "role": "system",
                     "content": "You are an expert assignment generator. Return ONLY valid JSON. No markdown formatting."
@@ -382,46 +379,16 @@ REMEMBER: If you create generic questions not tied to the specific resource cont
                     "content": prompt
                 }
             ],
-            "temperature": 0.7,
-            "max_tokens": 3000
-        }
-        
-        # AI call with retry logic and increased timeout
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"AI: Attempt {attempt + 1}/{max_retries} for assignment generation")
-                response = requests.post(
-                    "https://integrate.api.nvidia.com/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=120  # Increased to 120 seconds
-                )
-                response.raise_for_status()
-                break
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    logger.warning(f"AI: Timeout, retrying in 5s...")
-                    import time
-                    time.sleep(5)
-                else:
-                    raise
-        response.raise_for_status()
-        
-        ai_response = response.json()
-        content = ai_response["choices"][0]["message"]["content"]
+            endpoint="generate-assignment",
+            validate=llm_gateway.extract_json,
+            temperature=0.7,
+            max_tokens=3000,
+            timeout=120,  # Increased to 120 seconds
+            max_attempts=2,
+        )
         
         # Step 4: Parse JSON response
-        import json
-        import re
-        
-        # Try to extract JSON
-        json_match = re.search(r'\{[\s\S]*\}', content)
-        if json_match:
-            json_str = json_match.group(0)
-            assignment_data = json.loads(json_str)
-        else:
-            assignment_data = json.loads(content)
+        assignment_data = llm_gateway.extract_json(content)
         
         # Step 5: Add metadata
         assignment_data["resources_used"] = [
@@ -470,7 +437,14 @@ REMEMBER: If you create generic questions not tied to the specific resource cont
             "total_content_chars": len(resources_text)
         }
         
-    except json.JSONDecodeError as e:
+    except HTTPException:
+        raise
+    except llm_gateway.LLMTimeoutError:
+        raise HTTPException(status_code=504, detail="AI request timed out. Please try again.")
+    except llm_gateway.LLMError as e:
+        raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
+    except ValueError as e:
+        # extract_json found no parseable JSON in the reply
         raise HTTPException(status_code=500, detail=f"AI returned invalid JSON: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Assignment generation failed: {str(e)}")
@@ -510,22 +484,33 @@ async def create_course(request: CreateCourseRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/courses/teacher/{teacher_id}")
-async def get_teacher_courses(teacher_id: str):
-    """Get all courses for a teacher"""
+async def get_teacher_courses(
+    teacher_id: str,
+    limit: int = Query(50, ge=1, le=pagination.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$")
+):
+    """Get a teacher's courses, most recently updated first"""
     try:
-        courses = list(courses_collection.find({"teacher_id": teacher_id}).sort("updated_at", -1))
-        
+        page = await pagination.paginate(
+            read_db["courses"], {"teacher_id": teacher_id}, "updated_at",
+            limit=limit, cursor=cursor, projection=COURSE_FIELDS[fields]
+        )
+        courses = page["items"]
+
+        # Assignment counts for the whole page in one grouped query
+        counts = await db_pool.aggregate(read_db["assignments"], [
+            {"$match": {"course_id": {"$in": [course["_id"] for course in courses]}}},
+            {"$group": {"_id": "$course_id", "count": {"$sum": 1}}},
+        ])
+        count_by_course = {row["_id"]: row["count"] for row in counts}
         for course in courses:
-            course["_id"] = str(course["_id"])
-            # Add stats
-            course["assignment_count"] = assignments_collection.count_documents({"course_id": str(course["_id"])})
+            course["assignment_count"] = count_by_course.get(course["_id"], 0)
             course["student_count"] = len(course.get("students", []))
         
-        return {
-            "status": "success",
-            "courses": courses,
-            "count": len(courses)
-        }
+        return pagination.envelope("courses", page, fields)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -552,19 +537,21 @@ async def get_class(class_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/courses/student/{student_id}")
-async def get_student_courses(student_id: str):
-    """Get all enrolled courses for a student"""
+async def get_student_courses(
+    student_id: str,
+    limit: int = Query(50, ge=1, le=pagination.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$")
+):
+    """Get a student's enrolled courses, most recently updated first"""
     try:
-        courses = list(courses_collection.find({"students": student_id}).sort("updated_at", -1))
-        
-        for course in courses:
-            course["_id"] = str(course["_id"])
-        
-        return {
-            "status": "success",
-            "courses": courses,
-            "count": len(courses)
-        }
+        page = await pagination.paginate(
+            read_db["courses"], {"students": student_id}, "updated_at",
+            limit=limit, cursor=cursor, projection=COURSE_FIELDS[fields]
+        )
+        return pagination.envelope("courses", page, fields)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -651,11 +638,11 @@ async def create_assignment(request: CreateAssignmentRequest):
 async def get_course_assignments(course_id: str):
     """Get all assignments for a course"""
     try:
-        assignments = list(assignments_collection.find({"course_id": course_id}).sort("created_at", -1))
+        assignments = await db_pool.find_many(read_db["assignments"], {"course_id": course_id}, sort=[("created_at", -1)])
         
         for assignment in assignments:
             assignment["_id"] = str(assignment["_id"])
-            assignment["submission_count"] = submissions_collection.count_documents({"assignment_id": str(assignment["_id"])})
+            assignment["submission_count"] = await db_pool.count_documents(read_db["submissions"], {"assignment_id": str(assignment["_id"])})
         
         return {
             "status": "success",
@@ -715,6 +702,7 @@ async def grade_submission(request: GradeSubmissionRequest):
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Submission not found")
+        await http_cache.bump_async("submissions")
         
         return {
             "status": "success",
@@ -724,36 +712,40 @@ async def grade_submission(request: GradeSubmissionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/submissions/assignment/{assignment_id}")
-async def get_assignment_submissions(assignment_id: str):
-    """Get all submissions for an assignment (teacher view)"""
+async def get_assignment_submissions(
+    assignment_id: str,
+    limit: int = Query(50, ge=1, le=pagination.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (without answer bodies) or detail (full submission)")
+):
+    """Get submissions for an assignment (teacher view), newest first"""
     try:
-        submissions = list(submissions_collection.find({"assignment_id": assignment_id}).sort("submitted_at", -1))
-        
-        for submission in submissions:
-            submission["_id"] = str(submission["_id"])
-        
-        return {
-            "status": "success",
-            "submissions": submissions,
-            "count": len(submissions)
-        }
+        page = await pagination.paginate(
+            read_db["submissions"], {"assignment_id": assignment_id}, "submitted_at",
+            limit=limit, cursor=cursor, projection=SUBMISSION_FIELDS[fields]
+        )
+        return pagination.envelope("submissions", page, fields)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/submissions/student/{student_id}")
-async def get_student_submissions(student_id: str):
-    """Get all submissions for a student"""
+async def get_student_submissions(
+    student_id: str,
+    limit: int = Query(50, ge=1, le=pagination.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (without answer bodies) or detail (full submission)")
+):
+    """Get a student's submissions, newest first"""
     try:
-        submissions = list(submissions_collection.find({"student_id": student_id}).sort("submitted_at", -1))
-        
-        for submission in submissions:
-            submission["_id"] = str(submission["_id"])
-        
-        return {
-            "status": "success",
-            "submissions": submissions,
-            "count": len(submissions)
-        }
+        page = await pagination.paginate(
+            read_db["submissions"], {"student_id": student_id}, "submitted_at",
+            limit=limit, cursor=cursor, projection=SUBMISSION_FIELDS[fields]
+        )
+        return pagination.envelope("submissions", page, fields)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -876,6 +868,7 @@ async def submit_case_study(submission: CaseStudySubmission):
         }
         
         result = case_studies_collection.insert_one(case_study)
+        await http_cache.bump_async("case_studies")
         case_study["_id"] = str(result.inserted_id)
         
         return {
@@ -887,110 +880,112 @@ async def submit_case_study(submission: CaseStudySubmission):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/journalists/all")
-async def get_all_journalists():
+async def get_all_journalists(request: Request):
     """Get all analyzed journalists with their full case study data"""
     try:
-        # Fetch from journalists collection (created from homepage case study generator)
-        journalists_raw = list(db["journalists"].find().sort("analysis_timestamp", -1).limit(50))
+        async def build():
+            # Fetch from journalists collection (created from homepage case study generator)
+            journalists_raw = list(db["journalists"].find().sort("analysis_timestamp", -1).limit(50))
         
-        journalists = []
-        for journalist in journalists_raw:
-            journalist["_id"] = str(journalist["_id"])
+            journalists = []
+            for journalist in journalists_raw:
             
-            # Extract aiProfile which contains all the case study data
-            ai_profile = journalist.get("aiProfile", {})
+                # Extract aiProfile which contains all the case study data
+                ai_profile = journalist.get("aiProfile", {})
             
-            # Extract biography/bio
-            bio = (ai_profile.get("biography") or 
-                   ai_profile.get("summary") or 
-                   ai_profile.get("overview") or
-                   "Journalist profile")
+                # Extract biography/bio
+                bio = (ai_profile.get("biography") or 
+                       ai_profile.get("summary") or 
+                       ai_profile.get("overview") or
+                       "Journalist profile")
             
-            # Extract notable works/major stories
-            notable_works_raw = (ai_profile.get("notableWorks") or
-                                ai_profile.get("major_stories") or
-                                ai_profile.get("notable_works") or
-                                [])
+                # Extract notable works/major stories
+                notable_works_raw = (ai_profile.get("notableWorks") or
+                                    ai_profile.get("major_stories") or
+                                    ai_profile.get("notable_works") or
+                                    [])
             
-            # Convert notable works to simple strings if they're objects
-            notable_works = []
-            for work in notable_works_raw:
-                if isinstance(work, dict):
-                    notable_works.append(work.get("title", str(work)))
-                else:
-                    notable_works.append(str(work))
+                # Convert notable works to simple strings if they're objects
+                notable_works = []
+                for work in notable_works_raw:
+                    if isinstance(work, dict):
+                        notable_works.append(work.get("title", str(work)))
+                    else:
+                        notable_works.append(str(work))
             
-            # Extract main topics as specializations
-            main_topics = ai_profile.get("mainTopics", [])
-            if not main_topics:
-                main_topics = [ai_profile.get("category", "General Journalism")]
+                # Extract main topics as specializations
+                main_topics = ai_profile.get("mainTopics", [])
+                if not main_topics:
+                    main_topics = [ai_profile.get("category", "General Journalism")]
             
-            # Extract credibility score safely
-            cred_score_obj = ai_profile.get("credibilityScore", {})
-            if isinstance(cred_score_obj, dict):
-                cred_score = cred_score_obj.get("overall", cred_score_obj.get("score", 85))
-            elif isinstance(cred_score_obj, (int, float)):
-                cred_score = cred_score_obj
-            else:
-                cred_score = 85
+                # Extract credibility score safely
+                cred_score_obj = ai_profile.get("credibilityScore", {})
+                if isinstance(cred_score_obj, dict):
+                    cred_score = cred_score_obj.get("overall", cred_score_obj.get("score", 85))
+                elif isinstance(cred_score_obj, (int, float)):
+                    cred_score = cred_score_obj
+                else:
+                    cred_score = 85
             
-            # Extract lessons from different fields
-            lessons = []
-            ethical_assessment = ai_profile.get("ethicalAssessment", "")
-            if ethical_assessment and len(ethical_assessment) > 10:
-                lessons.append(f"Ethics: {ethical_assessment[:70]}...")
-            if ai_profile.get("writingTone"):
-                lessons.append(f"Style: {ai_profile.get('writingTone')}")
-            if ai_profile.get("ideologicalBias"):
-                lessons.append(f"Bias: {ai_profile.get('ideologicalBias')}")
+                # Extract lessons from different fields
+                lessons = []
+                ethical_assessment = ai_profile.get("ethicalAssessment", "")
+                if ethical_assessment and len(ethical_assessment) > 10:
+                    lessons.append(f"Ethics: {ethical_assessment[:70]}...")
+                if ai_profile.get("writingTone"):
+                    lessons.append(f"Style: {ai_profile.get('writingTone')}")
+                if ai_profile.get("ideologicalBias"):
+                    lessons.append(f"Bias: {ai_profile.get('ideologicalBias')}")
             
-            if not lessons:
-                lessons = ["Professional journalism", "Ethical reporting", "Source verification"]
+                if not lessons:
+                    lessons = ["Professional journalism", "Ethical reporting", "Source verification"]
             
 
-            # Extract profile image from various sources
-            profile_image = None
-            scraped_data = journalist.get("scrapedData", {})
-            if isinstance(scraped_data, dict):
-                profile_image = scraped_data.get("imageUrl") or scraped_data.get("image")
-            if not profile_image:
-                profile_image = ai_profile.get("profileImage") or ai_profile.get("image")
+                # Extract profile image from various sources
+                profile_image = None
+                scraped_data = journalist.get("scrapedData", {})
+                if isinstance(scraped_data, dict):
+                    profile_image = scraped_data.get("imageUrl") or scraped_data.get("image")
+                if not profile_image:
+                    profile_image = ai_profile.get("profileImage") or ai_profile.get("image")
             
-            journalist_data = {
-                "_id": journalist["_id"],
-                "name": journalist.get("name", "Unknown Journalist"),
-                "bio": bio[:200] + "..." if len(bio) > 200 else bio,  # Truncate for gallery
-                "analysis": ai_profile,  # Full AI profile for detailed view
-                "credibility_score": cred_score,
-                "article_count": journalist.get("articlesAnalyzed", 0),
-                "awards": len(ai_profile.get("awards", [])),
-                "region": (ai_profile.get("region") or 
-                          ai_profile.get("country") or 
-                          "International"),
-                "country": ai_profile.get("country", "International"),
-                "verified": True,  # All analyzed journalists are verified
-                "category": main_topics[0] if main_topics else "General Journalism",
-                "specializations": main_topics[:3],  # Top 3 topics
-                "key_work": (notable_works[0] if notable_works else "Various investigations"),
-                "lessons": lessons[:3],  # Top 3 lessons
-                "major_stories": notable_works[:5],  # Top 5 stories
-                "impact": ai_profile.get("influence", ""),
-                "writing_style": ai_profile.get("writingTone", ""),
-                "ethical_approach": ai_profile.get("ethicalAssessment", "")[:150] if ai_profile.get("ethicalAssessment") else "",
-                "ideology": ai_profile.get("ideologicalBias", ""),
-                "controversies": ai_profile.get("controversies", []),
-                "created_at": journalist.get("analysis_timestamp"),
-                "image": profile_image,  # Add profile image URL
-            }
-            journalists.append(journalist_data)
+                journalist_data = {
+                    "_id": journalist["_id"],
+                    "name": journalist.get("name", "Unknown Journalist"),
+                    "bio": bio[:200] + "..." if len(bio) > 200 else bio,  # Truncate for gallery
+                    "analysis": ai_profile,  # Full AI profile for detailed view
+                    "credibility_score": cred_score,
+                    "article_count": journalist.get("articlesAnalyzed", 0),
+                    "awards": len(ai_profile.get("awards", [])),
+                    "region": (ai_profile.get("region") or 
+                              ai_profile.get("country") or 
+                              "International"),
+                    "country": ai_profile.get("country", "International"),
+                    "verified": True,  # All analyzed journalists are verified
+                    "category": main_topics[0] if main_topics else "General Journalism",
+                    "specializations": main_topics[:3],  # Top 3 topics
+                    "key_work": (notable_works[0] if notable_works else "Various investigations"),
+                    "lessons": lessons[:3],  # Top 3 lessons
+                    "major_stories": notable_works[:5],  # Top 5 stories
+                    "impact": ai_profile.get("influence", ""),
+                    "writing_style": ai_profile.get("writingTone", ""),
+                    "ethical_approach": ai_profile.get("ethicalAssessment", "")[:150] if ai_profile.get("ethicalAssessment") else "",
+                    "ideology": ai_profile.get("ideologicalBias", ""),
+                    "controversies": ai_profile.get("controversies", []),
+                    "created_at": journalist.get("analysis_timestamp"),
+                    "image": profile_image,  # Add profile image URL
+                }
+                journalists.append(journalist_data)
         
-        logger.info(f"SUCCESS: Fetched {len(journalists)} journalists with case study data")
+            logger.info(f"SUCCESS: Fetched {len(journalists)} journalists with case study data")
         
-        return {
-            "status": "success",
-            "journalists": journalists,
-            "count": len(journalists)
-        }
+            return {
+                "status": "success",
+                "journalists": journalists,
+                "count": len(journalists)
+            }
+
+        return await http_cache.cached_response(request, ["journalists"], build)
     except Exception as e:
         logger.error(f"ERROR: Failed to fetch journalists: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1018,27 +1013,29 @@ async def get_journalist_case_study(journalist_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/case-studies/published")
-async def get_published_case_studies():
+async def get_published_case_studies(request: Request):
     """Get published case studies for learning"""
     try:
-        # Get top 20 published case studies with highest grades
-        case_studies = list(
-            case_studies_collection.find(
-                {"published": True, "grade": {"$ne": None}}
-            ).sort([("grade", -1), ("views", -1)]).limit(20)
-        )
-        
-        for study in case_studies:
-            study["_id"] = str(study["_id"])
-            # Anonymize student info
-            study["student_name"] = "Anonymous Student"
-            study["student_id"] = "***"
-        
-        return {
-            "status": "success",
-            "case_studies": case_studies,
-            "count": len(case_studies)
-        }
+        async def build():
+            # Get top 20 published case studies with highest grades
+            case_studies = list(
+                case_studies_collection.find(
+                    {"published": True, "grade": {"$ne": None}}
+                ).sort([("grade", -1), ("views", -1)]).limit(20)
+            )
+            
+            for study in case_studies:
+                # Anonymize student info
+                study["student_name"] = "Anonymous Student"
+                study["student_id"] = "***"
+            
+            return {
+                "status": "success",
+                "case_studies": case_studies,
+                "count": len(case_studies)
+            }
+
+        return await http_cache.cached_response(request, ["case_studies"], build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1086,6 +1083,7 @@ async def grade_case_study(study_id: str, grade: int, feedback: str, publish: bo
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Case study not found")
+        await http_cache.bump_async("case_studies")
         
         return {
             "status": "success",
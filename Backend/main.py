@@ -1,17 +1,25 @@
 from pathlib import Path
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from pymongo import MongoClient
+from pymongo import UpdateOne
 from datetime import datetime
 from typing import Dict, Any, Optional
-import requests
 import os
+import asyncio
 import logging
 import re
-from utils.smart_analysis import smart_analyse
-from utils.news_fetcher import fetch_news, refresh_news as refresh_news_fetcher, get_saved_articles, clean_old_articles, get_articles_count_by_category
+from utils import http_client, llm_gateway, llm_cache, database, indexes, provider_cache, smart_digests, pagination, story_clusters, http_cache, article_enrichment, narrative_cache
+from utils.compression import CompressionMiddleware
+from utils.serialization import FastJSONResponse
+from utils.streaming import completion_events, event_stream_response, format_event
+from utils.smart_analysis import finalize_smart_analysis, clean_stream_chunk, fetch_pov_candidates, FEED_PROJECTION, SMART_ANALYSIS_LLM_PARAMS
+from utils.ingestion_scheduler import scheduler as ingestion_scheduler
+from utils.news_search import search_articles
+from utils.relevance_ranker import rank_articles, tokenize
+from utils.news_fetcher import init_news_fetcher, refresh_countries, newsdata_limiter, get_saved_articles, get_articles_count_by_category
 
 # ---------------- ENV + LOGGING ---------------- #
 
@@ -37,7 +45,30 @@ logger.info(f"NEWS_API_KEY present: {bool(NEWS_API_KEY)}")
 
 # ---------------- FASTAPI INIT ---------------- #
 
-app = FastAPI(title="DataHalo - Journalist Profile & News Intelligence API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: ensure indexes and start background ingestion. Shutdown: stop it and release pooled connections."""
+    if MONGODB_AVAILABLE:
+        try:
+            await asyncio.to_thread(indexes.ensure_indexes, db)
+        except Exception as e:
+            logger.error(f"ERROR: Index setup failed: {e}")
+        smart_digests.init_smart_digests(db, collect_smart_feed_articles)
+        if URL_NARRATIVE_AVAILABLE:
+            narrative_cache.init_narrative_cache(db, analyze_url_narrative, extract_article_content)
+        ingestion_scheduler.configure(db)
+        ingestion_scheduler.start()
+    yield
+    await ingestion_scheduler.stop()
+    await http_client.close_http_client()
+    await llm_gateway.close_llm_client()
+    database.close()
+
+app = FastAPI(
+    title="DataHalo - Journalist Profile & News Intelligence API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,28 +93,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/gzip for complete JSON bodies over the threshold; SSE streams pass through
+app.add_middleware(CompressionMiddleware)
+
 # ---------------- DATABASE ---------------- #
 
+# One shared pool for every module; connects lazily on first operation
 try:
-    client = MongoClient(MONGO_URI)
-    db = client["datahalo"]
+    db = database.get_db()
+    async_db = database.get_async_db()
+    read_db = async_db if async_db is not None else db  # for non-blocking reads in async routes
     news_collection = db["news"]
     journalist_collection = db["journalists"]
-    logger.info("SUCCESS: Connected to MongoDB successfully")
+    logger.info(f"SUCCESS: MongoDB pool configured (motor={database.MOTOR_AVAILABLE})")
     MONGODB_AVAILABLE = True
 except Exception as e:
     logger.error(f"ERROR: MongoDB connection failed: {str(e)}")
-    client = None
     db = None
+    async_db = None
+    read_db = None
     news_collection = None
     journalist_collection = None
     MONGODB_AVAILABLE = False
 
+if MONGODB_AVAILABLE:
+    init_news_fetcher(db)
+    # Collection write versions behind ETags on read endpoints
+    http_cache.init_http_cache(db)
+    # Persistent tier for repeated LLM prompts
+    llm_cache.init_llm_cache(db)
+
 # ---------------- JOURNALIST MODULE ---------------- #
 
 # Try to import journalist analysis modules
 try:
     from utils.serp_scraper import generate_journalist_case_study as fetch_journalist_data_case_study
+    from utils.serp_scraper import WorkingJournalistScraper, CASE_STUDY_LLM_PARAMS
     from utils.ai_analysis import analyze_journalist
 
     JOURNALIST_MODULE_AVAILABLE = True
@@ -101,6 +146,7 @@ class NarrativeRequest(BaseModel):
 
 class URLNarrativeRequest(BaseModel):
     url: str
+    enrich: bool = False
 
 class ArticleRequest(BaseModel):
     article: str
@@ -112,7 +158,7 @@ class CaseStudyRequest(BaseModel):
 
 # Import AI-FIRST analyzer (credible, responsible approach)
 try:
-    from utils.ai_article_analyzer import analyze_article_with_ai
+    from utils.ai_article_analyzer import analyze_article_with_ai, build_analysis_request, parse_analysis_response, ANALYSIS_LLM_PARAMS
     AI_ARTICLE_ANALYZER_AVAILABLE = True
     logger.info("SUCCESS: AI-First Article Analyzer loaded - using real AI analysis")
 except ImportError as e:
@@ -175,7 +221,7 @@ async def analyze_article(request: ArticleRequest, use_ai: bool = Query(True, de
                     use_ai = False
                 else:
                     logger.info("ANALYZER: Qwen3 AI-powered evaluation (5-15 seconds)")
-                    result = analyze_article_with_ai(article_text)
+                    result = await analyze_article_with_ai(article_text)
                     
                     if result.get("status") == "success":
                         logger.info(f"SUCCESS: AI analysis complete - Score: {result['analysis']['overall_score']}, Grade: {result['analysis'].get('letter_grade', 'N/A')}")
@@ -208,8 +254,21 @@ async def analyze_article(request: ArticleRequest, use_ai: bool = Query(True, de
         logger.error(f"ERROR: Article analysis error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def _save_stream_result(collection_name: str, doc: Dict[str, Any]):
+    """Store the completed output of a streamed endpoint; streams never fail on a write error."""
+    if not MONGODB_AVAILABLE:
+        return
+    try:
+        db[collection_name].insert_one({**doc, "streamed": True, "created_at": datetime.utcnow()})
+        logger.info(f"SUCCESS: Saved streamed result to {collection_name}")
+    except Exception as e:
+        logger.error(f"ERROR: Failed to save streamed result to {collection_name}: {e}")
+
 @app.post("/analyze-article-ai")
-async def analyze_article_ai_only(request: ArticleRequest):
+async def analyze_article_ai_only(
+    request: ArticleRequest,
+    stream: bool = Query(False, description="Stream the evaluation as Server-Sent Events")
+):
     """
     AI-POWERED ARTICLE ANALYZER (Qwen3 480B Model)
     
@@ -253,7 +312,26 @@ async def analyze_article_ai_only(request: ArticleRequest):
         
         # USE AI ANALYZER
         logger.info("AI ANALYZER: Qwen3 480B AI-powered evaluation")
-        result = analyze_article_with_ai(article_text)
+        if stream:
+            messages, stats = build_analysis_request(article_text)
+
+            async def finish_analysis(content: str) -> Dict[str, Any]:
+                result = parse_analysis_response(content, stats)
+                logger.info(f"SUCCESS: Streamed AI analysis complete - Score: {result['analysis']['overall_score']}")
+                await asyncio.to_thread(_save_stream_result, "ai_article_analyses", {
+                    "word_count": word_count,
+                    "article_excerpt": article_text[:500],
+                    "response_text": content,
+                    "result": result,
+                })
+                return result
+
+            return event_stream_response(completion_events(
+                llm_gateway.stream_chat_completion(messages, **ANALYSIS_LLM_PARAMS),
+                finish_analysis
+            ))
+
+        result = await analyze_article_with_ai(article_text)
         
         if result.get("status") == "success":
             logger.info(f"SUCCESS: AI analysis complete - Score: {result['analysis']['overall_score']}, Grade: {result['analysis'].get('letter_grade', 'N/A')}")
@@ -270,8 +348,45 @@ async def analyze_article_ai_only(request: ArticleRequest):
 
 # ---------------- CASE STUDY GENERATOR ENDPOINT ---------------- #
 
+async def _stream_case_study(journalist_name: str):
+    """SSE generator: search progress first (immediate first byte), then case study tokens."""
+    yield format_event({"stage": "searching", "journalist": journalist_name}, "status")
+    
+    scraper = WorkingJournalistScraper()
+    data = await scraper.comprehensive_search(journalist_name)
+    if not data or data['metadata']['total_results'] < 1:
+        yield format_event({
+            "status": "error",
+            "message": f"No information found about {journalist_name}. Check spelling or try another journalist."
+        }, "error")
+        return
+    if not llm_gateway.is_configured():
+        yield format_event({"status": "error", "message": "Failed to generate case study."}, "error")
+        return
+    
+    yield format_event({"stage": "generating", "sources_used": data['metadata']['sources_used']}, "status")
+    
+    async def finish_case_study(analysis: str) -> Dict[str, Any]:
+        logger.info(f"SUCCESS: Streamed case study complete for {journalist_name}")
+        case_study = scraper.assemble_case_study(data, analysis.strip())
+        await asyncio.to_thread(_save_stream_result, "journalist_case_studies", {
+            "journalist_name": journalist_name,
+            "response_text": analysis,
+            "case_study": case_study,
+        })
+        return case_study
+    
+    async for event in completion_events(
+        llm_gateway.stream_chat_completion(scraper.build_case_study_messages(data), **CASE_STUDY_LLM_PARAMS),
+        finish_case_study
+    ):
+        yield event
+
 @app.post("/generate-case-study")
-async def create_case_study(request: CaseStudyRequest):
+async def create_case_study(
+    request: CaseStudyRequest,
+    stream: bool = Query(False, description="Stream progress and the case study as Server-Sent Events")
+):
     """
     Generate comprehensive educational case study for a journalist
     Like law case studies - deep analysis for journalism students
@@ -283,8 +398,11 @@ async def create_case_study(request: CaseStudyRequest):
         if not request.journalist_name or len(request.journalist_name.strip()) < 3:
             raise HTTPException(status_code=400, detail="Invalid journalist name - must be at least 3 characters")
         
+        if stream:
+            return event_stream_response(_stream_case_study(request.journalist_name.strip()))
+        
         # Generate case study using DuckDuckGo scraper
-        result = fetch_journalist_data_case_study(request.journalist_name.strip())
+        result = await fetch_journalist_data_case_study(request.journalist_name.strip())
         
         if result['status'] == 'error':
             logger.error(f"ERROR: Case study generation failed: {result.get('message', 'Unknown error')}")
@@ -353,7 +471,7 @@ async def analyze(request: JournalistRequest):
 
         # Step 3: Run comprehensive AI analysis
         logger.info(f"ANALYZE: Running AI analysis for: {name}")
-        ai_analysis = analyze_journalist(name, scraped_data)
+        ai_analysis = await analyze_journalist(name, scraped_data)
 
         # Step 4: Prepare complete analysis result
         analysis_result = {
@@ -374,11 +492,13 @@ async def analyze(request: JournalistRequest):
         # Step 5: Save to MongoDB
         try:
             # Update or insert the analysis
-            journalist_collection.update_one(
+            await asyncio.to_thread(
+                journalist_collection.update_one,
                 {"name": {"$regex": f"^{name}$", "$options": "i"}},
                 {"$set": analysis_result},
                 upsert=True
             )
+            await http_cache.bump_async("journalists")
             logger.info(f"SAVE: Saved analysis to database for: {name}")
         except Exception as db_error:
             logger.error(f"ERROR: Failed to save to database: {str(db_error)}")
@@ -422,60 +542,80 @@ async def fetch_articles(name: str):
         logger.error(f"ERROR: Fetch Error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+# Field sets for paged listings: "list" is what the cards render, "detail" the full document
+JOURNALIST_FIELDS = {
+    "list": {
+        "name": 1,
+        "analysis_timestamp": 1,
+        "articlesAnalyzed": 1,
+        "aiProfile.haloScore.score": 1,
+        "aiProfile.haloScore.level": 1,
+        "aiProfile.haloScore.description": 1,
+        "aiProfile.digitalPresence.profileImage": 1,
+        "aiProfile.mainTopics": 1,
+        "aiProfile.ideologicalBias": 1
+    },
+    "detail": None,
+}
+NEWS_FIELDS = {
+    "list": {
+        "title": 1, "description": 1, "url": 1, "image": 1, "source": 1,
+        "category": 1, "publishedAt": 1, "fetchedAt": 1, "story_cluster_id": 1
+    },
+    "detail": story_clusters.INTERNAL_FIELDS,
+}
+CHAT_SESSION_FIELDS = {
+    "list": {"title": 1, "created_at": 1, "updated_at": 1, "message_count": 1, "first_message": 1},
+    "detail": None,
+}
+
 @app.get("/journalists")
-async def get_journalists(limit: int = Query(20, description="Number of journalists to return")):
-    """Get list of analyzed journalists from database."""
+async def get_journalists(
+    request: Request,
+    limit: int = Query(20, ge=1, le=pagination.MAX_LIMIT, description="Number of journalists to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (card fields) or detail (full profile)")
+):
+    """Get list of analyzed journalists from database, newest analysis first."""
     if not MONGODB_AVAILABLE:
         raise HTTPException(status_code=503, detail="Database not available")
 
     try:
-        journalists = list(journalist_collection.find(
-            {},
-            {
-                "name": 1,
-                "analysis_timestamp": 1,
-                "articlesAnalyzed": 1,
-                "aiProfile.haloScore.score": 1,
-                "aiProfile.haloScore.level": 1,
-                "aiProfile.haloScore.description": 1,
-                "aiProfile.digitalPresence.profileImage": 1,
-                "aiProfile.mainTopics": 1,
-                "aiProfile.ideologicalBias": 1
-            }
-        ).sort("analysis_timestamp", -1).limit(limit))
-
-        # Convert ObjectId to string
-        for journalist in journalists:
-            journalist["_id"] = str(journalist["_id"])
+        async def build():
+            page = await pagination.paginate(
+                read_db["journalists"], {}, "analysis_timestamp",
+                limit=limit, cursor=cursor, projection=JOURNALIST_FIELDS[fields]
+            )
+            return pagination.envelope("journalists", page, fields)
 
-        return {
-            "status": "success",
-            "count": len(journalists),
-            "journalists": journalists
-        }
+        return await http_cache.cached_response(request, ["journalists"], build)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"ERROR: Error retrieving journalists: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve journalists")
 
 @app.get("/journalist/{name}")
-async def get_journalist(name: str):
+async def get_journalist(name: str, request: Request):
     """Get specific journalist analysis from database."""
     if not MONGODB_AVAILABLE:
         raise HTTPException(status_code=503, detail="Database not available")
 
     try:
-        journalist = journalist_collection.find_one({"name": {"$regex": f"^{name}$", "$options": "i"}})
+        async def build():
+            journalist = await asyncio.to_thread(
+                journalist_collection.find_one, {"name": {"$regex": f"^{name}$", "$options": "i"}}
+            )
 
-        if not journalist:
-            raise HTTPException(status_code=404, detail=f"No analysis found for {name}")
+            if not journalist:
+                raise HTTPException(status_code=404, detail=f"No analysis found for {name}")
 
-        # Convert ObjectId to string
-        journalist["_id"] = str(journalist["_id"])
+            return {
+                "status": "success",
+                "journalist": journalist
+            }
 
-        return {
-            "status": "success",
-            "journalist": journalist
-        }
+        return await http_cache.cached_response(request, ["journalists"], build)
     except HTTPException:
         raise
     except Exception as e:
@@ -484,33 +624,44 @@ async def get_journalist(name: str):
 
 # ---------------- NEWS MODULE ---------------- #
 
+async def _news_page(category: str, limit: int, cursor: Optional[str], fields: str) -> Dict[str, Any]:
+    query = {} if category == "all" else {"category": category}
+    return await pagination.paginate(
+        read_db["news"], query, "fetchedAt", limit=limit, cursor=cursor, projection=NEWS_FIELDS[fields]
+    )
+
 @app.get("/news")
-async def get_news(category: str = Query("general", description="Category of news")):
-    """Get all saved news articles from MongoDB database sorted by newest first."""
+async def get_news(
+    request: Request,
+    category: str = Query("general", description="Category of news"),
+    limit: int = Query(100, ge=1, le=pagination.MAX_LIMIT, description="Articles per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (card fields) or detail (full document)")
+):
+    """Get saved news articles from MongoDB sorted by newest first, one page at a time."""
     try:
         if not MONGODB_AVAILABLE:
             logger.warning("Database not available")
             raise HTTPException(status_code=500, detail="Database not available")
 
-        # Get all articles for category from database (sorted newest first)
-        articles = get_saved_articles(category=category, limit=100)
+        # Fresh articles arrive via the background ingestion scheduler, never on the request path.
+        async def build():
+            page = await _news_page(category, limit, cursor, fields)
 
-        # If no articles found, fetch some fresh ones
-        if not articles:
-            logger.info(f"No articles in database for '{category}', fetching fresh...")
-            result = fetch_news(category=category)
-            articles = result.get("all_articles", [])
+            logger.info(f"DATA: Retrieved {len(page['items'])} '{category}' articles from database")
 
-        logger.info(f"DATA: Retrieved {len(articles)} '{category}' articles from database")
+            return pagination.envelope(
+                "articles", page, fields,
+                category=category,
+                source="database",
+                message=f"Loaded {len(page['items'])} articles from database (newest first)"
+            )
 
-        return {
-            "status": "success",
-            "category": category,
-            "source": "database",
-            "count": len(articles),
-            "articles": articles,
-            "message": f"Loaded {len(articles)} articles from database (newest first)"
-        }
+        return await http_cache.cached_response(request, ["news"], build)
+    except HTTPException:
+        raise
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"ERROR: Error retrieving news: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve news from database")
@@ -536,18 +687,13 @@ async def refresh_news_endpoint(
         if country.lower() in ("international", "all"):
             countries = preset_international
 
-        total_new = 0
-        total_duplicates = 0
+        # Countries are fetched concurrently under the shared NewsData rate limiter
+        summary = await refresh_countries(category=category, countries=countries, page_size=30)
+        total_new = summary["count"]
+        total_duplicates = summary["duplicates_skipped"]
 
-        for c in countries:
-            result = refresh_news_fetcher(category=category, page_size=30, country=c)
-            if result.get("status") != "success":
-                logger.warning(f"REFRESH: Country '{c}' failed: {result.get('error')}")
-                continue
-            total_new += result.get("count", 0)
-            total_duplicates += result.get("duplicates_skipped", 0)
-
-        all_articles = get_saved_articles(category=category, limit=100)
+        # Single read of the merged result
+        all_articles = await asyncio.to_thread(get_saved_articles, category=category, limit=100)
 
         logger.info(f"SUCCESS: Refresh complete across {len(countries)} country codes: {total_new} new, {len(all_articles)} total in DB")
 
@@ -560,6 +706,7 @@ async def refresh_news_endpoint(
             "total_articles": len(all_articles),
             "articles": all_articles,
             "countries": countries,
+            "failed_countries": summary["failed"],
             "timestamp": datetime.utcnow().isoformat(),
             "message": f"Added {total_new} new articles across {len(countries)} countries. Total: {len(all_articles)}"
         }
@@ -570,208 +717,232 @@ async def refresh_news_endpoint(
         raise HTTPException(status_code=500, detail=f"Failed to refresh news: {str(e)}")
 
 @app.get("/saved-news")
-async def get_saved_news(category: str = Query("all", description="Category filter")):
-    """Get saved news articles from MongoDB."""
+async def get_saved_news(
+    request: Request,
+    category: str = Query("all", description="Category filter"),
+    limit: int = Query(100, ge=1, le=pagination.MAX_LIMIT, description="Articles per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (card fields) or detail (full document)")
+):
+    """Get saved news articles from MongoDB, one page at a time."""
     try:
         if not MONGODB_AVAILABLE:
             raise HTTPException(status_code=500, detail="Database not available")
 
-        articles = get_saved_articles(category=category, limit=100)
+        async def build():
+            page = await _news_page(category, limit, cursor, fields)
+            return pagination.envelope("articles", page, fields, category=category)
+
+        return await http_cache.cached_response(request, ["news"], build)
+    except HTTPException:
+        raise
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"ERROR: Error retrieving saved news: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve saved news")
+
+@app.get("/search-news")
+async def search_news(
+    q: str = Query(..., description='Search terms; use "quotes" for phrases and -word to exclude'),
+    days: int = Query(30, description="Only articles fetched in the last N days"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results")
+):
+    """Full-text search over stored articles, most relevant first."""
+    try:
+        if not MONGODB_AVAILABLE:
+            raise HTTPException(status_code=500, detail="Database not available")
+
+        from datetime import timedelta
+        start_date = datetime.utcnow() - timedelta(days=days)
+        articles = await asyncio.to_thread(search_articles, news_collection, q, start_date, None, limit)
+        for article in articles:
+            article["_id"] = str(article["_id"])
 
         return {
             "status": "success",
-            "category": category,
+            "query": q,
             "count": len(articles),
             "articles": articles
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"ERROR: Error retrieving saved news: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve saved news")
+        logger.error(f"ERROR: News search failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+async def collect_smart_feed_articles(pov: str, days: int, state: str = "", district: str = ""):
+    """Candidate articles for a smart feed: stored articles in the window, region/POV-ranked when a region is given."""
+    from datetime import timedelta
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    # Newest articles per allowed category, capped inside MongoDB
+    article_data = await asyncio.to_thread(fetch_pov_candidates, news_collection, pov, start_date, end_date)
+
+    if not article_data:
+        raise HTTPException(status_code=404, detail="No news articles found in database yet. Background ingestion will populate it shortly.")
+
+    # Region-targeted fetch using SERP or NewsData.io when state/district provided
+    articles_for_ai = []
+    if state or district:
+        # POV-specific keyword enrichment
+        pov_kw_map = {
+            "women commission": [
+                "women", "women safety", "crime against women", "sexual assault",
+                "harassment", "domestic violence", "trafficking", "women commission"
+            ],
+            "assistant commissioner of police": [
+                "police", "law and order", "crime", "cybercrime", "enforcement",
+                "FIR", "investigation", "arrest"
+            ],
+            "ias officer": [
+                "governance", "administration", "implementation", "compliance",
+                "scheme", "policy", "district magistrate", "collector"
+            ],
+            "economist": [
+                "economy", "inflation", "employment", "GDP", "trade",
+                "investment", "markets", "industry"
+            ],
+            "social worker": [
+                "welfare", "community", "NGO", "beneficiary", "child protection",
+                "education", "health", "poverty"
+            ],
+            "block president": [
+                "local development", "infrastructure", "roads", "school",
+                "health center", "panchayat", "block", "gram"
+            ],
+        }
+
+        pov_key = (pov or "").strip().lower()
+        pov_keywords = pov_kw_map.get(pov_key, [])
+        base_terms = [
+            (district.strip() if district else ""),
+            (state.strip() if state else ""),
+            "India",
+        ]
+        region_query = " ".join([p for p in base_terms + pov_keywords if p])
+        region_results = []
+        try:
+            if SERP_API_KEY and region_query:
+                serp_url = "https://serpapi.com/search.json"
+                serp_params = {
+                    "api_key": SERP_API_KEY,
+                    "engine": "google_news",
+                    "q": region_query,
+                    "gl": "in",
+                    "hl": "en",
+                    "num": 50
+                }
+                logger.info(f"REGION: SERP search for '{region_query}'")
+                serp_response = await provider_cache.get("serp", serp_url, params=serp_params, timeout=15)
+                if serp_response.status_code == 200:
+                    serp_data = serp_response.json()
+                    news_results = serp_data.get("news_results", [])
+                    for item in news_results:
+                        title = item.get("title", "")
+                        snippet = item.get("snippet", "")
+                        link = item.get("link", "")
+                        source = item.get("source", {}).get("name", "Unknown") if isinstance(item.get("source"), dict) else "Unknown"
+                        date = item.get("date", "")
+                        if title and link:
+                            region_results.append({
+                                "title": title,
+                                "description": snippet or title,
+                                "url": link,
+                                "source": source,
+                                "category": "general",
+                                "publishedAt": date or datetime.utcnow().isoformat()
+                            })
+            # Fallback to NewsData.io keyword search
+            if not region_results and NEWS_API_KEY and region_query:
+                nd_url = "https://newsdata.io/api/1/latest"
+                nd_params = {
+                    "apikey": NEWS_API_KEY,
+                    "language": "en",
+                    "country": "in",
+                    "q": region_query,
+                    "size": 10
+                }
+                logger.info(f"REGION: NewsData keyword search for '{region_query}'")
+                nd_response = await provider_cache.get("newsdata", nd_url, params=nd_params, timeout=10)
+                if nd_response.status_code == 200:
+                    nd_data = nd_response.json()
+                    results = nd_data.get("results", [])
+                    for item in results:
+                        title = item.get("title")
+                        link = item.get("link")
+                        if not title or not link:
+                            continue
+                        region_results.append({
+                            "title": title,
+                            "description": item.get("description", ""),
+                            "url": link,
+                            "source": item.get("source_id", "Unknown"),
+                            "category": "general",
+                            "publishedAt": item.get("pubDate", "")
+                        })
+        except Exception as e:
+            logger.error(f"ERROR: Region fetch failed: {e}")
+
+        # Stored articles mentioning the region, found through the text index rather than a window scan
+        stored_hits = []
+        try:
+            region_terms = " ".join(p for p in [district.strip(), state.strip()] + pov_keywords if p)
+            for doc in await asyncio.to_thread(search_articles, news_collection, region_terms, start_date, end_date, 100):
+                stored_hits.append({**{k: doc.get(k) for k in FEED_PROJECTION}, "id": str(doc["_id"])})
+        except Exception as e:
+            logger.error(f"ERROR: Stored region search failed: {e}")
+
+        # Score provider hits and stored articles together on region + POV terms, else use the POV selection
+        ranked = rank_articles(
+            f"{district} {state}", region_results + stored_hits + article_data, top_k=50, extra_terms=pov_keywords
+        )
+        articles_for_ai = ranked if len(ranked) >= 8 else article_data
+    else:
+        articles_for_ai = article_data
+
+    return articles_for_ai
 
 @app.post("/smart-feed")
 async def get_smart_feed(
     pov: str = Query("general public", description="Perspective like finance, student, exam, etc."),
-    days: int = Query(7, description="Limit analysis to articles from the last N days"),
+    days: int = Query(7, description="Limit analysis to articles from the last N days (snapped up to 1/3/7/14/30)"),
     state: str = Query("", description="Optional Indian state to focus on"),
-    district: str = Query("", description="Optional district/city to focus on")
+    district: str = Query("", description="Optional district/city to focus on"),
+    stream: bool = Query(False, description="Stream the analysis as Server-Sent Events")
 ):
-    """Generate AI-powered smart feed based on saved articles and perspective."""
+    """Smart feed for a perspective, served from its precomputed digest when the selected articles are unchanged."""
     try:
         if not MONGODB_AVAILABLE:
             raise HTTPException(status_code=500, detail="Database not available")
 
-        from datetime import timedelta
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        days = smart_digests.days_bucket(days)
+        articles_for_ai = await collect_smart_feed_articles(pov, days, state, district)
 
-        articles = list(
-            news_collection
-            .find({"fetchedAt": {"$gte": start_date, "$lte": end_date}})
-            .sort("fetchedAt", -1)
-        )
+        logger.info(f"ANALYZE: Smart feed for perspective: {pov} from {len(articles_for_ai)} candidates over last {days} days")
+        if stream and llm_gateway.is_configured():
+            prepared = smart_digests.prepare(pov, days, state, district, articles_for_ai)
+            digest = await smart_digests.load(prepared)
 
-        if not articles:
-            # Try to fetch some news first
-            logger.info("No articles found, fetching fresh news...")
-            await get_news("general")
-            articles = list(
-                news_collection
-                .find({"fetchedAt": {"$gte": start_date, "$lte": end_date}})
-                .sort("fetchedAt", -1)
-            )
+            if smart_digests.is_fresh(digest, prepared):
+                async def cached_events():
+                    yield format_event(smart_digests.response(digest, pov), "done")
+                return event_stream_response(cached_events())
 
-        if not articles:
-            raise HTTPException(status_code=404, detail="No news articles found in database. Please fetch news first.")
+            request_ctx = prepared["request_ctx"]
 
-        # Convert MongoDB documents to dict for AI analysis (unfiltered)
-        article_data = []
-        for article in articles:
-            article_data.append({
-                "title": article.get("title", ""),
-                "description": article.get("description", ""),
-                "url": article.get("url", ""),
-                "source": article.get("source", ""),
-                "category": article.get("category", ""),
-                "publishedAt": article.get("publishedAt", "")
-            })
+            async def finish_feed(content: str) -> Dict[str, Any]:
+                stored = await smart_digests.save(prepared, finalize_smart_analysis(content.strip(), request_ctx))
+                return smart_digests.response(stored, pov)
 
-        # Region-targeted fetch using SERP or NewsData.io when state/district provided
-        articles_for_ai = []
-        if state or district:
-            # POV-specific keyword enrichment
-            pov_kw_map = {
-                "women commission": [
-                    "women", "women safety", "crime against women", "sexual assault",
-                    "harassment", "domestic violence", "trafficking", "women commission"
-                ],
-                "assistant commissioner of police": [
-                    "police", "law and order", "crime", "cybercrime", "enforcement",
-                    "FIR", "investigation", "arrest"
-                ],
-                "ias officer": [
-                    "governance", "administration", "implementation", "compliance",
-                    "scheme", "policy", "district magistrate", "collector"
-                ],
-                "economist": [
-                    "economy", "inflation", "employment", "GDP", "trade",
-                    "investment", "markets", "industry"
-                ],
-                "social worker": [
-                    "welfare", "community", "NGO", "beneficiary", "child protection",
-                    "education", "health", "poverty"
-                ],
-                "block president": [
-                    "local development", "infrastructure", "roads", "school",
-                    "health center", "panchayat", "block", "gram"
-                ],
-            }
+            return event_stream_response(completion_events(
+                llm_gateway.stream_chat_completion(request_ctx["messages"], **SMART_ANALYSIS_LLM_PARAMS),
+                finish_feed,
+                transform=clean_stream_chunk
+            ))
 
-            pov_key = (pov or "").strip().lower()
-            pov_keywords = pov_kw_map.get(pov_key, [])
-            base_terms = [
-                (district.strip() if district else ""),
-                (state.strip() if state else ""),
-                "India",
-            ]
-            region_query = " ".join([p for p in base_terms + pov_keywords if p])
-            region_results = []
-            try:
-                if SERP_API_KEY and region_query:
-                    serp_url = "https://serpapi.com/search.json"
-                    serp_params = {
-                        "api_key": SERP_API_KEY,
-                        "engine": "google_news",
-                        "q": region_query,
-                        "gl": "in",
-                        "hl": "en",
-                        "num": 50
-                    }
-                    logger.info(f"REGION: SERP search for '{region_query}'")
-                    serp_response = requests.get(serp_url, params=serp_params, timeout=15)
-                    if serp_response.status_code == 200:
-                        serp_data = serp_response.json()
-                        news_results = serp_data.get("news_results", [])
-                        for item in news_results:
-                            title = item.get("title", "")
-                            snippet = item.get("snippet", "")
-                            link = item.get("link", "")
-                            source = item.get("source", {}).get("name", "Unknown") if isinstance(item.get("source"), dict) else "Unknown"
-                            date = item.get("date", "")
-                            text = f"{title} {snippet}".lower()
-                            relevant = True
-                            if pov_keywords:
-                                relevant = any(k.lower() in text for k in pov_keywords)
-                            if title and link and relevant:
-                                region_results.append({
-                                    "title": title,
-                                    "description": snippet or title,
-                                    "url": link,
-                                    "source": source,
-                                    "category": "general",
-                                    "publishedAt": date or datetime.utcnow().isoformat()
-                                })
-                # Fallback to NewsData.io keyword search
-                if not region_results and NEWS_API_KEY and region_query:
-                    nd_url = "https://newsdata.io/api/1/latest"
-                    nd_params = {
-                        "apikey": NEWS_API_KEY,
-                        "language": "en",
-                        "country": "in",
-                        "q": region_query,
-                        "size": 10
-                    }
-                    logger.info(f"REGION: NewsData keyword search for '{region_query}'")
-                    nd_response = requests.get(nd_url, params=nd_params, timeout=10)
-                    if nd_response.status_code == 200:
-                        nd_data = nd_response.json()
-                        results = nd_data.get("results", [])
-                        for item in results:
-                            title = item.get("title")
-                            link = item.get("link")
-                            if not title or not link:
-                                continue
-                            text = f"{title} {item.get('description','')}".lower()
-                            relevant = True
-                            if pov_keywords:
-                                relevant = any(k.lower() in text for k in pov_keywords)
-                            if not relevant:
-                                continue
-                            region_results.append({
-                                "title": title,
-                                "description": item.get("description", ""),
-                                "url": link,
-                                "source": item.get("source_id", "Unknown"),
-                                "category": "general",
-                                "publishedAt": item.get("pubDate", "")
-                            })
-            except Exception as e:
-                logger.error(f"ERROR: Region fetch failed: {e}")
-
-            if region_results and len(region_results) >= 8:
-                articles_for_ai = region_results[:50]
-            else:
-                # Soft filter from DB, else use all recent
-                filtered = []
-                s = (state or "").strip().lower()
-                d = (district or "").strip().lower()
-                for a in article_data:
-                    t = a.get("title", "").lower()
-                    desc = (a.get("description", "") or "").lower()
-                    if (s and (s in t or s in desc)) or (d and (d in t or d in desc)):
-                        filtered.append(a)
-                articles_for_ai = filtered if filtered and len(filtered) >= 8 else article_data
-        else:
-            articles_for_ai = article_data
-
-        logger.info(f"ANALYZE: Analyzing {len(articles_for_ai)} articles for perspective: {pov} from last {days} days")
-        summary = smart_analyse(articles_for_ai, pov, region_context={"state": state, "district": district})
-
-        return {
-            "status": "success",
-            "perspective": pov,
-            "articlesAnalyzed": len(articles_for_ai),
-            "summary": summary
-        }
+        return await smart_digests.get_digest(pov, days, state, district, articles_for_ai)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -809,13 +980,9 @@ async def analyze_narrative(request: NarrativeRequest):
         else:
             # Only check database if SERP not available
             logger.info(f"INFO: SERP not available, checking database...")
-            articles = list(news_collection.find({
-                "$or": [
-                    {"title": {"$regex": topic, "$options": "i"}},
-                    {"description": {"$regex": topic, "$options": "i"}}
-                ],
-                "fetchedAt": {"$gte": start_date, "$lte": end_date}
-            }).sort("fetchedAt", -1).limit(20))
+            articles = await asyncio.to_thread(
+                search_articles, news_collection, topic, start_date, end_date, 20
+            )
             logger.info(f"STATS: Database: Found {len(articles)} articles")
 
         # SERP API: Fetch fresh data from Google News
@@ -835,7 +1002,7 @@ async def analyze_narrative(request: NarrativeRequest):
                 }
                 
                 logger.info(f"SEARCH: Searching Google News for: '{topic}'")
-                serp_response = requests.get(serp_url, params=serp_params, timeout=15)
+                serp_response = await provider_cache.get("serp", serp_url, params=serp_params, timeout=15)
                 
                 logger.info(f"API: SERP API response status: {serp_response.status_code}")
                 
@@ -845,10 +1012,7 @@ async def analyze_narrative(request: NarrativeRequest):
                     
                     logger.info(f"SUCCESS: SERP API returned {len(news_results)} news results")
                     
-                    seen_urls = {a["url"] for a in articles}
-                    keywords = [word.lower() for word in topic.split() if len(word) > 2]
-                    
-                    serp_added = 0
+                    serp_candidates = []
                     for item in news_results:
                         title = item.get("title", "")
                         snippet = item.get("snippet", "")
@@ -856,39 +1020,42 @@ async def analyze_narrative(request: NarrativeRequest):
                         source = item.get("source", {}).get("name", "Unknown") if isinstance(item.get("source"), dict) else "Unknown"
                         date = item.get("date", "")
                         thumbnail = item.get("thumbnail", "")
-                        
-                        if title and link and link not in seen_urls:
-                            # Verify relevance
-                            text = f"{title} {snippet}".lower()
-                            matches = sum(1 for word in keywords if word in text)
-                            
-                            # Require at least 2 keywords for relevance
-                            required_matches = max(1, min(2, len(keywords)))
-                            
-                            if matches >= required_matches:
-                                article = {
-                                    "title": title,
-                                    "description": snippet or title,
-                                    "url": link,
-                                    "image": thumbnail,
-                                    "source": source,
-                                    "publishedAt": date or datetime.utcnow().isoformat(),
-                                    "category": "general",
-                                    "fetchedAt": datetime.utcnow(),
-                                }
-                                
-                                # Save to database
-                                news_collection.update_one(
-                                    {"url": article["url"]},
-                                    {"$set": article},
-                                    upsert=True
-                                )
-                                
-                                articles.append(article)
-                                seen_urls.add(link)
-                                serp_added += 1
-                    
-                    logger.info(f"SUCCESS: SERP API: {serp_added} articles added from Google News")
+
+                        if title and link:
+                            serp_candidates.append({
+                                "title": title,
+                                "description": snippet or title,
+                                "url": link,
+                                "image": thumbnail,
+                                "source": source,
+                                "publishedAt": date or datetime.utcnow().isoformat(),
+                                "category": "general",
+                                "fetchedAt": datetime.utcnow(),
+                            })
+
+                    # Score SERP and stored candidates together; require 2 topic words (1 for single-word topics)
+                    keywords = tokenize(topic)
+                    required_matches = max(1, min(2, len(keywords)))
+                    stored_urls = {a.get("url") for a in articles}
+                    articles = rank_articles(topic, articles + serp_candidates, top_k=30, min_matched=required_matches)
+
+                    # Save the relevant new SERP hits in one round trip
+                    new_serp = [a for a in articles if a["url"] not in stored_urls]
+                    if new_serp:
+                        # Copies: the signature fields go to MongoDB, not into this response or the prompt
+                        docs = [{k: v for k, v in a.items() if k != "relevance_score"} for a in new_serp]
+
+                        def store_serp():
+                            # Cluster like ingested articles so later pages can join these stories
+                            story_clusters.annotate(news_collection, docs)
+                            news_collection.bulk_write([
+                                UpdateOne({"url": doc["url"]}, {"$set": doc}, upsert=True) for doc in docs
+                            ], ordered=False)
+
+                        await asyncio.to_thread(store_serp)
+                        await http_cache.bump_async("news")
+
+                    logger.info(f"SUCCESS: SERP API: {len(new_serp)} relevant articles added from Google News")
                     logger.info(f"SAVE: After SERP scraping: {len(articles)} total articles")
                 else:
                     logger.error(f"ERROR: SERP API error: {serp_response.status_code} - {serp_response.text[:200]}")
@@ -986,14 +1153,11 @@ Be concise. Return ONLY valid JSON. No markdown, no text outside JSON."""
 
         # Call AI
         try:
-            headers = {
-                "Authorization": f"Bearer {NVIDIA_API_KEY}",
-                "Content-Type": "application/json"
-            }
+            logger.info("AI: Calling AI for analysis...")
 
-            payload = {
-                "model": "qwen/qwen3-coder-480b-a35b-instruct",
-                "messages": [
+            # Extended per-attempt timeout for complex analysis; retries and backoff live in the gateway
+            content = await llm_gateway.chat_completion(
+                [
                     {
                         "role": "system",
                         "content": "You are a data analyst. Return ONLY valid JSON. No markdown, no text outside JSON. Be concise."
@@ -1003,72 +1167,22 @@ Be concise. Return ONLY valid JSON. No markdown, no text outside JSON."""
                         "content": prompt
                     }
                 ],
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "max_tokens": 2000  # Reduced for faster response
-            }
-
-            logger.info("AI: Calling AI for analysis...")
-            
-            # AI call with extended timeout for complex analysis
-            max_retries = 3
-            response = None
-            for attempt in range(max_retries):
-                try:
-                    timeout_seconds = 300  # 5 minutes - enough time for complex analysis
-                    logger.info(f"AI: Attempt {attempt + 1}/{max_retries} (timeout: {timeout_seconds}s)")
-                    response = requests.post(
-                        "https://integrate.api.nvidia.com/v1/chat/completions",
-                        headers=headers,
-                        json=payload,
-                        timeout=timeout_seconds
-                    )
-                    response.raise_for_status()
-                    logger.info("AI: Request successful!")
-                    break
-                except requests.exceptions.Timeout:
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 10
-                        logger.warning(f"AI: Timeout on attempt {attempt + 1}, waiting {wait_time}s before retry...")
-                        import time
-                        time.sleep(wait_time)
-                    else:
-                        logger.error("AI: All attempts timed out - analysis taking too long")
-                        raise
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"AI: Request error on attempt {attempt + 1}: {str(e)}")
-                    if attempt < max_retries - 1:
-                        import time
-                        time.sleep(5)
-                    else:
-                        raise
-            
-            if not response:
-                raise Exception("AI request failed after all retries")
-
-            ai_response = response.json()
-            content = ai_response["choices"][0]["message"]["content"]
+                endpoint="analyze-narrative",
+                validate=llm_gateway.extract_json,
+                temperature=0.3,
+                top_p=0.9,
+                max_tokens=2000,  # Reduced for faster response
+                timeout=300,
+                max_attempts=3,
+            )
 
             logger.info(f"SUCCESS: AI response received ({len(content)} chars)")
             logger.info(f"INFO: First 200 chars: {content[:200]}")
 
-            # Parse JSON with better error handling
-            import json
-            import re
-
             try:
-                # Try to find JSON in response
-                json_match = re.search(r'\{[\s\S]*\}', content)
-                if json_match:
-                    json_str = json_match.group(0)
-                    logger.info(f"📦 Found JSON block ({len(json_str)} chars)")
-                    analysis_data = json.loads(json_str)
-                    logger.info(f"SUCCESS: JSON parsed successfully")
-                else:
-                    # Try parsing entire content as JSON
-                    logger.info("WARNING: No JSON block found, trying entire content")
-                    analysis_data = json.loads(content)
-            except json.JSONDecodeError as je:
+                analysis_data = llm_gateway.extract_json(content)
+                logger.info(f"SUCCESS: JSON parsed successfully")
+            except ValueError as je:
                 logger.error(f"ERROR: JSON parsing failed: {je}")
                 logger.error(f"FILE: Content: {content[:500]}")
                 # Return a fallback response
@@ -1152,7 +1266,7 @@ Be concise. Return ONLY valid JSON. No markdown, no text outside JSON."""
 
 # Try importing comprehensive URL narrative analyzer
 try:
-    from utils.url_narrative_analyzer import analyze_url_narrative
+    from utils.url_narrative_analyzer import analyze_url_narrative, extract_article_content
     URL_NARRATIVE_AVAILABLE = True
     logger.info("SUCCESS: URL narrative analyzer module loaded")
 except ImportError as e:
@@ -1176,8 +1290,8 @@ async def analyze_url_narrative_endpoint(request: URLNarrativeRequest):
         
         logger.info(f"SEARCH: Starting URL narrative analysis for: '{url}'")
         
-        # Use the comprehensive URL narrative analyzer
-        result = await analyze_url_narrative(url, SERP_API_KEY, NVIDIA_API_KEY)
+        # Use the comprehensive URL narrative analyzer, through the canonical-URL result cache
+        result = await narrative_cache.get_analysis(url, SERP_API_KEY, NVIDIA_API_KEY, enrich=request.enrich)
         
         logger.info(f"STATS: Analysis result status: {result.get('status')}")
         
@@ -1240,7 +1354,7 @@ async def web_search_for_context(query: str) -> dict:
             "gl": "in"
         }
         
-        response = requests.get(serp_url, params=params, timeout=10)
+        response = await provider_cache.get("serp", serp_url, params=params, timeout=10)
         
         all_results = []
         sources = []
@@ -1273,8 +1387,103 @@ async def web_search_for_context(query: str) -> dict:
         logger.error(f"TUTOR: Web search failed: {str(e)}")
         return {"context": "", "sources": []}
 
+TUTOR_LLM_PARAMS = {
+    "endpoint": "ai-tutor",
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "max_tokens": 1000,
+    "timeout": 30,
+    "max_attempts": 2,
+}
+
+def _save_tutor_exchange(request: AITutorRequest, user_message: str, tutor_reply: str,
+                         web_context: str, sources: list) -> Optional[str]:
+    """Persist the user/assistant turn and return the chat_id (None when not saved)."""
+    # Save to MongoDB with enhanced chat session support
+    if request.user_id and MONGODB_AVAILABLE:
+        try:
+            from bson import ObjectId
+            
+            # Get or create chat session
+            chat_id = request.chat_id
+            
+            if not chat_id:
+                # Create new chat session with smart title
+                chat_sessions_collection = db["ai_tutor_chat_sessions"]
+                
+                # Generate smart title from first message (first 50 chars)
+                title = request.chat_title or user_message[:50]
+                if len(user_message) > 50:
+                    title = title + "..."
+                
+                new_session = {
+                    "user_id": request.user_id,
+                    "title": title,
+                    "created_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow(),
+                    "message_count": 2,
+                    "first_message": user_message[:100]
+                }
+                
+                session_result = chat_sessions_collection.insert_one(new_session)
+                chat_id = str(session_result.inserted_id)
+                logger.info(f"TUTOR: ✅ Created new chat session '{title}' (ID: {chat_id})")
+            
+            # Save messages to chat history
+            chat_messages_collection = db["ai_tutor_messages"]
+            
+            messages_to_save = [
+                {
+                    "chat_id": chat_id,
+                    "user_id": request.user_id,
+                    "role": "user",
+                    "content": user_message,
+                    "timestamp": datetime.utcnow()
+                },
+                {
+                    "chat_id": chat_id,
+                    "user_id": request.user_id,
+                    "role": "assistant",
+                    "content": tutor_reply,
+                    "timestamp": datetime.utcnow(),
+                    "web_search_used": bool(web_context),
+                    "sources": sources if sources else [],
+                    "query_for_search": user_message if web_context else None
+                }
+            ]
+            
+            chat_messages_collection.insert_many(messages_to_save)
+            
+            # Update session metadata
+            chat_sessions_collection = db["ai_tutor_chat_sessions"]
+            chat_sessions_collection.update_one(
+                {"_id": ObjectId(chat_id)},
+                {
+                    "$set": {
+                        "updated_at": datetime.utcnow(),
+                        "last_message": user_message[:100]
+                    },
+                    "$inc": {"message_count": 2}
+                }
+            )
+            
+            logger.info(f"TUTOR: ✅ Saved conversation to database (chat: {chat_id}, web_search: {bool(web_context)})")
+            
+        except Exception as db_error:
+            logger.error(f"TUTOR: ❌ Failed to save chat to MongoDB: {str(db_error)}")
+            chat_id = None
+    else:
+        chat_id = None
+        if not request.user_id:
+            logger.warning(f"TUTOR: ⚠️ No user_id provided - chat not saved to database")
+    
+    return chat_id
+
 @app.post("/ai-tutor")
-async def ai_tutor(request: AITutorRequest):
+async def ai_tutor(
+    request: AITutorRequest,
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events")
+):
     """
     AI-powered Media Literacy Tutor with:
     - RAG (web search for current information)
@@ -1383,110 +1592,34 @@ Keep responses conversational, engaging, and empowering. Use analogies and metap
         })
         
         # Call AI
-        headers = {
-            "Authorization": f"Bearer {NVIDIA_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-                "model": "qwen/qwen3-coder-480b-a35b-instruct",
-            "messages": messages,
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "max_tokens": 1000
-        }
-        
+        if stream:
+            logger.info("TUTOR: Streaming AI response...")
+
+            async def finish_tutor(tutor_reply: str) -> Dict[str, Any]:
+                tutor_reply = tutor_reply.strip()
+                logger.info(f"TUTOR: Streamed response complete ({len(tutor_reply)} chars)")
+                chat_id = await asyncio.to_thread(
+                    _save_tutor_exchange, request, user_message, tutor_reply, web_context, sources
+                )
+                return {
+                    "status": "success",
+                    "response": tutor_reply,
+                    "context_used": bool(web_context),
+                    "sources": sources if sources else [],
+                    "chat_id": chat_id
+                }
+
+            return event_stream_response(completion_events(
+                llm_gateway.stream_chat_completion(messages, **TUTOR_LLM_PARAMS),
+                finish_tutor
+            ))
+
         logger.info("TUTOR: Calling AI for response...")
-        response = requests.post(
-            "https://integrate.api.nvidia.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        ai_response = response.json()
-        tutor_reply = ai_response["choices"][0]["message"]["content"]
+        tutor_reply = await llm_gateway.chat_completion(messages, **TUTOR_LLM_PARAMS)
         
         logger.info(f"TUTOR: Response generated ({len(tutor_reply)} chars)")
         
-        # Save to MongoDB with enhanced chat session support
-        if request.user_id and MONGODB_AVAILABLE:
-            try:
-                from bson import ObjectId
-                
-                # Get or create chat session
-                chat_id = request.chat_id
-                
-                if not chat_id:
-                    # Create new chat session with smart title
-                    chat_sessions_collection = db["ai_tutor_chat_sessions"]
-                    
-                    # Generate smart title from first message (first 50 chars)
-                    title = request.chat_title or user_message[:50]
-                    if len(user_message) > 50:
-                        title = title + "..."
-                    
-                    new_session = {
-                        "user_id": request.user_id,
-                        "title": title,
-                        "created_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow(),
-                        "message_count": 2,
-                        "first_message": user_message[:100]
-                    }
-                    
-                    session_result = chat_sessions_collection.insert_one(new_session)
-                    chat_id = str(session_result.inserted_id)
-                    logger.info(f"TUTOR: ✅ Created new chat session '{title}' (ID: {chat_id})")
-                
-                # Save messages to chat history
-                chat_messages_collection = db["ai_tutor_messages"]
-                
-                messages_to_save = [
-                    {
-                        "chat_id": chat_id,
-                        "user_id": request.user_id,
-                        "role": "user",
-                        "content": user_message,
-                        "timestamp": datetime.utcnow()
-                    },
-                    {
-                        "chat_id": chat_id,
-                        "user_id": request.user_id,
-                        "role": "assistant",
-                        "content": tutor_reply,
-                        "timestamp": datetime.utcnow(),
-                        "web_search_used": bool(web_context),
-                        "sources": sources if sources else [],
-                        "query_for_search": user_message if web_context else None
-                    }
-                ]
-                
-                chat_messages_collection.insert_many(messages_to_save)
-                
-                # Update session metadata
-                chat_sessions_collection = db["ai_tutor_chat_sessions"]
-                chat_sessions_collection.update_one(
-                    {"_id": ObjectId(chat_id)},
-                    {
-                        "$set": {
-                            "updated_at": datetime.utcnow(),
-                            "last_message": user_message[:100]
-                        },
-                        "$inc": {"message_count": 2}
-                    }
-                )
-                
-                logger.info(f"TUTOR: ✅ Saved conversation to database (chat: {chat_id}, web_search: {bool(web_context)})")
-                
-            except Exception as db_error:
-                logger.error(f"TUTOR: ❌ Failed to save chat to MongoDB: {str(db_error)}")
-                chat_id = None
-        else:
-            chat_id = None
-            if not request.user_id:
-                logger.warning(f"TUTOR: ⚠️ No user_id provided - chat not saved to database")
+        chat_id = _save_tutor_exchange(request, user_message, tutor_reply, web_context, sources)
         
         return {
             "status": "success",
@@ -1503,37 +1636,32 @@ Keep responses conversational, engaging, and empowering. Use analogies and metap
         raise HTTPException(status_code=500, detail=f"AI Tutor failed: {str(e)}")
 
 @app.get("/ai-tutor/chats/{user_id}")
-async def get_user_chats(user_id: str, limit: int = Query(20, description="Number of chats to return")):
-    """Get all chat sessions for a user."""
+async def get_user_chats(
+    user_id: str,
+    limit: int = Query(20, ge=1, le=pagination.MAX_LIMIT, description="Number of chats to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("list", pattern="^(list|detail)$", description="list (sidebar fields) or detail (full session)")
+):
+    """Get a user's chat sessions, most recently active first."""
     logger.info(f"TUTOR: Fetching chat sessions for user {user_id}")
     
     try:
         if not MONGODB_AVAILABLE:
             raise HTTPException(status_code=503, detail="Database not available")
         
-        chat_sessions_collection = db["ai_tutor_chat_sessions"]
-        
-        # Get all chat sessions for user
-        sessions = list(chat_sessions_collection.find(
-            {"user_id": user_id}
-        ).sort("updated_at", -1).limit(limit))
-        
-        # Convert ObjectId to string
-        for session in sessions:
-            session["_id"] = str(session["_id"])
-            session["created_at"] = session["created_at"].isoformat() if isinstance(session.get("created_at"), datetime) else session.get("created_at")
-            session["updated_at"] = session["updated_at"].isoformat() if isinstance(session.get("updated_at"), datetime) else session.get("updated_at")
+        page = await pagination.paginate(
+            read_db["ai_tutor_chat_sessions"], {"user_id": user_id}, "updated_at",
+            limit=limit, cursor=cursor, projection=CHAT_SESSION_FIELDS[fields]
+        )
         
-        logger.info(f"TUTOR: Found {len(sessions)} chat sessions")
+        logger.info(f"TUTOR: Found {len(page['items'])} chat sessions")
         
-        return {
-            "status": "success",
-            "chats": sessions,
-            "count": len(sessions)
-        }
+        return pagination.envelope("chats", page, fields)
         
     except HTTPException:
         raise
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"TUTOR: Error fetching chats: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch chats: {str(e)}")
@@ -1547,12 +1675,10 @@ async def get_chat_messages(chat_id: str):
         if not MONGODB_AVAILABLE:
             raise HTTPException(status_code=503, detail="Database not available")
         
-        chat_messages_collection = db["ai_tutor_messages"]
-        
         # Get all messages for this chat
-        messages = list(chat_messages_collection.find(
-            {"chat_id": chat_id}
-        ).sort("timestamp", 1))
+        messages = await database.find_many(
+            read_db["ai_tutor_messages"], {"chat_id": chat_id}, sort=[("timestamp", 1)]
+        )
         
         # Format messages
         formatted_messages = []
@@ -1696,9 +1822,45 @@ async def health_check():
             "url_narrative": "available" if URL_NARRATIVE_AVAILABLE else "not available",
             "ai_tutor": "available" if NVIDIA_API_KEY else "not available"
         },
+        "llm_gateway": llm_gateway.get_stats(),
+        "llm_cache": llm_cache.get_stats(),
+        "provider_cache": provider_cache.get_stats(),
+        "smart_digests": smart_digests.get_stats(),
+        "http_cache": http_cache.get_stats(),
+        "article_enrichment": article_enrichment.get_stats(),
+        "narrative_cache": narrative_cache.get_stats(),
+        "newsdata_rate_limit": newsdata_limiter.get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
+# ---------------- ADMIN ---------------- #
+
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+def _require_admin(admin_key: Optional[str]):
+    if ADMIN_API_KEY and admin_key != ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+@app.get("/admin/indexes")
+async def admin_index_report(x_admin_key: Optional[str] = Header(None)):
+    """Index usage ($indexStats) and explain plans for the hot queries; flags collection scans."""
+    _require_admin(x_admin_key)
+    try:
+        if not MONGODB_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Database not available")
+        report = await asyncio.to_thread(indexes.index_report, db)
+        return {"status": "success", **report}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"ADMIN: Index report failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to build index report: {str(e)}")
+
+@app.get("/ingestion/status")
+async def ingestion_status():
+    """Last-run status and data lag for every background ingestion and retention job."""
+    return {"status": "success", **ingestion_scheduler.get_status(), "timestamp": datetime.utcnow().isoformat()}
+
 # ---------------- LMS MODULE ---------------- #
 
 # Import and initialize LMS endpoints
@@ -1707,7 +1869,7 @@ try:
     
     # Initialize LMS with shared database connection
     if MONGODB_AVAILABLE:
-        init_lms(db)
+        init_lms(db, async_db)
         app.include_router(lms_router)
         logger.info("SUCCESS: LMS module loaded and initialized")
     else:
@@ -1732,6 +1894,7 @@ async def root():
             "refresh": "/refresh-news?category=general - Fetch fresh news from API + update DB",
             "fetch_fresh": "/fetch-fresh-news?category=general - Fetch fresh from API only",
             "saved_news": "/saved-news?category=all - Get all saved articles",
+            "search_news": "/search-news?q=\"farm laws\" protest - Full-text search of saved articles",
             "smart_feed": "/smart-feed?pov=general public - AI analysis",
             "health": "/health - Service health check",
             "analyze": "/analyze - Analyze journalist",
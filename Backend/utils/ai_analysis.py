@@ -4,12 +4,13 @@ Comprehensive journalist profile and transparency analysis using NVIDIA AI
 """
 
 from fastapi import HTTPException
-from openai import OpenAI
-import os
+import asyncio
 import logging
 import json
 from typing import Dict, Any, List, Optional
 
+from utils import llm_gateway
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -19,24 +20,19 @@ logger = logging.getLogger("ai_analysis")
 USER_AGENT = "DataHaloBot/1.0"
 
 # ============================================================================
-# NVIDIA CLIENT INITIALIZATION
+# NVIDIA CONFIGURATION CHECK
 # ============================================================================
 
-def _get_nvidia_client():
+def _require_nvidia_key():
     """
-    Initialize OpenAI client for NVIDIA API.
     Ensures NVIDIA_API_KEY is present before making calls.
+    Requests themselves go through utils.llm_gateway.
     """
-    key = os.getenv("NVIDIA_API_KEY")
-    if not key:
+    if not llm_gateway.is_configured():
         raise HTTPException(
             status_code=500,
             detail="NVIDIA_API_KEY not set in environment variables!"
         )
-    return OpenAI(
-        base_url="https://integrate.api.nvidia.com/v1",
-        api_key=key
-    )
 
 # ============================================================================
 # DATA PREPARATION
@@ -455,7 +451,7 @@ def calculate_halo_score(name: str, data: dict) -> dict:
 # AI ANALYSIS
 # ============================================================================
 
-def analyze_journalist(name: str, data: dict) -> Dict[str, Any]:
+async def analyze_journalist(name: str, data: dict) -> Dict[str, Any]:
     """
     Comprehensive AI-powered analysis of journalist profile and transparency patterns.
     
@@ -700,14 +696,13 @@ NOW GENERATE THE COMPLETE JSON ANALYSIS:
 """
     
     # Call NVIDIA API
-    client = _get_nvidia_client()
+    _require_nvidia_key()
     
     try:
         logger.info(f"Sending analysis request to NVIDIA API for: {name}")
         
-        completion = client.chat.completions.create(
-            model="qwen/qwen3-coder-480b-a35b-instruct",
-            messages=[
+        response_text = await llm_gateway.chat_completion(
+            [
                 {
                     "role": "system",
                     "content": "You are DataHalo AI - an expert journalism analyst. Respond ONLY with valid JSON following the exact structure provided. Do NOT include markdown formatting, code blocks, or explanations outside the JSON structure."
@@ -717,26 +712,19 @@ NOW GENERATE THE COMPLETE JSON ANALYSIS:
                     "content": prompt
                 }
             ],
+            endpoint="journalist-profile",
+            validate=llm_gateway.extract_json,
             temperature=0.3,  # Lower for more factual responses
             max_tokens=4000,
             top_p=0.9,
-            stream=False
+            timeout=300,
+            max_attempts=2,
         )
-        
-        response_text = completion.choices[0].message.content.strip()
         logger.info(f"Received response from NVIDIA API ({len(response_text)} chars)")
         
         # Extract JSON from response
         try:
-            # Find JSON boundaries
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                response_text = response_text[json_start:json_end]
-            
-            # Parse JSON
-            result = json.loads(response_text)
+            result = llm_gateway.extract_json(response_text)
             
             # Validate required fields
             required_fields = [
@@ -774,7 +762,7 @@ NOW GENERATE THE COMPLETE JSON ANALYSIS:
             logger.info(f"SUCCESS: Successfully analyzed journalist: {name}")
             return result
             
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             logger.error(f"JSON parsing error: {str(e)}")
             logger.error(f"Response text (first 500 chars): {response_text[:500]}")
             raise HTTPException(
@@ -782,60 +770,73 @@ NOW GENERATE THE COMPLETE JSON ANALYSIS:
                 detail=f"AI returned invalid JSON: {str(e)}. Please retry."
             )
     
-    except Exception as e:
+    except HTTPException:
+        raise
+    except llm_gateway.LLMTimeoutError:
+        logger.error(f"NVIDIA API timeout for {name}")
+        raise HTTPException(
+            status_code=504,
+            detail="API request timed out. Please try again."
+        )
+    except llm_gateway.LLMResponseError as e:
         logger.error(f"NVIDIA API error for {name}: {str(e)}")
         
-        # Check for specific error types
-        error_str = str(e).lower()
-        if any(x in error_str for x in ["403", "authorization", "forbidden", "unauthorized"]):
+        # Map provider status codes
+        if e.status_code in (401, 403):
             raise HTTPException(
                 status_code=401,
                 detail="NVIDIA API authorization failed. Please check your API key and permissions."
             )
-        elif "rate limit" in error_str or "429" in error_str:
+        elif e.status_code == 429:
             raise HTTPException(
                 status_code=429,
                 detail="API rate limit exceeded. Please try again later."
             )
-        elif "timeout" in error_str:
-            raise HTTPException(
-                status_code=504,
-                detail="API request timed out. Please try again."
-            )
         else:
             raise HTTPException(
                 status_code=500,
                 detail=f"AI analysis failed: {str(e)}"
             )
+    except Exception as e:
+        logger.error(f"NVIDIA API error for {name}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"AI analysis failed: {str(e)}"
+        )
 
 # ============================================================================
 # BATCH ANALYSIS (for multiple journalists)
 # ============================================================================
 
-def analyze_journalists_batch(journalists_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def analyze_journalists_batch(journalists_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Analyze multiple journalists in batch.
+    Analyze multiple journalists concurrently.
+    The LLM gateway caps how many run against the API at once.
     
     Args:
         journalists_data: List of journalist data dictionaries
     
     Returns:
-        List of analysis results
+        List of analysis results (same order as input)
     """
-    results = []
+    names = [data.get('name', 'Unknown') for data in journalists_data]
+    outcomes = await asyncio.gather(
+        *(analyze_journalist(name, data) for name, data in zip(names, journalists_data)),
+        return_exceptions=True
+    )
     
-    for data in journalists_data:
-        name = data.get('name', 'Unknown')
-        try:
-            result = analyze_journalist(name, data)
-            results.append(result)
-            logger.info(f"SUCCESS: Batch analysis complete for: {name}")
-        except Exception as e:
-            logger.error(f"✗ Batch analysis failed for {name}: {str(e)}")
+    results = []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            error = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+            logger.error(f"✗ Batch analysis failed for {name}: {error}")
             results.append({
                 "name": name,
-                "error": str(e),
+                "error": error,
                 "status": "failed"
             })
+        else:
+            logger.info(f"SUCCESS: Batch analysis complete for: {name}")
+            results.append(outcome)
     
-    return results
\ No newline at end of file
+    return results
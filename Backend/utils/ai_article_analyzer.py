@@ -5,31 +5,36 @@ import os
 import re
 import json
 import logging
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
+from utils import llm_gateway
+
 logger = logging.getLogger("DataHalo")
 
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
 
-def analyze_article_with_ai(article_text: str) -> Dict[str, Any]:
-    """
-    FAST AI-POWERED ARTICLE ANALYZER (ATS-like for Journalism)
-    
-    Like an ATS system for resumes, this analyzes articles against
-    professional journalism standards FAST and gives actionable scores.
-    
-    Uses Qwen3 Coder 480B model - optimized for speed and accuracy.
-    Typical response time: 5-15 seconds for comprehensive analysis.
-    """
-    
-    if not NVIDIA_API_KEY:
-        return {
-            "status": "error",
-            "message": "AI analysis requires NVIDIA API key for credible evaluation."
-        }
-    
+_SCORES_LINE = re.compile(r'SCORES:\s*\w+=\d+', re.IGNORECASE)
+
+
+def has_scores(content: str) -> bool:
+    """A grading reply is usable (and cacheable) once it carries its SCORES line."""
+    return bool(_SCORES_LINE.search(content or ""))
+
+
+ANALYSIS_LLM_PARAMS = {
+    "endpoint": "analyze-article",
+    "temperature": 0.3,  # Balanced for quality and speed
+    "top_p": 0.9,
+    "max_tokens": 500,  # Enough for complete response
+    "timeout": 45,  # Qwen is fast but give it buffer for complex articles
+    "max_attempts": 1,
+    "validate": has_scores,
+}
+
+
+def build_analysis_request(article_text: str) -> Tuple[List[Dict[str, str]], Dict[str, float]]:
+    """Compute objective article stats and build the grading prompt (shared by the streaming path)."""
     word_count = len(article_text.split())
     
     # Quick stats (objective metrics)
@@ -62,182 +67,198 @@ STRENGTHS: good point 1 | good point 2
 ISSUES: problem 1 | problem 2
 FIXES: how to improve 1 | how to improve 2"""
 
-    try:
-        headers = {
-            "Authorization": f"Bearer {NVIDIA_API_KEY}",
-            "Content-Type": "application/json"
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a journalism professor grading articles. Be concise and direct. Return plain text in the exact format requested."
+        },
+        {
+            "role": "user",
+            "content": prompt
         }
+    ]
+    stats = {
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "avg_sentence_length": avg_sentence_length,
+        "flesch_score": flesch_score
+    }
+    return messages, stats
 
-        payload = {
-            "model": "qwen/qwen3-coder-480b-a35b-instruct",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a journalism professor grading articles. Be concise and direct. Return plain text in the exact format requested."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.3,  # Balanced for quality and speed
-            "top_p": 0.9,
-            "max_tokens": 500,  # Enough for complete response
-            "stream": False
-        }
 
-        logger.info("AI: Calling Qwen AI (optimized for speed and efficiency)...")
-        
-        # Qwen model timeout - faster and more reliable
-        response = requests.post(
-            "https://integrate.api.nvidia.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=45  # Qwen is fast but give it buffer for complex articles
-        )
-        response.raise_for_status()
+def parse_analysis_response(content: str, stats: Dict[str, float]) -> Dict[str, Any]:
+    """Turn the plain-text grading reply into the analysis payload the frontend expects."""
+    word_count = stats["word_count"]
+    sentence_count = stats["sentence_count"]
+    avg_sentence_length = stats["avg_sentence_length"]
+    flesch_score = stats["flesch_score"]
 
-        ai_response = response.json()
-        content = ai_response["choices"][0]["message"]["content"]
+    # Parse simple text format (faster than JSON parsing)
+    ai_result = {}
+    
+    try:
+        # Extract scores line
+        scores_match = re.search(r'SCORES:\s*(.+)', content, re.IGNORECASE)
+        if scores_match:
+            scores_text = scores_match.group(1)
+            scores_dict = {}
+            for match in re.finditer(r'(\w+)=(\d+)', scores_text):
+                scores_dict[match.group(1)] = int(match.group(2))
+            ai_result["scores"] = scores_dict
         
-        logger.info(f"AI: Received response ({len(content)} chars)")
-
-        # Parse simple text format (faster than JSON parsing)
-        ai_result = {}
+        # Extract grade
+        grade_match = re.search(r'GRADE:\s*([A-F][+-]?)', content, re.IGNORECASE)
+        if grade_match:
+            ai_result["letter_grade"] = grade_match.group(1)
         
-        try:
-            # Extract scores line
-            scores_match = re.search(r'SCORES:\s*(.+)', content, re.IGNORECASE)
-            if scores_match:
-                scores_text = scores_match.group(1)
-                scores_dict = {}
-                for match in re.finditer(r'(\w+)=(\d+)', scores_text):
-                    scores_dict[match.group(1)] = int(match.group(2))
-                ai_result["scores"] = scores_dict
-            
-            # Extract grade
-            grade_match = re.search(r'GRADE:\s*([A-F][+-]?)', content, re.IGNORECASE)
-            if grade_match:
-                ai_result["letter_grade"] = grade_match.group(1)
-            
-            # Extract summary
-            summary_match = re.search(r'SUMMARY:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-            if summary_match:
-                ai_result["summary"] = summary_match.group(1).strip()
-            
-            # Extract strengths
-            strengths_match = re.search(r'STRENGTHS:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-            if strengths_match:
-                ai_result["strengths"] = [s.strip() for s in strengths_match.group(1).split('|')]
-            
-            # Extract issues
-            issues_match = re.search(r'ISSUES:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-            if issues_match:
-                issues_text = issues_match.group(1).split('|')
-                ai_result["issues"] = [{"issue": i.strip(), "severity": "medium", "fix": "Review and revise"} for i in issues_text]
-            
-            # Extract fixes
-            fixes_match = re.search(r'FIXES:\s*(.+)', content, re.IGNORECASE)
-            if fixes_match:
-                ai_result["top_improvements"] = [f.strip() for f in fixes_match.group(1).split('|')]
-            
-            # Calculate overall score
-            if "scores" in ai_result and ai_result["scores"]:
-                scores_list = list(ai_result["scores"].values())
-                ai_result["overall_score"] = round(sum(scores_list) / len(scores_list))
-            else:
-                raise ValueError("No scores found in AI response")
-                
-        except Exception as parse_error:
-            logger.error(f"AI: Failed to parse response: {parse_error}")
-            logger.error(f"AI: Content was: {content}")
-            raise ValueError(f"Could not parse AI response: {parse_error}")
-
-        # Add article stats
-        ai_result["article_stats"] = {
-            "word_count": word_count,
-            "sentence_count": sentence_count,
-            "avg_sentence_length": round(avg_sentence_length, 1),
-            "readability_score": round(flesch_score, 1)
-        }
+        # Extract summary
+        summary_match = re.search(r'SUMMARY:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+        if summary_match:
+            ai_result["summary"] = summary_match.group(1).strip()
         
-        # Expand scores into detailed breakdown for frontend compatibility
-        if "scores" in ai_result:
-            ai_result["score_breakdown"] = {
-                "objectivity": ai_result["scores"].get("objectivity", 0),
-                "source_quality": ai_result["scores"].get("sources", 0),
-                "factual_accuracy": ai_result["scores"].get("accuracy", 0),
-                "writing_clarity": ai_result["scores"].get("clarity", 0),
-                "ethical_standards": ai_result["scores"].get("ethics", 0),
-                "context_completeness": ai_result["scores"].get("context", 0),
-                "structure_flow": ai_result["scores"].get("structure", 0),
-                "headline_quality": ai_result["scores"].get("headline", 0)
-            }
+        # Extract strengths
+        strengths_match = re.search(r'STRENGTHS:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+        if strengths_match:
+            ai_result["strengths"] = [s.strip() for s in strengths_match.group(1).split('|')]
         
-        # Normalize field names for frontend
-        if "summary" in ai_result:
-            ai_result["one_line_summary"] = ai_result["summary"]
+        # Extract issues
+        issues_match = re.search(r'ISSUES:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+        if issues_match:
+            issues_text = issues_match.group(1).split('|')
+            ai_result["issues"] = [{"issue": i.strip(), "severity": "medium", "fix": "Review and revise"} for i in issues_text]
         
-        # Transform issues into detailed_issues format (required by frontend)
-        if "issues" in ai_result:
-            ai_result["critical_issues"] = [issue["issue"] if isinstance(issue, dict) else str(issue) for issue in ai_result["issues"]]
-            ai_result["detailed_issues"] = ai_result["issues"]  # Frontend expects this
-        else:
-            ai_result["critical_issues"] = []
-            ai_result["detailed_issues"] = []
+        # Extract fixes
+        fixes_match = re.search(r'FIXES:\s*(.+)', content, re.IGNORECASE)
+        if fixes_match:
+            ai_result["top_improvements"] = [f.strip() for f in fixes_match.group(1).split('|')]
         
-        # Transform top_improvements into improvement_actions format (required by frontend)
-        if "top_improvements" in ai_result:
-            ai_result["top_3_improvements"] = ai_result["top_improvements"]
-            # Frontend expects improvement_actions with specific structure
-            ai_result["improvement_actions"] = [
-                {
-                    "priority": "medium",
-                    "issue": improvement,
-                    "how_to_fix": improvement
-                }
-                for improvement in ai_result["top_improvements"]
-            ]
+        # Calculate overall score
+        if "scores" in ai_result and ai_result["scores"]:
+            scores_list = list(ai_result["scores"].values())
+            ai_result["overall_score"] = round(sum(scores_list) / len(scores_list))
         else:
-            ai_result["improvement_actions"] = []
+            raise ValueError("No scores found in AI response")
             
-        if "explanation" in ai_result:
-            ai_result["grade_explanation"] = ai_result["explanation"]
-        
-        # Generate comprehensive learning_recommendations with resources
-        if "learning_recommendations" not in ai_result:
-            ai_result["learning_recommendations"] = generate_learning_resources(ai_result, word_count)
-        
-        # Add methodology transparency
-        ai_result["methodology"] = {
-            "analysis_type": "AI-Powered Fast Evaluation (ATS-like)",
-            "model": "Qwen3 Coder 480B A35B Instruct",
-            "approach": "Real AI evaluation against journalism standards - optimized for speed and accuracy",
-            "standards_based_on": [
-                "AP Style Guide",
-                "SPJ Code of Ethics",
-                "Professional journalism standards"
-            ],
-            "speed_optimized": True,
-            "accuracy_note": "This AI analyzes your article like an ATS scans resumes - fast, accurate scoring against professional standards. Use for educational guidance.",
-            "timestamp": datetime.utcnow().isoformat()
+    except Exception as parse_error:
+        logger.error(f"AI: Failed to parse response: {parse_error}")
+        logger.error(f"AI: Content was: {content}")
+        raise ValueError(f"Could not parse AI response: {parse_error}")
+
+    # Add article stats
+    ai_result["article_stats"] = {
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "avg_sentence_length": round(avg_sentence_length, 1),
+        "readability_score": round(flesch_score, 1)
+    }
+    
+    # Expand scores into detailed breakdown for frontend compatibility
+    if "scores" in ai_result:
+        ai_result["score_breakdown"] = {
+            "objectivity": ai_result["scores"].get("objectivity", 0),
+            "source_quality": ai_result["scores"].get("sources", 0),
+            "factual_accuracy": ai_result["scores"].get("accuracy", 0),
+            "writing_clarity": ai_result["scores"].get("clarity", 0),
+            "ethical_standards": ai_result["scores"].get("ethics", 0),
+            "context_completeness": ai_result["scores"].get("context", 0),
+            "structure_flow": ai_result["scores"].get("structure", 0),
+            "headline_quality": ai_result["scores"].get("headline", 0)
         }
+    
+    # Normalize field names for frontend
+    if "summary" in ai_result:
+        ai_result["one_line_summary"] = ai_result["summary"]
+    
+    # Transform issues into detailed_issues format (required by frontend)
+    if "issues" in ai_result:
+        ai_result["critical_issues"] = [issue["issue"] if isinstance(issue, dict) else str(issue) for issue in ai_result["issues"]]
+        ai_result["detailed_issues"] = ai_result["issues"]  # Frontend expects this
+    else:
+        ai_result["critical_issues"] = []
+        ai_result["detailed_issues"] = []
+    
+    # Transform top_improvements into improvement_actions format (required by frontend)
+    if "top_improvements" in ai_result:
+        ai_result["top_3_improvements"] = ai_result["top_improvements"]
+        # Frontend expects improvement_actions with specific structure
+        ai_result["improvement_actions"] = [
+            {
+                "priority": "medium",
+                "issue": improvement,
+                "how_to_fix": improvement
+            }
+            for improvement in ai_result["top_improvements"]
+        ]
+    else:
+        ai_result["improvement_actions"] = []
         
-        # Ensure warnings field exists
-        if "warnings" not in ai_result:
-            ai_result["warnings"] = []
-        
-        # Add warnings for short articles
-        if word_count < 100:
-            ai_result["warnings"].append("Article is short - consider expanding for more comprehensive evaluation")
-        
-        logger.info(f"SUCCESS: AI analysis complete - Score: {ai_result['overall_score']}, Grade: {ai_result.get('letter_grade', 'N/A')}")
-        
+    if "explanation" in ai_result:
+        ai_result["grade_explanation"] = ai_result["explanation"]
+    
+    # Generate comprehensive learning_recommendations with resources
+    if "learning_recommendations" not in ai_result:
+        ai_result["learning_recommendations"] = generate_learning_resources(ai_result, word_count)
+    
+    # Add methodology transparency
+    ai_result["methodology"] = {
+        "analysis_type": "AI-Powered Fast Evaluation (ATS-like)",
+        "model": "Qwen3 Coder 480B A35B Instruct",
+        "approach": "Real AI evaluation against journalism standards - optimized for speed and accuracy",
+        "standards_based_on": [
+            "AP Style Guide",
+            "SPJ Code of Ethics",
+            "Professional journalism standards"
+        ],
+        "speed_optimized": True,
+        "accuracy_note": "This AI analyzes your article like an ATS scans resumes - fast, accurate scoring against professional standards. Use for educational guidance.",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    # Ensure warnings field exists
+    if "warnings" not in ai_result:
+        ai_result["warnings"] = []
+    
+    # Add warnings for short articles
+    if word_count < 100:
+        ai_result["warnings"].append("Article is short - consider expanding for more comprehensive evaluation")
+    
+    logger.info(f"SUCCESS: AI analysis complete - Score: {ai_result['overall_score']}, Grade: {ai_result.get('letter_grade', 'N/A')}")
+    
+    return {
+        "status": "success",
+        "analysis": ai_result,
+        "analysis_type": "ai_fast"
+    }
+
+
+async def analyze_article_with_ai(article_text: str) -> Dict[str, Any]:
+    """
+    FAST AI-POWERED ARTICLE ANALYZER (ATS-like for Journalism)
+    
+    Like an ATS system for resumes, this analyzes articles against
+    professional journalism standards FAST and gives actionable scores.
+    
+    Uses Qwen3 Coder 480B model - optimized for speed and accuracy.
+    Typical response time: 5-15 seconds for comprehensive analysis.
+    """
+    
+    if not NVIDIA_API_KEY:
         return {
-            "status": "success",
-            "analysis": ai_result,
-            "analysis_type": "ai_fast"
+            "status": "error",
+            "message": "AI analysis requires NVIDIA API key for credible evaluation."
         }
+    
+    messages, stats = build_analysis_request(article_text)
+
+    try:
+        logger.info("AI: Calling Qwen AI (optimized for speed and efficiency)...")
+        
+        # Qwen model timeout - faster and more reliable
+        content = await llm_gateway.chat_completion(messages, **ANALYSIS_LLM_PARAMS)
+        
+        logger.info(f"AI: Received response ({len(content)} chars)")
+
+        return parse_analysis_response(content, stats)
 
     except json.JSONDecodeError as e:
         logger.error(f"AI: JSON parsing error: {e}")
@@ -245,7 +266,7 @@ FIXES: how to improve 1 | how to improve 2"""
             "status": "error",
             "message": "AI returned invalid format. Please try again."
         }
-    except requests.exceptions.ReadTimeout:
+    except llm_gateway.LLMTimeoutError:
         logger.error("AI: Analysis timed out after 45s (Qwen model)")
         logger.info("AI: This is rare with Qwen - check API connectivity or article length")
         return {
@@ -7,6 +7,8 @@ import re
 from typing import Dict, List, Any, Tuple
 import math
 
+from utils.lexicon import Lexicon
+
 # Optional advanced features (graceful degradation if not installed)
 try:
     import pyphen
@@ -58,6 +60,7 @@ class ArticleAnalyzerV2:
     ]
 
     def __init__(self):
+        self.lexicon = _ARTICLE_LEXICON
         self.article_text = ""
         self.sentences = []
         self.paragraphs = []
@@ -401,25 +404,21 @@ class ArticleAnalyzerV2:
             "deductions": []
         }
 
-        text_lower = self.article_text.lower()
+        scan = self.lexicon.scan(self.article_text)
 
         # Check for loaded words
-        for word in self.LOADED_WORDS:
-            count = text_lower.count(word)
-            if count > 0:
-                details["loaded_words"].append((word, count))
-                deduction = count * 3
-                score -= deduction
-                details["deductions"].append(f"-{deduction} points: '{word}' used {count} time(s)")
+        for word, count in scan.term_counts("loaded"):
+            details["loaded_words"].append((word, count))
+            deduction = count * 3
+            score -= deduction
+            details["deductions"].append(f"-{deduction} points: '{word}' used {count} time(s)")
 
         # Check for opinion words
-        for word in self.OPINION_WORDS:
-            count = text_lower.count(word)
-            if count > 0:
-                details["opinion_words"].append((word, count))
-                deduction = count * 2
-                score -= deduction
-                details["deductions"].append(f"-{deduction} points: Opinion word '{word}' used {count} time(s)")
+        for word, count in scan.term_counts("opinion"):
+            details["opinion_words"].append((word, count))
+            deduction = count * 2
+            score -= deduction
+            details["deductions"].append(f"-{deduction} points: Opinion word '{word}' used {count} time(s)")
 
         # Check exclamation marks
         exclamation_count = self.article_text.count('!')
@@ -463,10 +462,9 @@ class ArticleAnalyzerV2:
                     details["academic_citations"].extend(matches)
 
         # Check for weak attribution
-        for weak in self.WEAK_ATTRIBUTION:
-            if weak in self.article_text.lower():
-                details["weak_attribution"].append(weak)
-                details["anonymous_sources"].append(weak)
+        for weak in self.lexicon.scan(self.article_text).found("weak_attribution"):
+            details["weak_attribution"].append(weak)
+            details["anonymous_sources"].append(weak)
 
         # Calculate score
         named_count = len(details["named_sources"])
@@ -738,10 +736,7 @@ class ArticleAnalyzerV2:
             score -= 10
 
         # Check for loaded language
-        headline_lower = headline.lower()
-        for word in self.LOADED_WORDS:
-            if word in headline_lower:
-                score -= 5
+        score -= 5 * self.lexicon.scan(headline).distinct("loaded")
 
         return max(0, min(100, score))
 
@@ -833,10 +828,9 @@ class ArticleAnalyzerV2:
     def _generate_detailed_issues(self) -> List[Dict[str, Any]]:
         """Generate detailed issues"""
         issues = []
-        text_lower = self.article_text.lower()
 
         # Loaded language
-        found_loaded = [w for w in self.LOADED_WORDS if w in text_lower]
+        found_loaded = self.lexicon.scan(self.article_text).found("loaded")
         if found_loaded:
             issues.append({
                 "category": "Objectivity",
@@ -861,7 +855,6 @@ class ArticleAnalyzerV2:
     def _generate_improvement_actions(self) -> List[Dict[str, Any]]:
         """Generate improvements"""
         actions = []
-        text_lower = self.article_text.lower()
 
         # Sources
         has_sources = bool(re.search(r'according to|said [A-Z]', self.article_text))
@@ -875,7 +868,7 @@ class ArticleAnalyzerV2:
             })
 
         # Loaded language
-        loaded_found = [w for w in self.LOADED_WORDS if w in text_lower]
+        loaded_found = self.lexicon.scan(self.article_text).found("loaded")
         if loaded_found:
             actions.append({
                 "priority": "high",
@@ -1097,6 +1090,14 @@ class ArticleAnalyzerV2:
         }
 
 
+
+# Built once at import from the class word lists
+_ARTICLE_LEXICON = Lexicon({
+    "loaded": ArticleAnalyzerV2.LOADED_WORDS,
+    "opinion": ArticleAnalyzerV2.OPINION_WORDS,
+    "weak_attribution": ArticleAnalyzerV2.WEAK_ATTRIBUTION,
+}, plurals=True)
+
 def analyze_article(article_text: str) -> Dict[str, Any]:
     """
     Main function to analyze an article (Enhanced V2)
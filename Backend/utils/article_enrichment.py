@@ -0,0 +1,172 @@
+"""
+Related Article Enrichment
+Fetches the full text of the top related articles concurrently so the
+narrative analyzers see article bodies instead of ~20-word search snippets.
+Fetches share a global concurrency cap, are polite per domain (limited
+parallelism and a minimum gap between request starts), and each one has a
+deadline after which the article keeps its snippet. Extracted content is
+cached in memory and concurrent requests for the same URL share one fetch
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urlparse
+
+logger = logging.getLogger("article_enrichment")
+
+ENRICH_TOP_N = int(os.getenv("ENRICH_TOP_N", "8"))
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "6"))
+DOMAIN_CONCURRENCY = int(os.getenv("ENRICH_DOMAIN_CONCURRENCY", "1"))
+# Minimum seconds between request starts to the same domain
+DOMAIN_INTERVAL_S = float(os.getenv("ENRICH_DOMAIN_INTERVAL", "1.0"))
+# Covers waiting for a slot as well as the fetch itself
+ARTICLE_DEADLINE_S = float(os.getenv("ENRICH_ARTICLE_DEADLINE", "8"))
+CONTENT_TTL_S = int(os.getenv("ENRICH_CONTENT_TTL", str(6 * 3600)))
+# Failures are remembered briefly so a dead or blocking site is not retried on every request
+FAILURE_TTL_S = int(os.getenv("ENRICH_FAILURE_TTL", "600"))
+MAX_ENTRIES = int(os.getenv("ENRICH_CACHE_MAX_ENTRIES", "1024"))
+
+Fetch = Callable[[str], Awaitable[Dict[str, Any]]]
+
+_global_limit = asyncio.Semaphore(ENRICH_CONCURRENCY)
+_domain_limits: Dict[str, asyncio.Semaphore] = {}
+_domain_next_start: Dict[str, float] = {}
+_entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+_inflight: Dict[str, asyncio.Task] = {}
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "fetched": 0, "failed": 0, "timeouts": 0}
+
+
+def _cache_key(url: str) -> str:
+    return urldefrag(url.strip())[0]
+
+
+def _domain(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _lookup(key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    entry = _entries.get(key)
+    if entry is None:
+        return False, None
+    expires_at, content = entry
+    if expires_at <= time.time():
+        _entries.pop(key, None)
+        return False, None
+    _entries.move_to_end(key)
+    return True, content
+
+
+def _store(key: str, content: Optional[Dict[str, Any]]):
+    ttl = CONTENT_TTL_S if content else FAILURE_TTL_S
+    _entries[key] = (time.time() + ttl, content)
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+async def _polite_fetch(url: str, fetch: Fetch) -> Dict[str, Any]:
+    domain = _domain(url)
+    domain_limit = _domain_limits.setdefault(domain, asyncio.Semaphore(DOMAIN_CONCURRENCY))
+    async with domain_limit:
+        # Reserve the next start slot before sleeping so queued requests space themselves out
+        now = time.monotonic()
+        start_at = max(now, _domain_next_start.get(domain, 0.0))
+        _domain_next_start[domain] = start_at + DOMAIN_INTERVAL_S
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+        async with _global_limit:
+            return await fetch(url)
+
+
+async def _fetch_content(key: str, url: str, fetch: Fetch) -> Optional[Dict[str, Any]]:
+    try:
+        extracted = await asyncio.wait_for(_polite_fetch(url, fetch), ARTICLE_DEADLINE_S)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        logger.info(f"ENRICH: Deadline hit for {url}")
+        _store(key, None)
+        return None
+    except Exception as e:
+        _stats["failed"] += 1
+        logger.warning(f"ENRICH: Fetch failed for {url}: {e}")
+        _store(key, None)
+        return None
+
+    if not extracted.get("success") or not extracted.get("content"):
+        _stats["failed"] += 1
+        _store(key, None)
+        return None
+
+    _stats["fetched"] += 1
+    content = {
+        "content": extracted["content"],
+        "word_count": extracted.get("word_count", len(extracted["content"].split())),
+        "author": extracted.get("author"),
+        "keywords": extracted.get("keywords", []),
+    }
+    _store(key, content)
+    return content
+
+
+async def get_content(url: str, fetch: Fetch) -> Optional[Dict[str, Any]]:
+    """Full text for `url` from the cache, a fetch already in flight, or a new polite fetch. None if unavailable."""
+    key = _cache_key(url)
+    found, content = _lookup(key)
+    if found:
+        _stats["hits"] += 1
+        return content
+
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+    else:
+        _stats["misses"] += 1
+        task = asyncio.create_task(_fetch_content(key, url, fetch))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def enrich_articles(articles: List[Dict[str, Any]], fetch: Fetch,
+                          top_n: int = ENRICH_TOP_N) -> List[Dict[str, Any]]:
+    """
+    Copy of `articles` where the first `top_n` with a URL carry their full text ('content', 'word_count',
+    'enriched': True). Articles that could not be fetched in time keep their snippet.
+    """
+    targets = [i for i, article in enumerate(articles) if article.get("url")][:max(0, top_n)]
+    if not targets:
+        return list(articles)
+
+    started = time.perf_counter()
+    contents = await asyncio.gather(*(get_content(articles[i]["url"], fetch) for i in targets))
+
+    enriched = list(articles)
+    count = 0
+    for i, content in zip(targets, contents):
+        if not content:
+            continue
+        article = dict(articles[i])
+        article["content"] = content["content"]
+        article["word_count"] = content["word_count"]
+        article["author"] = article.get("author") or content["author"]
+        article["keywords"] = article.get("keywords") or content["keywords"]
+        article["enriched"] = True
+        enriched[i] = article
+        count += 1
+
+    logger.info(f"ENRICH: {count}/{len(targets)} related articles enriched in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return enriched
+
+
+def clear():
+    _entries.clear()
+
+
+def get_stats() -> Dict[str, Any]:
+    return {**_stats, "entries": len(_entries), "max_entries": MAX_ENTRIES, "top_n": ENRICH_TOP_N,
+            "concurrency": ENRICH_CONCURRENCY, "domain_concurrency": DOMAIN_CONCURRENCY}
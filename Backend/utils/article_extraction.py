@@ -0,0 +1,272 @@
+"""
+Article Extraction Engine
+One HTML-to-article extractor shared by the URL narrative analyzer, the
+journalist scraper and the LMS resource reader. Pages are parsed once with
+lxml (C parser, XPath) instead of BeautifulSoup's pure-Python html.parser,
+and fields come from ordered sources: JSON-LD structured data first, then
+OpenGraph/meta tags, then the page structure (<article>, the densest content
+container, finally every paragraph). Parsing runs on a dedicated worker pool
+so large pages never block the event loop
+"""
+
+import os
+import re
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from utils import http_client
+
+logger = logging.getLogger("article_extraction")
+
+# lxml releases the GIL while parsing, so a small thread pool gives real overlap
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+MIN_PARAGRAPH_CHARS = 40
+# A body source is accepted once it yields this many words; otherwise the next one is tried
+MIN_BODY_WORDS = 80
+# Paragraphs that are mostly link text are navigation, related-story lists or tag clouds
+MAX_LINK_DENSITY = 0.5
+BOILERPLATE = ("cookie", "subscribe", "newsletter", "follow us", "share this", "all rights reserved")
+ARTICLE_TYPES = {"newsarticle", "article", "reportagenewsarticle", "analysisnewsarticle", "blogposting",
+                 "opinionnewsarticle", "backgroundnewsarticle", "liveblogposting", "report"}
+# Never part of the article text
+NOISE_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "form", "button")
+CHROME_TAGS = ("nav", "footer", "aside", "header")
+
+_CONTAINER_XPATH = etree.XPath(
+    "//*[self::div or self::section or self::main]"
+    "[re:test(@class, 'story|article|content|body|post|entry', 'i') or re:test(@id, 'story|article|content|main|body', 'i')]",
+    namespaces={"re": "http://exslt.org/regular-expressions"},
+)
+_WHITESPACE = re.compile(r"\s+")
+
+_pool = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix="extract")
+
+
+def _clean(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def _parse(html: Union[str, bytes]):
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration; bytes let it sniff the charset
+        html = html.encode("utf-8")
+    return lxml_html.document_fromstring(html, parser=lxml_html.HTMLParser(remove_comments=True, recover=True))
+
+
+def _meta(doc, *keys: str) -> str:
+    """First non-empty <meta> content among property/name/itemprop keys, in the order given."""
+    for key in keys:
+        for attr in ("property", "name", "itemprop"):
+            for value in doc.xpath(f"//meta[@{attr}=$key]/@content", key=key):
+                value = _clean(value)
+                if value:
+                    return value
+    return ""
+
+
+# ---------------- JSON-LD ---------------- #
+
+def _ld_objects(doc) -> Iterable[Dict[str, Any]]:
+    for script in doc.xpath("//script[@type='application/ld+json']"):
+        raw = (script.text or "").strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            # Publishers often leave trailing commas or control characters; skip what does not parse
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            item = stack.pop(0)
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                if "@graph" in item:
+                    stack.extend(item["@graph"] if isinstance(item["@graph"], list) else [item["@graph"]])
+                yield item
+
+
+def _ld_type(item: Dict[str, Any]) -> set:
+    types = item.get("@type", [])
+    types = types if isinstance(types, list) else [types]
+    return {str(t).lower() for t in types}
+
+
+def _ld_name(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(name for name in (_ld_name(v) for v in value) if name)
+    if isinstance(value, dict):
+        return _clean(value.get("name", ""))
+    return _clean(str(value)) if value else ""
+
+
+def _ld_url(value: Any) -> str:
+    if isinstance(value, list):
+        return _ld_url(value[0]) if value else ""
+    if isinstance(value, dict):
+        return value.get("url") or value.get("@id") or ""
+    return str(value) if value else ""
+
+
+def _structured_data(doc) -> Dict[str, Any]:
+    for item in _ld_objects(doc):
+        if not (_ld_type(item) & ARTICLE_TYPES):
+            continue
+        keywords = item.get("keywords", [])
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        return {
+            "title": _clean(item.get("headline") or item.get("name")),
+            "description": _clean(item.get("description")),
+            "body": item.get("articleBody") or "",
+            "author": _ld_name(item.get("author")),
+            "published_date": _clean(str(item.get("datePublished") or "")),
+            "site_name": _ld_name(item.get("publisher")),
+            "image": _ld_url(item.get("image")),
+            "canonical_url": _ld_url(item.get("mainEntityOfPage")) or _clean(item.get("url")),
+            "keywords": [_clean(k) for k in keywords if _clean(str(k))],
+        }
+    return {}
+
+
+# ---------------- Body text ---------------- #
+
+def _paragraphs(root) -> List[str]:
+    found = []
+    seen = set()
+    for p in root.iter("p"):
+        text = _clean(p.text_content())
+        if len(text) <= MIN_PARAGRAPH_CHARS or text in seen:
+            continue
+        link_chars = sum(len(_clean(a.text_content())) for a in p.iter("a"))
+        if link_chars / len(text) > MAX_LINK_DENSITY:
+            continue
+        lowered = text.lower()
+        if any(phrase in lowered for phrase in BOILERPLATE):
+            continue
+        seen.add(text)
+        found.append(text)
+    return found
+
+
+def _word_total(paragraphs: List[str]) -> int:
+    return sum(len(p.split()) for p in paragraphs)
+
+
+def _densest(candidates) -> List[str]:
+    best: List[str] = []
+    best_words = 0
+    for candidate in candidates:
+        paragraphs = _paragraphs(candidate)
+        words = _word_total(paragraphs)
+        if words > best_words:
+            best, best_words = paragraphs, words
+    return best
+
+
+def _body(doc, structured_body: str):
+    """(paragraphs, method): the first source in priority order that yields a real article body."""
+    if structured_body:
+        paragraphs = [_clean(line) for line in re.split(r"\n\s*\n|\r?\n", structured_body) if _clean(line)]
+        if _word_total(paragraphs) >= MIN_BODY_WORDS:
+            return paragraphs, "json-ld"
+
+    for element in list(doc.iter(*NOISE_TAGS)):
+        element.drop_tree()
+
+    articles = doc.xpath("//article")
+    paragraphs = _densest(articles)
+    if _word_total(paragraphs) >= MIN_BODY_WORDS:
+        return paragraphs, "article"
+
+    # Site chrome holds link lists and promos; drop it before the looser strategies
+    for element in list(doc.iter(*CHROME_TAGS)):
+        element.drop_tree()
+
+    container = _densest(_CONTAINER_XPATH(doc))
+    if _word_total(container) >= MIN_BODY_WORDS:
+        return container, "container"
+
+    everything = _paragraphs(doc)
+    if everything:
+        return everything, "paragraphs"
+    return container or paragraphs, "container" if container else "article" if paragraphs else "none"
+
+
+def _block_text(doc) -> str:
+    """Line-per-block text of <article>/<main>/<body> for readers that want everything, not just paragraphs."""
+    root = next(iter(doc.xpath("//article") or doc.xpath("//main") or doc.xpath("//body")), None)
+    if root is None:
+        return ""
+    lines = [_clean(line) for line in root.itertext()]
+    return "\n".join(line for line in lines if line)
+
+
+# ---------------- Public API ---------------- #
+
+def extract(html: Union[str, bytes], url: str = "") -> Dict[str, Any]:
+    """
+    Parse one page. Returns title, description, site_name, author, published_date, canonical_url,
+    image, keywords, paragraphs, content (paragraphs joined), text (block text), word_count and
+    `method` (which body source was used). CPU-bound: call through `extract_async` from async code.
+    """
+    doc = _parse(html)
+    ld = _structured_data(doc)
+
+    h1 = doc.xpath("//h1")
+    title_tag = doc.xpath("//title")
+    canonical = doc.xpath("//link[@rel='canonical']/@href")
+    times = doc.xpath("//time[@datetime]/@datetime")
+
+    keywords = ld.get("keywords") or [k.strip() for k in _meta(doc, "keywords", "news_keywords").split(",") if k.strip()]
+    if not keywords:
+        keywords = [_clean(v) for v in doc.xpath("//meta[@property='article:tag']/@content") if _clean(v)]
+
+    result = {
+        "url": url,
+        "title": ld.get("title") or _meta(doc, "og:title", "twitter:title")
+                 or (_clean(h1[0].text_content()) if h1 else "")
+                 or (_clean(title_tag[0].text_content()) if title_tag else ""),
+        "description": ld.get("description") or _meta(doc, "og:description", "description", "twitter:description"),
+        "site_name": ld.get("site_name") or _meta(doc, "og:site_name", "application-name"),
+        "author": ld.get("author") or _meta(doc, "author", "article:author", "byl", "dc.creator"),
+        "published_date": ld.get("published_date") or _meta(doc, "article:published_time", "publishdate",
+                                                            "pubdate", "datePublished", "date")
+                          or (_clean(times[0]) if times else ""),
+        "canonical_url": (_clean(canonical[0]) if canonical else "") or _meta(doc, "og:url") or ld.get("canonical_url", ""),
+        "image": ld.get("image") or _meta(doc, "og:image", "twitter:image"),
+        "keywords": keywords,
+    }
+
+    # _body strips noise from the tree, so the block text is taken from the same cleaned tree afterwards
+    paragraphs, method = _body(doc, ld.get("body", ""))
+    content = " ".join(paragraphs)
+    result.update({
+        "paragraphs": paragraphs,
+        "content": content,
+        "text": "\n".join(paragraphs) if method != "none" and _word_total(paragraphs) >= MIN_BODY_WORDS else _block_text(doc),
+        "word_count": len(content.split()),
+        "method": method,
+    })
+    return result
+
+
+async def extract_async(html: Union[str, bytes], url: str = "") -> Dict[str, Any]:
+    """`extract` on the extraction worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool, extract, html, url)
+
+
+async def fetch_article(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 15) -> Dict[str, Any]:
+    """GET `url` through the shared client and extract it. HTTP errors raise, as with raise_for_status()."""
+    response = await http_client.get(url, headers=headers or http_client.BROWSER_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    return await extract_async(response.content, str(response.url) or url)
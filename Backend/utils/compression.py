@@ -0,0 +1,111 @@
+"""
+Response Compression
+ASGI middleware that compresses complete response bodies above a size
+threshold with Brotli when the client accepts it and the `brotli` package is
+installed, else gzip. Streaming responses (SSE token streams) pass through
+untouched so every event still reaches the client as soon as it is sent
+"""
+
+import os
+import gzip
+import asyncio
+import logging
+from typing import List, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger("compression")
+
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Quality trades CPU for size; these levels keep encode time well under the JSON encode time
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Bodies above this are compressed in a worker thread instead of on the event loop
+THREAD_MIN_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                # Already encoded, or an event stream: never hold these back
+                passthrough = b"content-encoding" in headers or headers.get(b"content-type", b"").startswith(b"text/event-stream")
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streaming body: send it as it comes, uncompressed
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= self.minimum_size:
+                if len(body) >= THREAD_MIN_SIZE:
+                    body = await asyncio.to_thread(compress, body, encoding)
+                else:
+                    body = compress(body, encoding)
+                vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+                headers: List[Tuple[bytes, bytes]] = [
+                    (k, v) for k, v in start.get("headers", []) if k.lower() not in (b"content-length", b"vary")
+                ]
+                headers += [
+                    (b"content-encoding", encoding.encode("ascii")),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+                ]
+                start = {**start, "headers": headers}
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,150 @@
+"""
+Shared MongoDB Connection
+One lazily-connected, pool-configured MongoClient per process (plus an optional
+Motor client for async routes). Modules receive handles from here instead of
+building their own MongoClient at import time
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+load_dotenv()
+
+logger = logging.getLogger("database")
+
+# Motor is optional: without it async routes fall back to the sync pool in a worker thread
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    MOTOR_AVAILABLE = True
+except ImportError:
+    AsyncIOMotorClient = None
+    MOTOR_AVAILABLE = False
+
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DB_NAME", "datahalo")
+
+CLIENT_OPTIONS: Dict[str, Any] = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+    "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred"),
+    "retryWrites": True,
+    "appname": "datahalo-backend",
+}
+
+# Decoding options shared by every database handle: plain dicts, naive UTC datetimes (the code compares
+# them against datetime.utcnow()), and replacement characters for bad UTF-8 in scraped text instead of a
+# decode error that fails the whole query
+CODEC_OPTIONS = CodecOptions(
+    document_class=dict,
+    tz_aware=False,
+    uuid_representation=UuidRepresentation.STANDARD,
+    unicode_decode_error_handler="replace",
+)
+
+_client: Optional[MongoClient] = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def is_configured() -> bool:
+    return bool(MONGO_URI)
+
+
+def get_client() -> MongoClient:
+    """Process-wide sync client. connect=False defers server selection to the first operation."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI, connect=False, **CLIENT_OPTIONS)
+                logger.info(f"DB: Shared MongoClient created (maxPoolSize={CLIENT_OPTIONS['maxPoolSize']}, readPreference={CLIENT_OPTIONS['readPreference']})")
+    return _client
+
+
+def get_db(name: str = DB_NAME):
+    return get_client().get_database(name, codec_options=CODEC_OPTIONS)
+
+
+def get_async_client():
+    """Motor client for async routes, or None when motor is not installed."""
+    global _async_client
+    if not MOTOR_AVAILABLE:
+        return None
+    if _async_client is None:
+        _async_client = AsyncIOMotorClient(MONGO_URI, **CLIENT_OPTIONS)
+        logger.info("DB: Shared Motor client created")
+    return _async_client
+
+
+def get_async_db(name: str = DB_NAME):
+    client = get_async_client()
+    return client.get_database(name, codec_options=CODEC_OPTIONS) if client is not None else None
+
+
+def ping() -> bool:
+    try:
+        get_client().admin.command("ping")
+        return True
+    except Exception as e:
+        logger.error(f"DB: Ping failed: {e}")
+        return False
+
+
+def _is_motor(collection) -> bool:
+    return MOTOR_AVAILABLE and type(collection).__module__.startswith("motor")
+
+
+async def find_many(collection, filter: Dict[str, Any], sort: Optional[List] = None,
+                    limit: int = 0, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Run a find from an async route without blocking the event loop.
+    Accepts either a Motor collection or a pymongo collection (run in a worker thread).
+    """
+    def _cursor():
+        cursor = collection.find(filter, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    if _is_motor(collection):
+        return await _cursor().to_list(length=None)
+    return await asyncio.to_thread(lambda: list(_cursor()))
+
+
+async def aggregate(collection, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run an aggregation from an async route (Motor natively, pymongo in a worker thread)."""
+    if _is_motor(collection):
+        return await collection.aggregate(pipeline).to_list(length=None)
+    return await asyncio.to_thread(lambda: list(collection.aggregate(pipeline)))
+
+
+async def count_documents(collection, filter: Dict[str, Any]) -> int:
+    if _is_motor(collection):
+        return await collection.count_documents(filter)
+    return await asyncio.to_thread(collection.count_documents, filter)
+
+
+def close():
+    """Close both clients (called on application shutdown)."""
+    global _client, _async_client
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("DB: Shared MongoClient closed")
@@ -0,0 +1,209 @@
+"""
+Headline Similarity Graph
+Finds groups of related articles whose headlines and snippets say the same
+thing, including paraphrases that share few exact phrases. Every article
+becomes a TF-IDF vector (title words weighted up, plus title word pairs to
+catch copied phrasing, suffixes folded) in one sparse pass; cosine similarity is computed in
+row blocks so memory stays flat as the set grows, pairs above a threshold
+become edges, and connected components are reported with their sources and
+publish times. 1,000 articles take well under a second with NumPy/SciPy;
+a pure-Python path covers installs without them
+"""
+
+import os
+import math
+import time
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.relevance_ranker import tokenize
+
+try:
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger("headline_graph")
+
+SIMILARITY_THRESHOLD = float(os.getenv("HEADLINE_SIMILARITY_THRESHOLD", "0.5"))
+# Rows of the similarity matrix computed at once (block x n dense floats)
+BLOCK_ROWS = 256
+TITLE_WEIGHT = 2
+MAX_CLUSTERS = 10
+# Crude suffix folding so "imports"/"imported" or "announces"/"announced" share a feature
+_SUFFIXES = ("ing", "ed", "es", "s")
+SERP_DATE_FORMATS = ("%m/%d/%Y, %I:%M %p, %z UTC", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d %b %Y")
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4:
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix):
+                return token[: -len(suffix)]
+    return token
+
+
+def _features(article: Dict[str, Any]) -> List[str]:
+    title = [_stem(t) for t in tokenize(article.get("title", ""))]
+    pairs = [f"{a}_{b}" for a, b in zip(title, title[1:])]
+    return title * TITLE_WEIGHT + pairs + [_stem(t) for t in tokenize(article.get("description", ""))]
+
+
+def parse_published(value: Any) -> Optional[datetime]:
+    """Naive UTC-less datetime from ISO strings and the SERP date format; None when unparseable."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in SERP_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=None)
+        except ValueError:
+            continue
+    return None
+
+
+def _edges_numpy(docs: List[List[str]], threshold: float):
+    vocabulary: Dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    for r, tokens in enumerate(docs):
+        for token, count in Counter(tokens).items():
+            rows.append(r)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+            counts.append(count)
+    n = len(docs)
+    tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float64), (rows, cols)), shape=(n, max(len(vocabulary), 1)))
+
+    # Sublinear tf, smoothed idf, unit-length rows: the dot product is the cosine
+    df = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log((1 + n) / (1 + df)) + 1
+    tf.data = 1 + np.log(tf.data)
+    vectors = tf.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    vectors = sparse.diags(1 / norms) @ vectors
+    transposed = vectors.T.tocsc()
+
+    sources, targets, weights = [], [], []
+    for start in range(0, n, BLOCK_ROWS):
+        block = (vectors[start:start + BLOCK_ROWS] @ transposed).toarray()
+        # Upper triangle only: each pair once, no self-loops
+        block[np.tril_indices(block.shape[0], k=start, m=n)] = 0
+        i, j = np.nonzero(block >= threshold)
+        sources.append(i + start)
+        targets.append(j)
+        weights.append(block[i, j])
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(weights)
+
+
+def _components_numpy(n: int, sources, targets) -> List[int]:
+    graph = sparse.coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return labels.tolist()
+
+
+def _edges_python(docs: List[List[str]], threshold: float):
+    n = len(docs)
+    df = Counter(token for tokens in docs for token in set(tokens))
+    vectors = []
+    for tokens in docs:
+        weights = {t: (1 + math.log(c)) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in Counter(tokens).items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        vectors.append({t: w / norm for t, w in weights.items()})
+
+    sources, targets, weights = [], [], []
+    for i in range(n):
+        for j in range(i + 1, n):
+            small, large = (vectors[i], vectors[j]) if len(vectors[i]) < len(vectors[j]) else (vectors[j], vectors[i])
+            score = sum(w * large.get(t, 0.0) for t, w in small.items())
+            if score >= threshold:
+                sources.append(i)
+                targets.append(j)
+                weights.append(score)
+    return sources, targets, weights
+
+
+def _components_python(n: int, sources, targets) -> List[int]:
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(sources, targets):
+        parent[find(a)] = find(b)
+    return [find(i) for i in range(n)]
+
+
+def build_graph(articles: List[Dict[str, Any]], threshold: float = SIMILARITY_THRESHOLD) -> Dict[str, Any]:
+    """
+    Similarity clusters of `articles` (size >= 2, largest first) with their sources, publish-time span,
+    sample headlines and mean pairwise similarity, plus `largest_multi_source_share`: the fraction of
+    all articles in the biggest cluster that spans more than one source.
+    """
+    started = time.perf_counter()
+    n = len(articles)
+    summary = {"articles": n, "threshold": threshold, "edges": 0, "clusters": [],
+               "clustered_articles": 0, "largest_multi_source_share": 0.0, "elapsed_ms": 0.0}
+    if n < 2:
+        return summary
+
+    docs = [_features(a) for a in articles]
+    if NUMPY_AVAILABLE:
+        sources, targets, weights = _edges_numpy(docs, threshold)
+        labels = _components_numpy(n, sources, targets)
+        sources, targets, weights = sources.tolist(), targets.tolist(), weights.tolist()
+    else:
+        sources, targets, weights = _edges_python(docs, threshold)
+        labels = _components_python(n, sources, targets)
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for index, label in enumerate(labels):
+        members[label].append(index)
+    similarity_sum: Dict[int, float] = defaultdict(float)
+    edge_count: Dict[int, int] = defaultdict(int)
+    for a, weight in zip(sources, weights):
+        similarity_sum[labels[a]] += weight
+        edge_count[labels[a]] += 1
+
+    clusters = []
+    for label, indexes in members.items():
+        if len(indexes) < 2:
+            continue
+        group = [articles[i] for i in indexes]
+        source_counts = Counter(a.get("source") or "Unknown" for a in group)
+        times = sorted(t for t in (parse_published(a.get("published_date")) for a in group) if t)
+        clusters.append({
+            "size": len(indexes),
+            "sources": [s for s, _ in source_counts.most_common()],
+            "source_count": len(source_counts),
+            "first_published": times[0].isoformat() if times else None,
+            "last_published": times[-1].isoformat() if times else None,
+            "span_hours": round((times[-1] - times[0]).total_seconds() / 3600, 1) if times else None,
+            "mean_similarity": round(similarity_sum[label] / max(edge_count[label], 1), 3),
+            "headlines": [a.get("title", "") for a in group[:3]],
+        })
+    clusters.sort(key=lambda c: (c["size"], c["source_count"]), reverse=True)
+
+    multi_source = [c for c in clusters if c["source_count"] > 1]
+    summary.update({
+        "edges": len(sources),
+        "clusters": clusters[:MAX_CLUSTERS],
+        "clustered_articles": sum(c["size"] for c in clusters),
+        "largest_multi_source_share": round(multi_source[0]["size"] / n, 3) if multi_source else 0.0,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    logger.info(f"GRAPH: {n} headlines, {len(sources)} similar pairs, {len(clusters)} clusters in {summary['elapsed_ms']:.0f}ms")
+    return summary
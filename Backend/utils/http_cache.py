@@ -0,0 +1,162 @@
+"""
+HTTP Caching for Read Endpoints
+Every cached response depends on a few collections, and every write path bumps
+that collection's version (stored in MongoDB so all workers agree). The ETag is
+derived from the request plus those versions, so a poll that finds nothing
+changed is answered 304 without touching the data, and a repeated request is
+served from a short-lived in-process copy of the serialized body
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from pymongo import ReturnDocument
+
+from utils import serialization
+
+logger = logging.getLogger("http_cache")
+
+# How long a worker trusts its copy of the collection versions before re-reading them
+VERSION_REFRESH_S = float(os.getenv("HTTP_CACHE_VERSION_REFRESH", "2"))
+# Upper bound on how long a serialized body is reused, even if no write was seen
+MEMO_TTL_S = float(os.getenv("HTTP_CACHE_MEMO_TTL", "30"))
+MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "256"))
+
+# Clients must revalidate every time; the ETag makes revalidation cheap
+CACHE_CONTROL = "no-cache"
+
+_collection = None
+_versions: Dict[str, Tuple[int, Optional[datetime]]] = {}
+_versions_checked_at = 0.0
+_memo: "OrderedDict[str, Tuple[float, str, bytes]]" = OrderedDict()
+_stats = {"not_modified": 0, "memo_hits": 0, "built": 0, "bumps": 0}
+
+
+def init_http_cache(database):
+    """Keep collection versions in MongoDB so every worker derives the same ETags (called from main)."""
+    global _collection
+    _collection = database["collection_versions"]
+    logger.info("SUCCESS: HTTP cache versions attached")
+
+
+def bump(*names: str):
+    """Record a write to the named collections. Call after the write has been applied."""
+    now = datetime.utcnow()
+    for name in names:
+        _stats["bumps"] += 1
+        if _collection is None:
+            version = _versions.get(name, (0, None))[0] + 1
+            _versions[name] = (version, now)
+            continue
+        try:
+            doc = _collection.find_one_and_update(
+                {"_id": name},
+                {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            _versions[name] = (doc["version"], doc["updated_at"])
+        except Exception as e:
+            # Never fail a write path over cache bookkeeping; drop local state so it is re-read
+            logger.error(f"HTTP CACHE: Could not bump '{name}': {e}")
+            _versions.pop(name, None)
+
+
+async def bump_async(*names: str):
+    """`bump` off the event loop, for async routes."""
+    await asyncio.to_thread(bump, *names)
+
+
+def _refresh_versions():
+    global _versions_checked_at
+    for doc in _collection.find({}):
+        _versions[doc["_id"]] = (doc.get("version", 0), doc.get("updated_at"))
+    _versions_checked_at = time.time()
+
+
+async def current_versions(names: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    if _collection is not None and time.time() - _versions_checked_at > VERSION_REFRESH_S:
+        await asyncio.to_thread(_refresh_versions)
+    return {name: _versions.get(name, (0, None)) for name in names}
+
+
+def request_key(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def make_etag(key: str, versions: Dict[str, Tuple[int, Optional[datetime]]]) -> str:
+    material = key + "|" + ",".join(f"{name}:{versions[name][0]}" for name in sorted(versions))
+    # Weak: the same representation may be sent with different content encodings
+    return f'W/"{hashlib.sha1(material.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def _last_modified(versions: Dict[str, Tuple[int, Optional[datetime]]]) -> Optional[datetime]:
+    stamps = [updated for _, updated in versions.values() if updated]
+    return max(stamps).replace(microsecond=0) if stamps else None
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match wins over If-Modified-Since; compare weakly per RFC 9110
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+async def cached_response(request: Request, collections: Iterable[str],
+                          build: Callable[[], Awaitable[Dict[str, Any]]]) -> Response:
+    """
+    Answer a GET from the version-derived ETag: 304 when the client already has it, the memoized body
+    when this worker built it recently, otherwise `build()` serialized once and memoized.
+    """
+    key = request_key(request)
+    versions = await current_versions(collections)
+    etag = make_etag(key, versions)
+    last_modified = _last_modified(versions)
+    headers = _headers(etag, last_modified)
+
+    if _not_modified(request, etag, last_modified):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    entry = _memo.get(key)
+    if entry is not None and entry[1] == etag and entry[0] > time.time():
+        _memo.move_to_end(key)
+        _stats["memo_hits"] += 1
+        return Response(content=entry[2], media_type="application/json", headers=headers)
+
+    body = serialization.dumps(await build())
+    _stats["built"] += 1
+    _memo[key] = (time.time() + MEMO_TTL_S, etag, body)
+    _memo.move_to_end(key)
+    while len(_memo) > MAX_ENTRIES:
+        _memo.popitem(last=False)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_stats() -> Dict[str, Any]:
+    return {**_stats, "memo_entries": len(_memo), "versions": {k: v[0] for k, v in _versions.items()}}
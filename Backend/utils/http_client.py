@@ -0,0 +1,92 @@
+"""
+Shared Async HTTP Client
+One pooled httpx.AsyncClient for every outbound call made from async routes
+(NVIDIA, SERP, NewsData, article pages) so slow providers never block the event loop
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("http_client")
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def create_client(max_connections: int = MAX_CONNECTIONS,
+                  max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+                  timeout: httpx.Timeout = DEFAULT_TIMEOUT) -> httpx.AsyncClient:
+    """Build a pooled client with the standard keep-alive / HTTP/2 settings."""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+        logger.info(f"HTTP: Shared client ready (http2={HTTP2_AVAILABLE}, max_connections={MAX_CONNECTIONS}, per_host={MAX_CONNECTIONS_PER_HOST})")
+    return _client
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    """Per-host in-flight cap so one provider cannot take the whole pool."""
+    host = httpx.URL(url).host
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+    return _host_limits[host]
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared pool, honouring the per-host limit."""
+    async with _host_limit(url):
+        return await get_http_client().request(method, url, **kwargs)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+async def close_http_client():
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("HTTP: Shared client closed")
+    _client = None
+    _host_limits.clear()
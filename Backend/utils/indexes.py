@@ -0,0 +1,223 @@
+"""
+MongoDB Index Management
+Declares every index the hot query paths depend on, ensures them at startup,
+and reports index usage ($indexStats) plus explain plans for the hot queries
+so collection scans are caught before they reach production
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from utils import narrative_cache, retention, smart_digests
+
+logger = logging.getLogger("indexes")
+
+# collection -> indexes. Compound keys follow equality-then-sort order of the queries they serve.
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "news": [
+        IndexModel([("url", ASCENDING)], name="url_unique", unique=True,
+                   partialFilterExpression={"url": {"$exists": True}}),
+        retention.news_fetched_at_index(),
+        IndexModel([("category", ASCENDING), ("fetchedAt", DESCENDING)], name="category_fetchedAt"),
+        IndexModel([("minhash_bands", ASCENDING), ("fetchedAt", DESCENDING)], name="minhash_bands_fetchedAt"),
+        IndexModel([("title", TEXT), ("description", TEXT)], name="title_description_text",
+                   weights={"title": 3, "description": 1}, default_language="english"),
+    ],
+    "journalists": [
+        IndexModel([("analysis_timestamp", DESCENDING)], name="analysis_timestamp_desc"),
+    ],
+    "ai_tutor_messages": [
+        IndexModel([("chat_id", ASCENDING), ("timestamp", ASCENDING)], name="chat_id_timestamp"),
+    ],
+    "ai_tutor_chat_sessions": [
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_id_updated_at"),
+    ],
+    "courses": [
+        IndexModel([("invite_code", ASCENDING)], name="invite_code_unique", unique=True,
+                   partialFilterExpression={"invite_code": {"$exists": True}}),
+        IndexModel([("teacher_id", ASCENDING), ("updated_at", DESCENDING)], name="teacher_id_updated_at"),
+        IndexModel([("students", ASCENDING), ("updated_at", DESCENDING)], name="students_updated_at"),
+    ],
+    "assignments": [
+        IndexModel([("course_id", ASCENDING), ("created_at", DESCENDING)], name="course_id_created_at"),
+    ],
+    "submissions": [
+        IndexModel([("assignment_id", ASCENDING), ("submitted_at", DESCENDING)], name="assignment_id_submitted_at"),
+        IndexModel([("student_id", ASCENDING), ("submitted_at", DESCENDING)], name="student_id_submitted_at"),
+    ],
+    "case_studies": [
+        IndexModel([("teacher_id", ASCENDING), ("submitted_at", DESCENDING)], name="teacher_id_submitted_at"),
+        IndexModel([("published", ASCENDING), ("grade", DESCENDING), ("views", DESCENDING)], name="published_grade_views"),
+    ],
+    "ai_learning_dataset": [
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+    ],
+    "smart_digests": [
+        IndexModel([("last_requested_at", ASCENDING)], name="last_requested_at_ttl",
+                   expireAfterSeconds=smart_digests.RETENTION_DAYS * 24 * 3600),
+    ],
+    "url_narratives": [
+        IndexModel([("aliases", ASCENDING), ("variant", ASCENDING)], name="aliases_variant"),
+        IndexModel([("canonical_url", ASCENDING), ("article_at", DESCENDING)], name="canonical_url_article_at"),
+        IndexModel([("last_requested_at", ASCENDING)], name="last_requested_at_ttl",
+                   expireAfterSeconds=narrative_cache.RETENTION_DAYS * 24 * 3600),
+    ],
+    "llm_cache": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+}
+
+if retention.ARCHIVE_ENABLED:
+    REQUIRED_INDEXES["news_archive"] = retention.archive_indexes()
+
+# Server codes for "an index on these keys already exists with different options/name"
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def _hot_queries():
+    """Representative shapes of the hot queries: (label, collection, filter, sort)"""
+    since = datetime.utcnow() - timedelta(days=7)
+    return [
+        ("fetch_news url lookup", "news", {"url": "https://example.com/a"}, None),
+        ("smart-feed category branch", "news", {"category": "business", "fetchedAt": {"$gte": since}}, [("fetchedAt", -1)]),
+        ("saved-news by category", "news", {"category": "general"}, [("fetchedAt", -1)]),
+        ("narrative topic search", "news", {"$text": {"$search": "election"}, "fetchedAt": {"$gte": since}}, None),
+        ("tutor messages", "ai_tutor_messages", {"chat_id": "x"}, [("timestamp", 1)]),
+        ("tutor sessions", "ai_tutor_chat_sessions", {"user_id": "x"}, [("updated_at", -1)]),
+        ("course by invite code", "courses", {"invite_code": "ABC123"}, None),
+        ("submissions by assignment", "submissions", {"assignment_id": "x"}, [("submitted_at", -1)]),
+        ("submissions by student", "submissions", {"student_id": "x"}, [("submitted_at", -1)]),
+        ("assignments by course", "assignments", {"course_id": "x"}, [("created_at", -1)]),
+    ]
+
+
+def ensure_indexes(db) -> Dict[str, Any]:
+    """Create any missing declared index. Safe to run on every startup (create_indexes is idempotent)."""
+    report = {"ensured": {}, "errors": {}}
+    for collection_name, models in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        for model in models:
+            name = model.document["name"]
+            try:
+                collection.create_indexes([model])
+                report["ensured"].setdefault(collection_name, []).append(name)
+            except OperationFailure as e:
+                if e.code in INDEX_CONFLICT_CODES and _reconcile_ttl(db, collection, model):
+                    report["ensured"].setdefault(collection_name, []).append(name)
+                    continue
+                # Typically existing duplicates blocking a unique index, or a same-name index with other options
+                logger.error(f"INDEX: Could not ensure {collection_name}.{name}: {e}")
+                report["errors"].setdefault(collection_name, {})[name] = str(e)
+    total = sum(len(v) for v in report["ensured"].values())
+    logger.info(f"INDEX: Ensured {total} indexes across {len(REQUIRED_INDEXES)} collections ({len(report['errors'])} with errors)")
+    return report
+
+
+# Index spec fields that are not build options, plus the TTL that _reconcile_ttl may change
+_NON_OPTION_FIELDS = {"key", "name", "v", "ns", "background", "expireAfterSeconds"}
+
+
+def _options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in spec.items() if k not in _NON_OPTION_FIELDS}
+
+
+def _reconcile_ttl(db, collection, model: IndexModel) -> bool:
+    """
+    Bring an existing index's TTL in line with the declared one (retention policy changes).
+    collMod changes/adds expireAfterSeconds in place; removing a TTL needs a rebuild.
+    Returns False unless the existing index has the declared name, keys and options and
+    differs only in expireAfterSeconds.
+    """
+    wanted = model.document
+    existing = collection.index_information().get(wanted["name"])
+    if existing is None or list(existing["key"]) != list(wanted["key"].items()):
+        return False
+    # Anything besides the TTL differing (uniqueness, partial filter, ...) is not ours to rebuild
+    if _options(existing) != _options(wanted):
+        return False
+    name = wanted["name"]
+
+    ttl = wanted.get("expireAfterSeconds")
+    if ttl is not None:
+        try:
+            db.command("collMod", collection.name, index={"name": name, "expireAfterSeconds": ttl})
+            logger.info(f"INDEX: Set TTL on {collection.name}.{name} to {ttl}s")
+            return True
+        except OperationFailure:
+            pass  # servers older than 5.1 can't add a TTL to a plain index in place
+
+    collection.drop_index(name)
+    collection.create_indexes([model])
+    logger.info(f"INDEX: Rebuilt {collection.name}.{name} (TTL {ttl})")
+    return True
+
+
+def _index_stats(collection) -> List[Dict[str, Any]]:
+    stats = []
+    for entry in collection.aggregate([{"$indexStats": {}}]):
+        accesses = entry.get("accesses", {})
+        stats.append({
+            "name": entry.get("name"),
+            "key": dict(entry.get("key", {})),
+            "ops": accesses.get("ops", 0),
+            "since": accesses.get("since"),
+        })
+    return sorted(stats, key=lambda s: s["ops"], reverse=True)
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = []
+    while plan:
+        stages.append(plan.get("stage", "?"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+
+def _explain(collection, query_filter, sort) -> Dict[str, Any]:
+    cursor = collection.find(query_filter).limit(20)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = cursor.explain()
+    planner = explain.get("queryPlanner", {})
+    winning = planner.get("winningPlan", {})
+    # Newer servers nest the classic plan under queryPlan
+    stages = _plan_stages(winning.get("queryPlan", winning))
+    execution = explain.get("executionStats", {})
+    return {
+        "stages": stages,
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+        "docs_examined": execution.get("totalDocsExamined"),
+        "keys_examined": execution.get("totalKeysExamined"),
+        "execution_ms": execution.get("executionTimeMillis"),
+    }
+
+
+def index_report(db) -> Dict[str, Any]:
+    """$indexStats for every declared collection plus explain plans for the hot queries."""
+    usage = {}
+    for collection_name in REQUIRED_INDEXES:
+        try:
+            usage[collection_name] = _index_stats(db[collection_name])
+        except OperationFailure as e:
+            usage[collection_name] = {"error": str(e)}
+
+    plans = []
+    for label, collection_name, query_filter, sort in _hot_queries():
+        try:
+            plans.append({"query": label, "collection": collection_name, **_explain(db[collection_name], query_filter, sort)})
+        except OperationFailure as e:
+            plans.append({"query": label, "collection": collection_name, "error": str(e)})
+
+    return {
+        "index_usage": usage,
+        "explain": plans,
+        "collection_scans": [p["query"] for p in plans if p.get("collection_scan")],
+        "generated_at": datetime.utcnow().isoformat(),
+    }
@@ -0,0 +1,222 @@
+"""
+Background News Ingestion Scheduler
+Runs inside the API process (started from the FastAPI lifespan) so request
+handlers only ever read from MongoDB. Each category is refreshed on its own
+cadence with jitter, retention runs on a slower cadence, and every job records
+last-run status and lag for /ingestion/status. A MongoDB lease per job keeps
+multiple workers from running the same job twice
+"""
+
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from utils import news_fetcher, retention
+
+logger = logging.getLogger("ingestion_scheduler")
+
+ENABLED = os.getenv("INGESTION_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+JITTER_FRACTION = float(os.getenv("INGESTION_JITTER", "0.1"))
+INGEST_COUNTRIES = [c.strip() for c in os.getenv("INGEST_COUNTRIES", "in,us,gb").split(",") if c.strip()]
+DEFAULT_INTERVAL_MINUTES = float(os.getenv("INGEST_INTERVAL_MINUTES", "60"))
+RETENTION_INTERVAL_HOURS = float(os.getenv("RETENTION_INTERVAL_HOURS", "12"))
+
+# Minutes between refreshes per category; the headline feed moves fastest
+CATEGORY_INTERVALS = {
+    "general": 30,
+    "business": DEFAULT_INTERVAL_MINUTES,
+    "technology": DEFAULT_INTERVAL_MINUTES,
+    "entertainment": DEFAULT_INTERVAL_MINUTES * 2,
+    "health": DEFAULT_INTERVAL_MINUTES * 2,
+    "science": DEFAULT_INTERVAL_MINUTES * 2,
+    "sports": DEFAULT_INTERVAL_MINUTES,
+}
+
+
+class Job:
+    def __init__(self, name: str, interval: float, run: Callable[[], Awaitable[Dict[str, Any]]]):
+        self.name = name
+        self.interval = interval  # seconds
+        self.run = run
+        self.next_run: Optional[float] = None
+        self.running = False
+        self.status: Dict[str, Any] = {
+            "runs": 0,
+            "failures": 0,
+            "skipped_lease": 0,
+            "last_started": None,
+            "last_finished": None,
+            "last_success": None,
+            "last_duration_s": None,
+            "last_error": None,
+            "last_result": None,
+        }
+
+    def schedule_next(self, now: float):
+        jitter = self.interval * JITTER_FRACTION
+        self.next_run = now + self.interval + random.uniform(-jitter, jitter)
+
+
+class IngestionScheduler:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Running job tasks; held so they are not garbage-collected and can be cancelled on stop()
+        self._job_tasks: Set[asyncio.Task] = set()
+        self._db = None
+        self._lease_collection = None
+        self._owner = uuid.uuid4().hex
+        self._wakeup = asyncio.Event()
+
+    def configure(self, database):
+        """Register the default jobs against the shared database."""
+        self._db = database
+        self._lease_collection = database["scheduler_leases"]
+        self.jobs = {}
+        for category, minutes in CATEGORY_INTERVALS.items():
+            self.add_job(f"ingest:{category}", minutes * 60, self._ingest_job(category))
+        self.add_job("retention:news", RETENTION_INTERVAL_HOURS * 3600, self._retention_job)
+
+    def add_job(self, name: str, interval: float, run: Callable[[], Awaitable[Dict[str, Any]]]):
+        self.jobs[name] = Job(name, interval, run)
+
+    @staticmethod
+    def _ingest_job(category: str):
+        async def run():
+            summary = await news_fetcher.refresh_countries(category=category, countries=INGEST_COUNTRIES)
+            if summary["failed"] and len(summary["failed"]) == len(INGEST_COUNTRIES):
+                raise RuntimeError(f"all countries failed: {summary['failed']}")
+            return {"new": summary["count"], "duplicates": summary["duplicates_skipped"], "failed": summary["failed"]}
+        return run
+
+    async def _retention_job(self):
+        return await asyncio.to_thread(retention.run_retention, self._db)
+
+    def start(self):
+        if not ENABLED:
+            logger.info("SCHEDULER: Disabled via INGESTION_SCHEDULER_ENABLED")
+            return
+        if self._task is not None:
+            return
+        # Stagger first runs across the first minute so startup doesn't burst the provider quota
+        now = time.time()
+        for job in self.jobs.values():
+            job.next_run = now + random.uniform(0, 60)
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"SCHEDULER: Started {len(self.jobs)} jobs for countries {INGEST_COUNTRIES}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # In-flight jobs must not outlive shutdown (the DB client is closed right after)
+        jobs = list(self._job_tasks)
+        for task in jobs:
+            task.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        logger.info(f"SCHEDULER: Stopped ({len(jobs)} running jobs cancelled)")
+
+    def trigger(self, name: str) -> bool:
+        """Make a job due now (used by admin tooling)."""
+        job = self.jobs.get(name)
+        if job is None:
+            return False
+        job.next_run = time.time()
+        self._wakeup.set()
+        return True
+
+    async def _loop(self):
+        while True:
+            now = time.time()
+            for job in self.jobs.values():
+                if not job.running and job.next_run is not None and job.next_run <= now:
+                    job.running = True
+                    task = asyncio.create_task(self._run_job(job))
+                    self._job_tasks.add(task)
+                    task.add_done_callback(self._job_tasks.discard)
+
+            upcoming = [j.next_run for j in self.jobs.values() if not j.running and j.next_run is not None]
+            sleep_for = max(1.0, min(upcoming) - time.time()) if upcoming else 30.0
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(sleep_for, 60.0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _acquire_lease(self, job: Job) -> bool:
+        if self._lease_collection is None:
+            return True
+        now = datetime.utcnow()
+        try:
+            self._lease_collection.update_one(
+                {"_id": job.name, "$or": [{"lease_until": {"$lt": now}}, {"owner": self._owner}]},
+                {"$set": {"owner": self._owner, "lease_until": now + timedelta(seconds=job.interval * 0.5)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease for this job
+            return False
+
+    async def _run_job(self, job: Job):
+        status = job.status
+        started = time.time()
+        try:
+            if not await asyncio.to_thread(self._acquire_lease, job):
+                status["skipped_lease"] += 1
+                return
+
+            status["runs"] += 1
+            status["last_started"] = datetime.utcnow()
+            status["last_result"] = await job.run()
+            status["last_success"] = datetime.utcnow()
+            status["last_error"] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status["failures"] += 1
+            status["last_error"] = str(e)
+            logger.error(f"SCHEDULER: Job {job.name} failed: {e}")
+        finally:
+            status["last_finished"] = datetime.utcnow()
+            status["last_duration_s"] = round(time.time() - started, 2)
+            job.schedule_next(started)
+            job.running = False
+
+    def get_status(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        jobs: List[Dict[str, Any]] = []
+        for job in self.jobs.values():
+            last_success = job.status["last_success"]
+            jobs.append({
+                "name": job.name,
+                "interval_s": job.interval,
+                "running": job.running,
+                "next_run": datetime.utcfromtimestamp(job.next_run).isoformat() if job.next_run else None,
+                # How stale this job's data is, and whether it has missed its own cadence
+                "lag_s": round((now - last_success).total_seconds(), 1) if last_success else None,
+                "overdue": bool(last_success) and (now - last_success).total_seconds() > job.interval * (1 + JITTER_FRACTION) * 2,
+                **{k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in job.status.items()},
+            })
+        return {
+            "enabled": ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "countries": INGEST_COUNTRIES,
+            "retention": retention.get_policy(),
+            "jobs": jobs,
+        }
+
+
+scheduler = IngestionScheduler()
@@ -0,0 +1,76 @@
+"""
+Lexicon Matching
+Keyword lists compiled once into a single case-insensitive alternation with
+word boundaries, so a text is scanned in one pass however many terms and
+categories there are, and "very" no longer matches inside "every". A scan
+returns hit counts per category and per term plus match spans. Scans are
+memoized by text because the narrative analyzers read the same headlines
+more than once per request
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+SCAN_CACHE_SIZE = 4096
+
+
+class LexiconScan:
+    """Result of one pass over a text. Treat as read-only: scans are shared through the memo."""
+
+    __slots__ = ("counts", "terms", "spans", "_categories")
+
+    def __init__(self, categories: Dict[str, Tuple[str, ...]]):
+        self.counts: Counter = Counter()  # category -> occurrences
+        self.terms: Counter = Counter()  # term -> occurrences
+        self.spans: List[Tuple[int, int, str]] = []  # (start, end, term)
+        self._categories = categories
+
+    def found(self, category: str) -> List[str]:
+        """Terms of `category` present in the text, in lexicon order."""
+        return [term for term in self._categories[category] if self.terms[term]]
+
+    def distinct(self, category: str) -> int:
+        """How many different terms of `category` occur (the old `sum(1 for k in words if k in text)`)."""
+        return len(self.found(category))
+
+    def term_counts(self, category: str) -> List[Tuple[str, int]]:
+        return [(term, self.terms[term]) for term in self._categories[category] if self.terms[term]]
+
+
+class Lexicon:
+    """
+    Named categories of terms matched on word boundaries. A trailing "*" makes a term a stem
+    ("improv*" matches improve, improved, improvement); with `plurals` every other term also
+    matches with an s/es ending. Spaces in multi-word terms match any run of whitespace.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], plurals: bool = False):
+        self.categories: Dict[str, Tuple[str, ...]] = {name: tuple(terms) for name, terms in categories.items()}
+        self._term_categories: Dict[str, List[str]] = {}
+        for name, terms in self.categories.items():
+            for term in terms:
+                self._term_categories.setdefault(term, []).append(name)
+
+        # Longest first so a phrase wins over a word it starts with; one capture group per term
+        self._terms = sorted(self._term_categories, key=len, reverse=True)
+        suffix = r"(?:e?s)?" if plurals else ""
+        alternatives = []
+        for term in self._terms:
+            body = r"\s+".join(re.escape(word) for word in term.rstrip("*").split())
+            alternatives.append(f"({body}\\w*)" if term.endswith("*") else f"({body}{suffix})")
+        self._pattern = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE)
+        self.scan = lru_cache(maxsize=SCAN_CACHE_SIZE)(self._scan)
+
+    def _scan(self, text: str) -> LexiconScan:
+        result = LexiconScan(self.categories)
+        if not text:
+            return result
+        for match in self._pattern.finditer(text):
+            term = self._terms[match.lastindex - 1]
+            result.terms[term] += 1
+            result.spans.append((match.start(), match.end(), term))
+            for category in self._term_categories[term]:
+                result.counts[category] += 1
+        return result
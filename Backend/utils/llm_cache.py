@@ -0,0 +1,224 @@
+"""
+LLM Response Cache
+Content-addressed cache for chat completions keyed on
+(model, normalized messages, temperature, max_tokens, top_p).
+Two tiers: an in-process LRU bounded by entry count and bytes, and an optional
+MongoDB collection with a TTL index so results survive restarts and are shared
+between workers. TTLs are set per calling endpoint
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("llm_cache")
+
+MAX_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+MAX_MEMORY_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+MAX_PERSISTENT_DOCS = int(os.getenv("LLM_CACHE_MAX_DOCS", "5000"))
+MAX_ENTRY_BYTES = int(os.getenv("LLM_CACHE_MAX_ENTRY_BYTES", str(256 * 1024)))
+TRIM_EVERY_WRITES = 100
+
+# Seconds each endpoint's answers stay valid; 0 disables caching for that endpoint.
+# Tutor chats and assignment generation are conversational / meant to vary, so skip them.
+DEFAULT_TTL = int(os.getenv("LLM_CACHE_DEFAULT_TTL", "3600"))
+ENDPOINT_TTLS = {
+    "analyze-article": 7 * 24 * 3600,
+    "case-study": 7 * 24 * 3600,
+    "journalist-profile": 24 * 3600,
+    "url-narrative": 6 * 3600,
+    "analyze-narrative": 3600,
+    "smart-feed": 1800,
+    "ai-tutor": 0,
+    "generate-assignment": 0,
+}
+
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memory_bytes = 0
+_collection = None
+_writes_since_trim = 0
+_stats: Dict[str, Dict[str, int]] = {}
+
+_WS_RE = re.compile(r"\s+")
+
+
+def init_llm_cache(database):
+    """Attach the persistent tier (called from main; its TTL/unique indexes live in utils.indexes)."""
+    global _collection
+    _collection = database["llm_cache"]
+    logger.info("SUCCESS: LLM cache persistent tier attached")
+
+
+def ttl_for(endpoint: str) -> int:
+    return ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL)
+
+
+def _normalize_messages(messages: List[Dict[str, str]]) -> List[List[str]]:
+    """Whitespace-insensitive view of the conversation so trivially different pastes collide."""
+    return [
+        [str(m.get("role", "")).strip().lower(), _WS_RE.sub(" ", str(m.get("content", ""))).strip()]
+        for m in messages
+    ]
+
+
+def make_key(model: str, messages: List[Dict[str, str]], temperature: float,
+             max_tokens: int, top_p: Optional[float] = None) -> str:
+    material = json.dumps(
+        {
+            "model": model,
+            "messages": _normalize_messages(messages),
+            "temperature": round(float(temperature), 4),
+            "max_tokens": int(max_tokens),
+            "top_p": None if top_p is None else round(float(top_p), 4),
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _count(endpoint: str, key: str, n: int = 1):
+    bucket = _stats.setdefault(
+        endpoint,
+        {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0, "evictions": 0},
+    )
+    bucket[key] += n
+
+
+def _memory_get(key: str) -> Optional[str]:
+    global _memory_bytes
+    entry = _memory.get(key)
+    if entry is None:
+        return None
+    if entry["expires_at"] <= time.time():
+        _memory.pop(key, None)
+        _memory_bytes -= entry["size"]
+        return None
+    _memory.move_to_end(key)
+    return entry["value"]
+
+
+def _memory_put(key: str, value: str, ttl: int, endpoint: str):
+    global _memory_bytes
+    size = len(value.encode("utf-8"))
+    old = _memory.pop(key, None)
+    if old is not None:
+        _memory_bytes -= old["size"]
+    _memory[key] = {"value": value, "expires_at": time.time() + ttl, "size": size}
+    _memory_bytes += size
+
+    while _memory and (len(_memory) > MAX_MEMORY_ENTRIES or _memory_bytes > MAX_MEMORY_BYTES):
+        _, evicted = _memory.popitem(last=False)
+        _memory_bytes -= evicted["size"]
+        _count(endpoint, "evictions")
+
+
+def _persistent_get(key: str) -> Optional[Dict[str, Any]]:
+    return _collection.find_one(
+        {"key": key, "expires_at": {"$gt": datetime.utcnow()}},
+        {"_id": 0, "value": 1, "expires_at": 1},
+    )
+
+
+def _persistent_put(key: str, value: str, ttl: int, endpoint: str, model: str):
+    global _writes_since_trim
+    now = datetime.utcnow()
+    _collection.update_one(
+        {"key": key},
+        {"$set": {
+            "key": key,
+            "value": value,
+            "endpoint": endpoint,
+            "model": model,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }},
+        upsert=True,
+    )
+    _writes_since_trim += 1
+    if _writes_since_trim >= TRIM_EVERY_WRITES:
+        _writes_since_trim = 0
+        _trim_persistent()
+
+
+def _trim_persistent():
+    """Keep the collection under MAX_PERSISTENT_DOCS by dropping the oldest entries."""
+    excess = _collection.estimated_document_count() - MAX_PERSISTENT_DOCS
+    if excess <= 0:
+        return
+    oldest = [d["_id"] for d in _collection.find({}, {"_id": 1}).sort("created_at", 1).limit(excess)]
+    if oldest:
+        _collection.delete_many({"_id": {"$in": oldest}})
+        logger.info(f"LLM CACHE: Trimmed {len(oldest)} persistent entries")
+
+
+async def get(key: str, endpoint: str) -> Optional[str]:
+    """Return a cached completion or None. Memory first, then MongoDB (which back-fills memory)."""
+    if ttl_for(endpoint) <= 0:
+        return None
+
+    value = _memory_get(key)
+    if value is not None:
+        _count(endpoint, "memory_hits")
+        return value
+
+    if _collection is not None:
+        try:
+            doc = await asyncio.to_thread(_persistent_get, key)
+        except Exception as e:
+            logger.warning(f"LLM CACHE: Persistent lookup failed: {e}")
+            doc = None
+        if doc:
+            remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+            if remaining > 0:
+                _memory_put(key, doc["value"], int(remaining), endpoint)
+            _count(endpoint, "persistent_hits")
+            return doc["value"]
+
+    _count(endpoint, "misses")
+    return None
+
+
+async def put(key: str, value: str, endpoint: str, model: str = ""):
+    """Store a completion in both tiers using the endpoint's TTL."""
+    ttl = ttl_for(endpoint)
+    if ttl <= 0 or not value or len(value.encode("utf-8")) > MAX_ENTRY_BYTES:
+        return
+
+    _memory_put(key, value, ttl, endpoint)
+    _count(endpoint, "stores")
+
+    if _collection is not None:
+        try:
+            await asyncio.to_thread(_persistent_put, key, value, ttl, endpoint, model)
+        except Exception as e:
+            logger.warning(f"LLM CACHE: Persistent store failed: {e}")
+
+
+def clear_memory():
+    global _memory_bytes
+    _memory.clear()
+    _memory_bytes = 0
+
+
+def get_stats() -> Dict[str, Any]:
+    endpoints = {}
+    for name, bucket in _stats.items():
+        hits = bucket["memory_hits"] + bucket["persistent_hits"]
+        lookups = hits + bucket["misses"]
+        endpoints[name] = {**bucket, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+    return {
+        "memory_entries": len(_memory),
+        "memory_bytes": _memory_bytes,
+        "max_memory_entries": MAX_MEMORY_ENTRIES,
+        "max_memory_bytes": MAX_MEMORY_BYTES,
+        "persistent": _collection is not None,
+        "endpoints": endpoints,
+    }
@@ -0,0 +1,463 @@
+"""
+LLM Gateway
+Single entry point for every NVIDIA chat-completion call in the backend.
+Owns the LLM connection pool, caps in-flight requests globally and per endpoint,
+retries with jittered async backoff inside the caller's deadline, and extracts
+JSON from model output in one place
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from utils import http_client, llm_cache
+
+logger = logging.getLogger("llm_gateway")
+
+NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
+CHAT_COMPLETIONS_URL = f"{NVIDIA_BASE_URL}/chat/completions"
+DEFAULT_MODEL = "qwen/qwen3-coder-480b-a35b-instruct"
+
+# Concurrency caps: one global limit plus a smaller one per calling endpoint so a
+# burst on /analyze-narrative cannot starve the tutor or the LMS
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+DEFAULT_ENDPOINT_LIMIT = int(os.getenv("LLM_MAX_IN_FLIGHT_PER_ENDPOINT", "4"))
+ENDPOINT_LIMITS = {
+    "analyze-narrative": 2,
+    "smart-feed": 2,
+    "url-narrative": 2,
+    "case-study": 2,
+    "journalist-profile": 2,
+    "generate-assignment": 2,
+    "ai-tutor": 4,
+    "analyze-article": 4,
+}
+
+# Backoff: full jitter, base * 2^attempt capped at BACKOFF_CAP seconds
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "10.0"))
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Parses a reply into the caller's expected format; raising or a falsy result marks it unusable
+Validator = Callable[[str], Any]
+
+_client: Optional[httpx.AsyncClient] = None
+_global_limit: Optional[asyncio.Semaphore] = None
+_endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class LLMError(Exception):
+    """Base error for gateway failures"""
+
+
+class LLMTimeoutError(LLMError):
+    """The call (including queueing and retries) ran past its deadline"""
+
+
+class LLMResponseError(LLMError):
+    """The provider answered with an error status or an unusable body"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_configured() -> bool:
+    """True when an NVIDIA API key is available"""
+    return bool(os.getenv("NVIDIA_API_KEY"))
+
+
+def deadline_in(seconds: float) -> float:
+    """Absolute deadline (monotonic clock) `seconds` from now, for passing down a call chain"""
+    return time.monotonic() + seconds
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Dedicated pool for LLM traffic; long generations never hold SERP/NewsData sockets"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = http_client.create_client(
+            max_connections=MAX_IN_FLIGHT * 2,
+            max_keepalive_connections=MAX_IN_FLIGHT,
+        )
+        logger.info(f"LLM: Gateway pool ready (max_in_flight={MAX_IN_FLIGHT})")
+    return _client
+
+
+def _get_limits(endpoint: str):
+    global _global_limit
+    if _global_limit is None:
+        _global_limit = asyncio.Semaphore(MAX_IN_FLIGHT)
+    if endpoint not in _endpoint_limits:
+        _endpoint_limits[endpoint] = asyncio.Semaphore(ENDPOINT_LIMITS.get(endpoint, DEFAULT_ENDPOINT_LIMIT))
+    return _global_limit, _endpoint_limits[endpoint]
+
+
+def _count(endpoint: str, key: str):
+    bucket = _stats.setdefault(endpoint, {"calls": 0, "retries": 0, "errors": 0, "timeouts": 0, "in_flight": 0})
+    bucket[key] += 1
+
+
+async def _acquire(sem: asyncio.Semaphore, deadline: Optional[float]):
+    remaining = _remaining(deadline)
+    if remaining is None:
+        await sem.acquire()
+        return
+    if remaining <= 0:
+        raise LLMTimeoutError("Deadline exceeded while waiting for an LLM slot")
+    try:
+        await asyncio.wait_for(sem.acquire(), timeout=remaining)
+    except asyncio.TimeoutError:
+        raise LLMTimeoutError("Deadline exceeded while waiting for an LLM slot")
+
+
+def _build_request(model: str, messages: List[Dict[str, str]], temperature: float,
+                   max_tokens: int, top_p: Optional[float], stream: bool = False):
+    api_key = os.getenv("NVIDIA_API_KEY")
+    if not api_key:
+        raise LLMResponseError("NVIDIA_API_KEY not configured")
+
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if top_p is not None:
+        payload["top_p"] = top_p
+    if stream:
+        payload["stream"] = True
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    return payload, headers
+
+
+async def _acquire_slots(endpoint: str, deadline: Optional[float]):
+    global_limit, endpoint_limit = _get_limits(endpoint)
+    _count(endpoint, "calls")
+    try:
+        await _acquire(endpoint_limit, deadline)
+    except LLMError:
+        _count(endpoint, "timeouts")
+        raise
+    try:
+        await _acquire(global_limit, deadline)
+    except LLMError:
+        endpoint_limit.release()
+        _count(endpoint, "timeouts")
+        raise
+    _stats[endpoint]["in_flight"] += 1
+    return global_limit, endpoint_limit
+
+
+def _release_slots(endpoint: str, limits):
+    _stats[endpoint]["in_flight"] -= 1
+    for sem in limits:
+        sem.release()
+
+
+def _attempt_timeout(timeout: float, deadline: Optional[float]) -> Optional[float]:
+    """Per-attempt timeout clipped to the deadline; None once the deadline has passed."""
+    remaining = _remaining(deadline)
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        return None
+    return min(timeout, remaining)
+
+
+async def _backoff(endpoint: str, attempt: int, deadline: Optional[float]) -> bool:
+    """Sleep before the next attempt; False when the sleep would run past the deadline."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    remaining = _remaining(deadline)
+    if remaining is not None and delay >= remaining:
+        return False
+    _count(endpoint, "retries")
+    await asyncio.sleep(delay)
+    return True
+
+
+def _final_error(last_error: Optional[LLMError], deadline: Optional[float]) -> LLMError:
+    remaining = _remaining(deadline)
+    if last_error is None or (remaining is not None and remaining <= 0):
+        return LLMTimeoutError("Deadline exceeded before the LLM answered")
+    return last_error
+
+
+def _valid(content: str, validate: Optional[Validator]) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(content))
+    except Exception:
+        return False
+
+
+def _cacheable(endpoint: str, content: str, finish_reason: Optional[str], validate: Optional[Validator]) -> bool:
+    """Truncated or unparseable replies are returned to the caller but never cached, so a retry asks again."""
+    if finish_reason == "length":
+        logger.warning(f"LLM: [{endpoint}] reply hit max_tokens; not caching")
+        return False
+    if not _valid(content, validate):
+        logger.warning(f"LLM: [{endpoint}] reply failed validation; not caching")
+        return False
+    return True
+
+
+async def chat_completion(
+    messages: List[Dict[str, str]],
+    *,
+    endpoint: str = "default",
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.3,
+    max_tokens: int = 1000,
+    top_p: Optional[float] = None,
+    timeout: float = 60.0,
+    max_attempts: int = 3,
+    deadline: Optional[float] = None,
+    cache: bool = True,
+    validate: Optional[Validator] = None,
+) -> str:
+    """
+    Run one chat completion and return the assistant message content.
+
+    `timeout` bounds a single attempt; `deadline` (see deadline_in) bounds the whole
+    call including time spent queued behind the concurrency caps and backoff sleeps.
+    Identical requests are served from utils.llm_cache (per-endpoint TTL) unless cache=False.
+    A reply is only cached when it was not cut off at max_tokens and passes `validate` (a parser
+    for the format the caller expects, e.g. extract_json; raising or returning a falsy value rejects it).
+    Raises LLMTimeoutError / LLMResponseError (both LLMError) on failure.
+    """
+    cache_key = None
+    if cache:
+        cache_key = llm_cache.make_key(model, messages, temperature, max_tokens, top_p)
+        cached = await llm_cache.get(cache_key, endpoint)
+        if cached is not None and _valid(cached, validate):
+            logger.info(f"LLM: [{endpoint}] cache hit")
+            return cached
+
+    payload, headers = _build_request(model, messages, temperature, max_tokens, top_p)
+    limits = await _acquire_slots(endpoint, deadline)
+    try:
+        last_error: Optional[LLMError] = None
+        for attempt in range(max_attempts):
+            attempt_timeout = _attempt_timeout(timeout, deadline)
+            if attempt_timeout is None:
+                break
+
+            try:
+                logger.info(f"LLM: [{endpoint}] attempt {attempt + 1}/{max_attempts} (timeout {attempt_timeout:.0f}s)")
+                response = await _get_client().post(
+                    CHAT_COMPLETIONS_URL,
+                    headers=headers,
+                    json=payload,
+                    timeout=httpx.Timeout(attempt_timeout, connect=10.0),
+                )
+                if response.status_code == 200:
+                    try:
+                        choice = response.json()["choices"][0]
+                        content = choice["message"]["content"].strip()
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                        raise LLMResponseError("Malformed completion body", response.status_code)
+                    if cache_key is not None and _cacheable(endpoint, content, choice.get("finish_reason"), validate):
+                        await llm_cache.put(cache_key, content, endpoint, model)
+                    return content
+
+                last_error = LLMResponseError(
+                    f"LLM API error {response.status_code}: {response.text[:200]}", response.status_code
+                )
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise last_error
+                logger.warning(f"LLM: [{endpoint}] retryable status {response.status_code}")
+
+            except httpx.TimeoutException:
+                last_error = LLMTimeoutError(f"LLM request timed out after {attempt_timeout:.0f}s")
+                logger.warning(f"LLM: [{endpoint}] timeout on attempt {attempt + 1}")
+            except httpx.HTTPError as e:
+                last_error = LLMResponseError(f"LLM connection error: {e}")
+                logger.warning(f"LLM: [{endpoint}] connection error on attempt {attempt + 1}: {e}")
+
+            if attempt + 1 < max_attempts and not await _backoff(endpoint, attempt, deadline):
+                break
+
+        raise _final_error(last_error, deadline)
+
+    except LLMTimeoutError:
+        _count(endpoint, "timeouts")
+        raise
+    except LLMError:
+        _count(endpoint, "errors")
+        raise
+    finally:
+        _release_slots(endpoint, limits)
+
+
+async def stream_chat_completion(
+    messages: List[Dict[str, str]],
+    *,
+    endpoint: str = "default",
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.3,
+    max_tokens: int = 1000,
+    top_p: Optional[float] = None,
+    timeout: float = 60.0,
+    max_attempts: int = 3,
+    deadline: Optional[float] = None,
+    cache: bool = True,
+    validate: Optional[Validator] = None,
+) -> AsyncIterator[str]:
+    """
+    Same contract as chat_completion but yields content deltas as the provider emits them.
+
+    Retries only happen before the first token arrives; once text has been yielded a
+    failure is raised to the caller. `timeout` is the max gap between chunks. A cache hit
+    is yielded as a single chunk, and the assembled text is cached on completion under the
+    same finish_reason/`validate` rules as chat_completion.
+    """
+    cache_key = None
+    if cache:
+        cache_key = llm_cache.make_key(model, messages, temperature, max_tokens, top_p)
+        cached = await llm_cache.get(cache_key, endpoint)
+        if cached is not None and _valid(cached, validate):
+            logger.info(f"LLM: [{endpoint}] cache hit (stream)")
+            yield cached
+            return
+
+    payload, headers = _build_request(model, messages, temperature, max_tokens, top_p, stream=True)
+    limits = await _acquire_slots(endpoint, deadline)
+    parts: List[str] = []
+    try:
+        last_error: Optional[LLMError] = None
+        for attempt in range(max_attempts):
+            attempt_timeout = _attempt_timeout(timeout, deadline)
+            if attempt_timeout is None:
+                break
+
+            try:
+                logger.info(f"LLM: [{endpoint}] stream attempt {attempt + 1}/{max_attempts}")
+                async with _get_client().stream(
+                    "POST",
+                    CHAT_COMPLETIONS_URL,
+                    headers=headers,
+                    json=payload,
+                    timeout=httpx.Timeout(attempt_timeout, connect=10.0),
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        last_error = LLMResponseError(
+                            f"LLM API error {response.status_code}: {body[:200]}", response.status_code
+                        )
+                        if response.status_code not in RETRYABLE_STATUS:
+                            raise last_error
+                        logger.warning(f"LLM: [{endpoint}] retryable status {response.status_code}")
+                    else:
+                        finish_reason = None
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            try:
+                                choice = json.loads(data)["choices"][0]
+                                delta = choice["delta"].get("content")
+                            except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                                continue
+                            finish_reason = choice.get("finish_reason") or finish_reason
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                            remaining = _remaining(deadline)
+                            if remaining is not None and remaining <= 0:
+                                raise LLMTimeoutError("Deadline exceeded while streaming")
+
+                        content = "".join(parts).strip()
+                        if cache_key is not None and parts and _cacheable(endpoint, content, finish_reason, validate):
+                            await llm_cache.put(cache_key, content, endpoint, model)
+                        return
+
+            except httpx.TimeoutException:
+                last_error = LLMTimeoutError(f"LLM stream stalled for {attempt_timeout:.0f}s")
+                logger.warning(f"LLM: [{endpoint}] stream timeout on attempt {attempt + 1}")
+            except httpx.HTTPError as e:
+                last_error = LLMResponseError(f"LLM connection error: {e}")
+                logger.warning(f"LLM: [{endpoint}] stream connection error on attempt {attempt + 1}: {e}")
+
+            if parts:
+                # Tokens already reached the client; a retry would duplicate them
+                raise last_error
+            if attempt + 1 < max_attempts and not await _backoff(endpoint, attempt, deadline):
+                break
+
+        raise _final_error(last_error, deadline)
+
+    except LLMTimeoutError:
+        _count(endpoint, "timeouts")
+        raise
+    except LLMError:
+        _count(endpoint, "errors")
+        raise
+    finally:
+        _release_slots(endpoint, limits)
+
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def extract_json(content: str) -> Any:
+    """
+    Parse the JSON object out of a model reply.
+    Handles ```json fences and leading/trailing prose; raises ValueError if nothing parses.
+    """
+    text = _FENCE_RE.sub("", (content or "").strip()).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in LLM response")
+    return json.loads(text[start:end + 1])
+
+
+async def complete_json(messages: List[Dict[str, str]], **kwargs) -> Any:
+    """chat_completion + extract_json; only replies that parse are cached"""
+    return extract_json(await chat_completion(messages, validate=extract_json, **kwargs))
+
+
+def get_stats() -> Dict[str, Any]:
+    """Per-endpoint counters for monitoring"""
+    return {
+        "max_in_flight": MAX_IN_FLIGHT,
+        "endpoint_limits": {name: ENDPOINT_LIMITS.get(name, DEFAULT_ENDPOINT_LIMIT) for name in _stats},
+        "endpoints": {name: dict(bucket) for name, bucket in _stats.items()},
+    }
+
+
+async def close_llm_client():
+    """Close the gateway pool (called on application shutdown)."""
+    global _client, _global_limit
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("LLM: Gateway pool closed")
+    _client = None
+    _global_limit = None
+    _endpoint_limits.clear()
@@ -0,0 +1,304 @@
+"""
+URL Narrative Result Cache
+Persists /analyze-url-narrative results keyed on a canonical form of the
+article URL: tracking parameters are stripped, AMP and mobile variants fold
+onto the desktop address, and the page's rel=canonical is honoured, so every
+variant of a link shares one analysis. A result is fresh for a while, then
+served stale while a background refresh runs. Refreshes are partial: the
+article extraction and AI insights are reused and only the related coverage
+(SERP search and the analyses built on it) is recomputed
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bson import Binary
+
+from utils import serialization
+
+logger = logging.getLogger("narrative_cache")
+
+# Related coverage is re-searched once a result is older than this
+FRESH_S = int(os.getenv("NARRATIVE_CACHE_FRESH", "3600"))
+# Up to this age a stale result is served immediately while it refreshes in the background
+STALE_SERVE_S = int(os.getenv("NARRATIVE_CACHE_STALE", str(24 * 3600)))
+# The article extraction and AI insights are reused by refreshes for this long
+ARTICLE_TTL_S = int(os.getenv("NARRATIVE_CACHE_ARTICLE_TTL", str(7 * 24 * 3600)))
+# Unrequested results are dropped by the TTL index after this long
+RETENTION_DAYS = int(os.getenv("NARRATIVE_CACHE_RETENTION_DAYS", "14"))
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "ocid", "smid", "smtyp", "src", "share",
+    "amp", "outputtype", "output", "utm",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "at_", "hsa_")
+MOBILE_PREFIXES = ("m.", "mobile.", "amp.")
+
+Analyze = Callable[..., Awaitable[Dict[str, Any]]]
+Extract = Callable[[str], Awaitable[Dict[str, Any]]]
+
+_collection = None
+_analyze: Optional[Analyze] = None
+_extract: Optional[Extract] = None
+_inflight: Dict[str, asyncio.Task] = {}
+_stats = {"fresh": 0, "stale": 0, "partial_refreshes": 0, "full_builds": 0, "canonical_hits": 0, "errors": 0}
+
+
+def init_narrative_cache(database, analyze: Analyze, extract: Extract):
+    """Attach storage plus the analyzer and extractor coroutines (called from main)."""
+    global _collection, _analyze, _extract
+    _collection = database["url_narratives"]
+    _analyze = analyze
+    _extract = extract
+    logger.info("SUCCESS: URL narrative cache attached")
+
+
+def _unwrap_amp_cache(parts):
+    # https://www-example-com.cdn.ampproject.org/c/s/www.example.com/story -> https://www.example.com/story
+    if parts.netloc.endswith(".cdn.ampproject.org"):
+        segments = parts.path.lstrip("/").split("/")
+        if segments and segments[0] in ("c", "v"):
+            segments = segments[1:]
+            scheme = "http"
+            if segments and segments[0] == "s":
+                scheme, segments = "https", segments[1:]
+            if segments:
+                return urlsplit(f"{scheme}://{'/'.join(segments)}" + (f"?{parts.query}" if parts.query else ""))
+    return parts
+
+
+def _strip_amp_path(path: str) -> str:
+    segments = [s for s in path.split("/") if s and s.lower() != "amp"]
+    path = "/" + "/".join(segments)
+    for suffix in (".amp.html", ".amp"):
+        if path.lower().endswith(suffix):
+            path = path[: -len(suffix)] + (".html" if suffix == ".amp.html" else "")
+    return path
+
+
+def canonical_url(url: str) -> str:
+    """Stable identity for an article link; variants of the same page map to the same string."""
+    parts = urlsplit(url.strip())
+    if not parts.scheme:
+        parts = urlsplit("https://" + url.strip())
+    parts = _unwrap_amp_cache(parts)
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for prefix in MOBILE_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=False)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = _strip_amp_path(parts.path).rstrip("/") or "/"
+    # Scheme is dropped: http and https copies of a page are the same article
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+def _variant(days: int, enrich: bool) -> str:
+    return f"d{days}|e{int(enrich)}"
+
+
+def _age_s(stamp: datetime) -> float:
+    return (datetime.utcnow() - stamp).total_seconds()
+
+
+def _encode(value: Any) -> Binary:
+    # Stored as JSON bytes: analysis dicts are keyed by source names, which may contain '.' or '$'
+    return Binary(serialization.dumps(value))
+
+
+def _decode(blob: Any) -> Any:
+    return json.loads(bytes(blob))
+
+
+def _find(alias: str, variant: str) -> Optional[Dict[str, Any]]:
+    return _collection.find_one_and_update(
+        {"aliases": alias, "variant": variant},
+        {"$set": {"last_requested_at": datetime.utcnow()}},
+    )
+
+
+def _find_article(alias: str) -> Optional[Dict[str, Any]]:
+    """Reusable extraction + AI insights for the page from any variant (days/enrich) analyzed recently."""
+    return _collection.find_one(
+        {"aliases": alias, "article_at": {"$gte": datetime.utcnow() - timedelta(seconds=ARTICLE_TTL_S)}},
+        {"canonical_url": 1, "inputs": 1, "article_at": 1},
+        sort=[("article_at", -1)],
+    )
+
+
+def _add_alias(doc_id: Any, alias: str):
+    _collection.update_one({"_id": doc_id}, {"$addToSet": {"aliases": alias}})
+
+
+def _save(canonical: str, variant: str, aliases: List[str], result: Dict[str, Any],
+          inputs: Dict[str, Any], article_at: datetime) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    doc = {
+        "canonical_url": canonical,
+        "variant": variant,
+        "result": _encode(result),
+        "inputs": _encode(inputs),
+        "article_at": article_at,
+        "generated_at": now,
+        "last_requested_at": now,
+    }
+    if _collection is not None:
+        _collection.update_one(
+            {"_id": f"{canonical}|{variant}"},
+            {"$set": doc, "$addToSet": {"aliases": {"$each": aliases}}},
+            upsert=True,
+        )
+    return doc
+
+
+def _cache_block(doc: Dict[str, Any], status: str, canonical: str, refreshing: bool = False) -> Dict[str, Any]:
+    return {
+        "status": status,
+        "canonical_url": canonical,
+        "generated_at": doc["generated_at"].isoformat(),
+        "age_s": round(_age_s(doc["generated_at"]), 1),
+        "refreshing": refreshing,
+    }
+
+
+def _respond(doc: Dict[str, Any], status: str, canonical: str, refreshing: bool = False) -> Dict[str, Any]:
+    result = _decode(doc["result"])
+    result["cache"] = _cache_block(doc, status, canonical, refreshing)
+    return result
+
+
+async def _build(key: str, url: str, canonical: str, variant: str, aliases: List[str], days: int, enrich: bool,
+                 serp_api_key: str, ai_api_key: str, inputs: Optional[Dict[str, Any]],
+                 article_at: Optional[datetime]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    started = time.time()
+    inputs = inputs or {}
+    result = await _analyze(
+        url, serp_api_key, ai_api_key, days, enrich=enrich,
+        original_article=inputs.get("original_article"),
+        # An empty analysis means the LLM was unavailable last time; try it again
+        ai_analysis=inputs.get("ai_analysis") or None,
+        include_inputs=True,
+    )
+    new_inputs = result.pop("inputs", None)
+    if result.get("status") != "success" or not new_inputs:
+        return result, None
+
+    reused = bool(inputs.get("ai_analysis"))
+    doc = await asyncio.to_thread(
+        _save, canonical, variant, aliases, result, new_inputs,
+        article_at if reused and article_at else datetime.utcnow(),
+    )
+    _stats["partial_refreshes" if reused else "full_builds"] += 1
+    logger.info(f"NARRATIVE CACHE: {'Refreshed' if reused else 'Built'} '{key}' in {time.time() - started:.1f}s")
+    return result, doc
+
+
+def _build_once(key: str, *args) -> asyncio.Task:
+    """Single-flight per result key: concurrent misses and refreshes share one analysis."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_build(key, *args))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+def _refresh_in_background(key: str, *args):
+    task = _build_once(key, *args)
+
+    def _log_failure(t: asyncio.Task):
+        if not t.cancelled() and t.exception() is not None:
+            _stats["errors"] += 1
+            logger.error(f"NARRATIVE CACHE: Background refresh of '{key}' failed: {t.exception()}")
+    task.add_done_callback(_log_failure)
+
+
+async def get_analysis(url: str, serp_api_key: str, ai_api_key: str, days: int = 14,
+                       enrich: bool = False) -> Dict[str, Any]:
+    """
+    Narrative analysis for `url` with a `cache` block: the stored result when fresh, the stored result
+    marked stale with a partial refresh started, or a new analysis (partial when the page's extraction
+    and AI insights are still on record).
+    """
+    if _collection is None:
+        return await _analyze(url, serp_api_key, ai_api_key, days, enrich=enrich)
+
+    variant = _variant(days, enrich)
+    alias = canonical_url(url)
+    doc = await asyncio.to_thread(_find, alias, variant)
+    stored = None
+
+    if doc is not None:
+        canonical = doc["canonical_url"]
+    else:
+        stored = await asyncio.to_thread(_find_article, alias)
+        if stored is not None:
+            # Page known from another variant: reuse its extraction and AI insights, refresh only the coverage
+            canonical = stored["canonical_url"]
+            inputs = _decode(stored["inputs"])
+        else:
+            # Unknown link form: the page's own rel=canonical may point at a result already stored
+            original_article = await _extract(url)
+            if not original_article.get("success") or not original_article.get("title"):
+                # The analyzer rejects the failed extraction with its usual error shape
+                return await _analyze(url, serp_api_key, ai_api_key, days, enrich=enrich,
+                                      original_article=original_article)
+            page_canonical = original_article.get("canonical_url")
+            canonical = canonical_url(page_canonical) if page_canonical else alias
+            inputs = {"original_article": original_article}
+            if canonical != alias:
+                doc = await asyncio.to_thread(_find, canonical, variant)
+                if doc is not None:
+                    _stats["canonical_hits"] += 1
+                    await asyncio.to_thread(_add_alias, doc["_id"], alias)
+                else:
+                    stored = await asyncio.to_thread(_find_article, canonical)
+                    if stored is not None:
+                        # Keep the stored AI insights but the extraction just made is the newest copy
+                        inputs = {**_decode(stored["inputs"]), "original_article": original_article}
+
+    key = f"{canonical}|{variant}"
+    aliases = sorted({alias, canonical})
+
+    if doc is not None:
+        age = _age_s(doc["generated_at"])
+        if age < FRESH_S:
+            _stats["fresh"] += 1
+            return _respond(doc, "fresh", canonical)
+        article_fresh = _age_s(doc["article_at"]) < ARTICLE_TTL_S
+        build_args = (url, canonical, variant, aliases, days, enrich, serp_api_key, ai_api_key,
+                      _decode(doc["inputs"]) if article_fresh else None,
+                      doc["article_at"] if article_fresh else None)
+        if age < STALE_SERVE_S:
+            _stats["stale"] += 1
+            _refresh_in_background(key, *build_args)
+            return _respond(doc, "stale", canonical, refreshing=True)
+    else:
+        build_args = (url, canonical, variant, aliases, days, enrich, serp_api_key, ai_api_key,
+                      inputs, stored["article_at"] if stored else None)
+
+    # shield: a client disconnecting must not throw away an analysis other requests may be waiting on
+    result, stored_doc = await asyncio.shield(_build_once(key, *build_args))
+    if stored_doc is None:
+        return result
+    result = dict(result)
+    result["cache"] = _cache_block(stored_doc, "refreshed" if doc is not None else "miss", canonical)
+    return result
+
+
+def get_stats() -> Dict[str, Any]:
+    return {**_stats, "building": len(_inflight), "fresh_s": FRESH_S, "stale_serve_s": STALE_SERVE_S}
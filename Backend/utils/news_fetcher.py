@@ -1,9 +1,12 @@
 import os
-import requests
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
 import logging
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from utils import http_client, story_clusters, smart_digests, http_cache
+from utils.rate_limiter import TokenBucket
 
 load_dotenv()
 
@@ -12,29 +15,33 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-MONGO_URI = os.getenv("MONGO_URI")
 
-# MongoDB connection
-try:
-    client = MongoClient(MONGO_URI)
-    db = client["datahalo"]
+# NewsData.io quotas are per API key; every fetch (request path or refresh fan-out) shares this bucket
+NEWSDATA_BURST = int(os.getenv("NEWSDATA_BURST", "10"))
+NEWSDATA_REQUESTS_PER_MINUTE = float(os.getenv("NEWSDATA_REQUESTS_PER_MINUTE", "30"))
+NEWSDATA_MAX_WAIT = float(os.getenv("NEWSDATA_MAX_WAIT", "20"))
+newsdata_limiter = TokenBucket("newsdata", NEWSDATA_REQUESTS_PER_MINUTE / 60.0, NEWSDATA_BURST)
+
+# Set by init_news_fetcher() with the shared connection from utils.database
+db = None
+news_collection = None
+
+def init_news_fetcher(database):
+    """Attach the shared database handle (called from main.py)."""
+    global db, news_collection
+    db = database
     news_collection = db["news"]
-    logger.info("SUCCESS: MongoDB connected successfully")
-except Exception as e:
-    logger.error(f"ERROR: MongoDB connection failed: {e}")
-    client = None
-    db = None
-    news_collection = None
-
-def fetch_news(category="general", language="en", page_size=30, country="in"):
+    logger.info("SUCCESS: News fetcher using shared MongoDB pool")
+
+async def fetch_news(category="general", language="en", page_size=30, country="in"):
     """Fetch latest news and APPEND to database (don't delete old articles)."""
     if not NEWS_API_KEY:
         logger.error("ERROR: NEWS_API_KEY not configured")
-        return {"count": 0, "articles": [], "error": "API key not configured"}
+        return {"count": 0, "inserted_ids": [], "error": "API key not configured"}
     
     if news_collection is None:
         logger.error("ERROR: Database not available")
-        return {"count": 0, "articles": [], "error": "Database not available"}
+        return {"count": 0, "inserted_ids": [], "error": "Database not available"}
 
     logger.info(f"WEB: Fetching fresh {category} news from NewsData.io")
 
@@ -62,110 +69,146 @@ def fetch_news(category="general", language="en", page_size=30, country="in"):
         "size": min(page_size, 10)
     }
     
-    articles = []
-    
+    if not await newsdata_limiter.acquire(max_wait=NEWSDATA_MAX_WAIT):
+        logger.warning(f"RATE LIMIT: NewsData.io quota exhausted, skipping {category}/{country}")
+        return {"count": 0, "inserted_ids": [], "error": "Rate limited by NewsData.io quota"}
+
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = await http_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
-        if data.get("status") == "success":
-            results = data.get("results", [])
-            logger.info(f"NEWS: Got {len(results)} articles from NewsData.io")
-            
-            # Convert NewsData.io format to our format
-            for item in results:
-                if not item.get("title") or not item.get("link"):
-                    continue
-                    
-                articles.append({
-                    "title": item["title"],
-                    "description": item.get("description", ""),
-                    "url": item["link"],
-                    "image": item.get("image_url"),
-                    "source": {"name": item.get("source_id", "Unknown")},
-                    "publishedAt": item.get("pubDate"),
-                    "content": item.get("content", "")
-                })
-        else:
+        if data.get("status") != "success":
             logger.error(f"ERROR: NewsData.io API error: {data}")
-            return {"count": 0, "articles": [], "error": data.get("message", "API error")}
+            return {"count": 0, "inserted_ids": [], "error": data.get("message", "API error")}
+
+        results = data.get("results", [])
+        logger.info(f"NEWS: Got {len(results)} articles from NewsData.io")
             
     except Exception as e:
         logger.error(f"ERROR: NewsData.io request failed: {e}")
-        return {"count": 0, "articles": [], "error": f"API request failed: {str(e)}"}
+        return {"count": 0, "inserted_ids": [], "error": f"API request failed: {str(e)}"}
 
+    articles = normalize_articles(results, category)
     if not articles:
         logger.warning("WARNING: No articles found from NewsData.io")
-        return {"count": 0, "articles": [], "error": "No articles found"}
+        return {"count": 0, "inserted_ids": [], "error": "No articles found"}
 
-    # 3️⃣ Process and store NEW articles (append, don't replace)
-    stored_count = 0
-    new_articles = []
-    duplicate_count = 0
-    
+    # Store the whole page in one round trip (append, don't replace)
     try:
-        for item in articles:
-            if not item.get("title") or not item.get("url") or item.get("title") == "[Removed]":
-                continue
-            
-            # Check if article already exists
-            existing = news_collection.find_one({"url": item["url"]})
-            if existing:
-                duplicate_count += 1
-                continue  # Skip duplicates
-                
-            article = {
-                "title": item["title"],
-                "description": item.get("description", ""),
-                "url": item["url"],
-                "image": item.get("image"),
-                "source": item.get("source", {}).get("name", "Unknown"),
-                "publishedAt": item.get("publishedAt"),
-                "category": category,
-                "fetchedAt": datetime.utcnow(),
-            }
-            
-            try:
-                result = news_collection.insert_one(article)
-                article["_id"] = str(result.inserted_id)
-                new_articles.append(article)
-                stored_count += 1
-            except Exception as e:
-                logger.error(f"ERROR: Failed to store article: {e}")
-                continue
-
-        logger.info(f"SUCCESS: Stored {stored_count} NEW {category} articles in DB (skipped {duplicate_count} duplicates)")
-        
-        # Get all articles for this category sorted by newest first
-        all_articles = get_saved_articles(category=category, limit=100)
-        
-        return {
-            "count": stored_count,
-            "new_articles": new_articles,
-            "all_articles": all_articles,
-            "total_in_db": len(all_articles),
-            "duplicates_skipped": duplicate_count,
-            "status": "success"
-        }
-        
+        stored = await asyncio.to_thread(store_articles, articles)
     except Exception as e:
         logger.error(f"ERROR: Database operation failed: {e}")
-        return {"count": 0, "articles": [], "error": f"Database error: {str(e)}"}
+        return {"count": 0, "inserted_ids": [], "error": f"Database error: {str(e)}"}
 
-def refresh_news(category="general", language="en", page_size=30, country="in"):
+    logger.info(f"SUCCESS: Stored {stored['count']} NEW {category} articles in DB (skipped {stored['duplicates_skipped']} duplicates)")
+    return {**stored, "status": "success"}
+
+def normalize_articles(results, category, fetched_at=None):
+    """
+    Convert one NewsData.io results page to our document format.
+    Drops unusable items and repeats of the same URL within the page.
+    """
+    fetched_at = fetched_at or datetime.utcnow()
+    articles = []
+    seen_urls = set()
+    for item in results:
+        title = item.get("title")
+        link = item.get("link")
+        if not title or not link or title == "[Removed]" or link in seen_urls:
+            continue
+        seen_urls.add(link)
+        articles.append({
+            "title": title,
+            "description": item.get("description") or "",
+            "url": link,
+            "image": item.get("image_url"),
+            "source": item.get("source_id") or "Unknown",
+            "publishedAt": item.get("pubDate"),
+            "category": category,
+            "fetchedAt": fetched_at,
+        })
+    return articles
+
+def store_articles(articles):
+    """
+    Insert articles that aren't stored yet with a single unordered bulk_write of upserts.
+    $setOnInsert leaves existing documents untouched, so matches are duplicates.
+    Relies on the unique news.url index (utils.indexes) to stay duplicate-free under concurrent refreshes.
+    """
+    if not articles:
+        return {"count": 0, "inserted_ids": [], "duplicates_skipped": 0}
+
+    # Tag near-duplicates (syndicated copies) with the story cluster they belong to
+    story_clusters.annotate(news_collection, articles)
+
+    operations = [
+        UpdateOne({"url": article["url"]}, {"$setOnInsert": article}, upsert=True)
+        for article in articles
+    ]
+    try:
+        result = news_collection.bulk_write(operations, ordered=False)
+        upserted = result.upserted_ids  # {operation index: _id}
+        matched = result.matched_count
+    except BulkWriteError as e:
+        # A concurrent refresh inserted the same URL between our match and insert (E11000);
+        # everything else in the unordered batch was still applied.
+        details = e.details
+        non_duplicate = [err for err in details.get("writeErrors", []) if err.get("code") != 11000]
+        if non_duplicate:
+            raise
+        upserted = {entry["index"]: entry["_id"] for entry in details.get("upserted", [])}
+        matched = details.get("nMatched", 0) + len(details.get("writeErrors", []))
+
+    inserted_ids = [str(upserted[i]) for i in sorted(upserted)]
+    if inserted_ids:
+        http_cache.bump("news")
+    return {
+        "count": len(inserted_ids),
+        "inserted_ids": inserted_ids,
+        "duplicates_skipped": matched,
+    }
+
+async def refresh_news(category="general", language="en", page_size=30, country="in"):
     """
     Refresh news: Fetch fresh articles and append to existing ones.
-    Returns all articles with newest at the top.
+    Returns counts and the IDs of newly inserted articles; read them back with get_saved_articles.
     """
     logger.info(f"REFRESH: Refreshing {category} news...")
-    result = fetch_news(category, language, page_size, country)
+    result = await fetch_news(category, language, page_size, country)
     
     if result.get("status") == "success":
-        logger.info(f"SUCCESS: Refresh complete: {result['count']} new articles added, {result['total_in_db']} total in DB")
+        logger.info(f"SUCCESS: Refresh complete: {result['count']} new articles added, {result['duplicates_skipped']} already stored")
     
     return result
 
+async def refresh_countries(category="general", countries=("in",), language="en", page_size=30):
+    """
+    Refresh one category for several countries concurrently.
+    The NewsData token bucket paces the fan-out; results are aggregated without reading back from MongoDB.
+    """
+    results = await asyncio.gather(
+        *(fetch_news(category, language, page_size, country) for country in countries),
+        return_exceptions=True,
+    )
+
+    summary = {"count": 0, "inserted_ids": [], "duplicates_skipped": 0, "failed": {}}
+    for country, result in zip(countries, results):
+        if isinstance(result, Exception):
+            result = {"error": str(result)}
+        if result.get("status") != "success":
+            logger.warning(f"REFRESH: Country '{country}' failed: {result.get('error')}")
+            summary["failed"][country] = result.get("error")
+            continue
+        summary["count"] += result["count"]
+        summary["inserted_ids"].extend(result["inserted_ids"])
+        summary["duplicates_skipped"] += result["duplicates_skipped"]
+
+    logger.info(f"REFRESH: {category} across {len(countries)} countries: {summary['count']} new, {summary['duplicates_skipped']} duplicates, {len(summary['failed'])} failed")
+    if summary["count"]:
+        smart_digests.notify_ingested(category)
+    return summary
+
 def get_saved_articles(category="all", limit=100):
     """Get articles from MongoDB sorted by fetchedAt (newest first)."""
     if news_collection is None:
@@ -175,7 +218,7 @@ def get_saved_articles(category="all", limit=100):
         query = {} if category == "all" else {"category": category}
         articles = list(
             news_collection
-            .find(query)
+            .find(query, story_clusters.INTERNAL_FIELDS)
             .sort("fetchedAt", -1)  # Sort by newest first
             .limit(limit)
         )
@@ -191,25 +234,6 @@ def get_saved_articles(category="all", limit=100):
         logger.error(f"ERROR: Error retrieving articles: {e}")
         return []
 
-def clean_old_articles(days_to_keep=30):
-    """
-    Clean up old articles from database.
-    Keeps articles from the last N days.
-    """
-    if news_collection is None:
-        logger.error("ERROR: Database not available")
-        return 0
-    
-    try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
-        result = news_collection.delete_many({"fetchedAt": {"$lt": cutoff_date}})
-        deleted_count = result.deleted_count
-        logger.info(f"CLEAN: Cleaned {deleted_count} articles older than {days_to_keep} days")
-        return deleted_count
-    except Exception as e:
-        logger.error(f"ERROR: Error cleaning old articles: {e}")
-        return 0
-
 def get_articles_count_by_category():
     """Get count of articles by category."""
     if news_collection is None:
@@ -231,14 +255,14 @@ def get_articles_count_by_category():
 if __name__ == "__main__":
     # Test the fetcher
     logger.info("🧪 Testing news fetcher...")
+    from utils import database
+    init_news_fetcher(database.get_db())
     
     # Test refresh functionality
-    result = refresh_news("technology", page_size=10)
-    logger.info(f"Test result: {result.get('count', 0)} new articles, {result.get('total_in_db', 0)} total")
+    result = asyncio.run(refresh_news("technology", page_size=10))
+    logger.info(f"Test result: {result.get('count', 0)} new articles, {result.get('duplicates_skipped', 0)} duplicates")
     
     # Show article counts
     counts = get_articles_count_by_category()
     logger.info(f"Article counts: {counts}")
-    
-    # Test cleanup (keep last 30 days)
-    # clean_old_articles(days_to_keep=30)
+
@@ -0,0 +1,109 @@
+"""
+Stored Article Search
+Full-text lookup over ingested news using the MongoDB text index on
+title/description (declared in utils.indexes). Supports quoted phrases,
+-excluded terms and a fetchedAt date range, returning the top-k articles by
+text score. Falls back to an escaped regex scan only when the text index is
+missing
+"""
+
+import re
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import OperationFailure
+
+from utils import story_clusters
+
+logger = logging.getLogger("news_search")
+
+MAX_RESULTS = 100
+
+_TOKEN_RE = re.compile(r'"([^"]+)"|(\S+)')
+# Characters that carry meaning inside a $text search string
+_TEXT_SPECIAL_RE = re.compile(r'["\\]')
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str], List[str]]:
+    """Split a user query into (terms, phrases, excluded terms)."""
+    terms, phrases, excluded = [], [], []
+    for phrase, word in _TOKEN_RE.findall(query or ""):
+        if phrase:
+            phrase = " ".join(_TEXT_SPECIAL_RE.sub(" ", phrase).split())
+            if phrase:
+                phrases.append(phrase)
+            continue
+        word = _TEXT_SPECIAL_RE.sub("", word)
+        bare = word.strip("-")
+        if not bare:
+            continue
+        if word.startswith("-"):
+            excluded.append(bare)
+        else:
+            terms.append(bare)
+    return terms, phrases, excluded
+
+
+def build_text_search(terms: List[str], phrases: List[str], excluded: List[str]) -> str:
+    """
+    $text semantics: a document must contain every phrase, at least one term, and no excluded term.
+    A phrase's words are also added as terms so phrase-only queries still rank by relevance.
+    """
+    words = list(terms)
+    for phrase in phrases:
+        words.extend(phrase.split())
+    parts = words + [f'"{p}"' for p in phrases] + [f"-{w}" for w in excluded]
+    return " ".join(parts)
+
+
+def _date_filter(start_date: Optional[datetime], end_date: Optional[datetime]) -> Dict[str, Any]:
+    window = {}
+    if start_date:
+        window["$gte"] = start_date
+    if end_date:
+        window["$lte"] = end_date
+    return {"fetchedAt": window} if window else {}
+
+
+def _contains(needle: str) -> List[Dict[str, Any]]:
+    pattern = {"$regex": re.escape(needle), "$options": "i"}
+    return [{"title": pattern}, {"description": pattern}]
+
+
+def _regex_fallback(collection, terms, phrases, excluded, date_filter, limit):
+    """Escaped, case-insensitive scan with the same semantics, for deployments without the text index."""
+    clauses = [{"$or": _contains(p)} for p in phrases]
+    if terms:
+        clauses.append({"$or": [c for t in terms for c in _contains(t)]})
+    clauses.extend({"$nor": _contains(w)} for w in excluded)
+    return list(collection.find({"$and": clauses, **date_filter}, story_clusters.INTERNAL_FIELDS)
+                .sort("fetchedAt", -1).limit(limit))
+
+
+def search_articles(collection, query: str, start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Top-k stored articles for `query` ranked by text score (newest first on ties)."""
+    terms, phrases, excluded = parse_query(query)
+    if not terms and not phrases:
+        return []
+
+    limit = max(1, min(limit, MAX_RESULTS))
+    date_filter = _date_filter(start_date, end_date)
+    search = build_text_search(terms, phrases, excluded)
+
+    try:
+        cursor = collection.find(
+            {"$text": {"$search": search}, **date_filter},
+            {"score": {"$meta": "textScore"}, **story_clusters.INTERNAL_FIELDS},
+        ).sort([("score", {"$meta": "textScore"}), ("fetchedAt", -1)]).limit(limit)
+        results = list(cursor)
+    except OperationFailure as e:
+        # Code 27: no text index on the collection
+        if e.code != 27:
+            raise
+        logger.warning(f"SEARCH: Text index missing, using regex fallback for '{query}'")
+        results = _regex_fallback(collection, terms, phrases, excluded, date_filter, limit)
+
+    logger.info(f"SEARCH: '{search}' -> {len(results)} articles")
+    return results
@@ -0,0 +1,125 @@
+"""
+Keyset Pagination
+Pages listing endpoints on (sort key, _id) instead of skip/limit, so every page
+is an index range scan no matter how deep the client reads. Continuation
+tokens are opaque base64 strings carrying the last row's sort value and _id.
+Field sets let callers ask for a compact list view or the full detail view,
+and ObjectIds are stringified inside the aggregation rather than in Python
+"""
+
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from utils import database
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+FIELD_SETS = ("list", "detail")
+
+
+class InvalidCursor(ValueError):
+    """Raised for tokens that are malformed or were issued for a different sort key."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"d": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"o": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "d" in value:
+            return datetime.fromisoformat(value["d"])
+        if "o" in value:
+            return ObjectId(value["o"])
+    return value
+
+
+def encode_cursor(sort_field: str, value: Any, doc_id: Any) -> str:
+    payload = json.dumps({"f": sort_field, "v": _encode_value(value), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_field: str) -> Tuple[Any, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload.get("f") != sort_field:
+            raise InvalidCursor("cursor belongs to a different listing")
+        doc_id = payload["i"]
+        return _decode_value(payload["v"]), ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursor(f"invalid cursor: {e}")
+
+
+def clamp_limit(limit: Optional[int], default: int = DEFAULT_LIMIT) -> int:
+    return max(1, min(limit or default, MAX_LIMIT))
+
+
+def keyset_pipeline(filter: Dict[str, Any], sort_field: str, limit: int, cursor: Optional[str] = None,
+                    projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Newest-first page after `cursor`; fetches limit + 1 rows so the caller can tell whether more exist."""
+    match = dict(filter)
+    if cursor:
+        value, doc_id = decode_cursor(cursor, sort_field)
+        after = {"$or": [{sort_field: {"$lt": value}}, {sort_field: value, "_id": {"$lt": doc_id}}]}
+        match = {"$and": [match, after]} if match else after
+
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": match},
+        {"$sort": {sort_field: -1, "_id": -1}},
+        {"$limit": limit + 1},
+    ]
+    if projection:
+        pipeline.append({"$project": projection})
+    pipeline.append({"$addFields": {"_id": {"$toString": "$_id"}}})
+    return pipeline
+
+
+def _sort_value(doc: Dict[str, Any], sort_field: str) -> Any:
+    value: Any = doc
+    for part in sort_field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+async def paginate(collection, filter: Dict[str, Any], sort_field: str, *, limit: int,
+                   cursor: Optional[str] = None, projection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    One page of `collection` ordered by (sort_field, _id) descending.
+    List-view projections must include `sort_field` so the next cursor can be built.
+    """
+    rows = await database.aggregate(collection, keyset_pipeline(filter, sort_field, limit, cursor, projection))
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_field, _sort_value(last, sort_field), last["_id"])
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more, "limit": limit}
+
+
+def envelope(key: str, page: Dict[str, Any], fields: str, **extra: Any) -> Dict[str, Any]:
+    """Common response shape: the items under their legacy key, plus count and paging metadata."""
+    return {
+        "status": "success",
+        **extra,
+        key: page["items"],
+        "count": len(page["items"]),
+        "page": {
+            "limit": page["limit"],
+            "fields": fields,
+            "has_more": page["has_more"],
+            "next_cursor": page["next_cursor"],
+        },
+    }
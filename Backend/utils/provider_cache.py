@@ -0,0 +1,154 @@
+"""
+Provider Response Cache
+Caches successful GET responses from paid/quota'd providers (SERP, NewsData,
+Wikipedia, YouTube) keyed on normalized query parameters with per-provider
+TTLs, and coalesces concurrent identical requests so N simultaneous callers
+trigger one upstream call. Callers get an httpx.Response back, so this is a
+drop-in for http_client.get
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from utils import http_client
+
+logger = logging.getLogger("provider_cache")
+
+# Seconds a successful response stays fresh; override with e.g. SERP_CACHE_TTL=3600
+PROVIDER_TTLS = {
+    "serp": int(os.getenv("SERP_CACHE_TTL", str(6 * 3600))),
+    "newsdata": int(os.getenv("NEWSDATA_CACHE_TTL", "900")),
+    "wikipedia": int(os.getenv("WIKIPEDIA_CACHE_TTL", str(7 * 24 * 3600))),
+    "youtube": int(os.getenv("YOUTUBE_CACHE_TTL", str(24 * 3600))),
+    "newsapi": int(os.getenv("NEWSAPI_CACHE_TTL", "900")),
+}
+
+# Quota cost of one upstream call, used to report credits saved (YouTube search costs 100 units)
+CREDITS_PER_CALL = {"serp": 1, "newsdata": 1, "wikipedia": 0, "youtube": 100, "newsapi": 1}
+
+MAX_ENTRIES = int(os.getenv("PROVIDER_CACHE_MAX_ENTRIES", "2048"))
+MAX_BODY_BYTES = 1024 * 1024
+
+# Credentials never become part of the key; free-text query params are case/whitespace-folded
+SECRET_PARAMS = {"api_key", "apikey", "apiKey", "key"}
+QUERY_PARAMS = {"q", "search", "srsearch"}
+
+_entries: "OrderedDict[str, Tuple[float, int, str, bytes]]" = OrderedDict()
+_inflight: Dict[str, asyncio.Task] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _normalize_value(name: str, value: Any) -> str:
+    text = " ".join(str(value).split())
+    return text.lower() if name in QUERY_PARAMS else text
+
+
+def make_key(provider: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    normalized = sorted(
+        (name, _normalize_value(name, value))
+        for name, value in (params or {}).items()
+        if name not in SECRET_PARAMS and value is not None
+    )
+    material = json.dumps([provider, url, normalized], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _count(provider: str, key: str):
+    bucket = _stats.setdefault(provider, {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "errors": 0})
+    bucket[key] += 1
+
+
+def _to_response(url: str, status: int, content_type: str, body: bytes) -> httpx.Response:
+    return httpx.Response(
+        status,
+        headers={"content-type": content_type} if content_type else None,
+        content=body,
+        request=httpx.Request("GET", url),
+    )
+
+
+def _lookup(key: str) -> Optional[Tuple[int, str, bytes]]:
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    expires_at, status, content_type, body = entry
+    if expires_at <= time.time():
+        _entries.pop(key, None)
+        return None
+    _entries.move_to_end(key)
+    return status, content_type, body
+
+
+def _store(key: str, provider: str, response: httpx.Response):
+    ttl = PROVIDER_TTLS.get(provider, 0)
+    body = response.content
+    if ttl <= 0 or response.status_code != 200 or not body.strip() or len(body) > MAX_BODY_BYTES:
+        return
+    _entries[key] = (time.time() + ttl, response.status_code, response.headers.get("content-type", ""), body)
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+async def _fetch(provider: str, key: str, url: str, params, timeout, headers) -> Tuple[int, str, bytes]:
+    _count(provider, "upstream_calls")
+    try:
+        # Leave timeout unset rather than None, which httpx reads as "no timeout"
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        response = await http_client.get(url, params=params, headers=headers, **kwargs)
+    except Exception:
+        _count(provider, "errors")
+        raise
+    _store(key, provider, response)
+    return response.status_code, response.headers.get("content-type", ""), response.content
+
+
+async def get(provider: str, url: str, params: Optional[Dict[str, Any]] = None, *,
+              timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """Cached, coalesced GET. Only 200 responses are cached; errors are shared with coalesced waiters but not stored."""
+    key = make_key(provider, url, params)
+
+    cached = _lookup(key)
+    if cached is not None:
+        _count(provider, "hits")
+        logger.debug(f"PROVIDER CACHE: {provider} hit")
+        return _to_response(url, *cached)
+
+    task = _inflight.get(key)
+    if task is not None:
+        _count(provider, "coalesced")
+    else:
+        _count(provider, "misses")
+        task = asyncio.create_task(_fetch(provider, key, url, params, timeout, headers))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # shield: one caller disconnecting must not cancel the upstream call the others are waiting on
+    status, content_type, body = await asyncio.shield(task)
+    return _to_response(url, status, content_type, body)
+
+
+def clear():
+    _entries.clear()
+
+
+def get_stats() -> Dict[str, Any]:
+    providers = {}
+    for name, bucket in _stats.items():
+        served = bucket["hits"] + bucket["coalesced"]
+        requests = served + bucket["misses"]
+        providers[name] = {
+            **bucket,
+            "hit_rate": round(served / requests, 3) if requests else 0.0,
+            "credits_saved": served * CREDITS_PER_CALL.get(name, 0),
+            "ttl_s": PROVIDER_TTLS.get(name),
+        }
+    return {"entries": len(_entries), "max_entries": MAX_ENTRIES, "providers": providers}
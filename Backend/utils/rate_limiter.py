@@ -0,0 +1,60 @@
+"""
+Async Token Bucket
+Rate limiter for third-party APIs with request quotas. Callers await acquire()
+before each request; bursts up to `capacity` go straight through, after which
+requests are spaced at `rate` per second
+"""
+
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger("rate_limiter")
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: int):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0, max_wait: float = None) -> bool:
+        """
+        Wait for `tokens` to be available and take them.
+        Returns False (taking nothing) if that would mean waiting longer than max_wait.
+        """
+        # Tokens are reserved under the lock (the balance may go negative), so waiters are served in
+        # arrival order; the wait itself happens outside it and no waiter sits behind another's sleep
+        async with self._lock:
+            self._refill()
+            delay = max(0.0, (tokens - self._tokens) / self.rate)
+            if max_wait is not None and delay > max_wait:
+                return False
+            self._tokens -= tokens
+            if delay > 0:
+                self.waits += 1
+                self.waited_seconds += delay
+        if delay > 0:
+            logger.info(f"RATE LIMIT: {self.name} waiting {delay:.1f}s for a token")
+            await asyncio.sleep(delay)
+        return True
+
+    def get_stats(self):
+        self._refill()
+        return {
+            "tokens_available": round(max(0.0, self._tokens), 2),
+            "capacity": self.capacity,
+            "rate_per_second": self.rate,
+            "waits": self.waits,
+            "waited_seconds": round(self.waited_seconds, 2),
+        }
@@ -0,0 +1,167 @@
+"""
+Relevance Ranker
+Scores candidate articles from any mix of sources (SERP, NewsData, MongoDB)
+against a query with BM25 in one sparse-matrix pass, after deduplicating them
+by normalized URL and title; near-duplicate stories are collapsed to their best
+scoring copy. Tokens are matched on word boundaries, so "art"
+no longer matches "smart". Returns an ordered top-k with scores so callers
+can send the LLM fewer, better articles
+"""
+
+import re
+import math
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from utils import story_clusters
+
+try:
+    import numpy as np
+    from scipy import sparse
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger("relevance_ranker")
+
+# BM25 parameters; title tokens are counted TITLE_WEIGHT times so headline matches dominate
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+
+_TOKEN_RE = re.compile(r"\b[a-z0-9][a-z0-9'&+-]*\b")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "to", "was", "were", "will", "with", "after", "over",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit((url or "").strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _title_key(title: str) -> str:
+    return " ".join(_TOKEN_RE.findall((title or "").lower()))
+
+
+def dedupe(candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeats by normalized URL or title, keeping the copy with the longer description."""
+    kept: List[Dict[str, Any]] = []
+    index_by_key: Dict[str, int] = {}
+    for article in candidates:
+        keys = [k for k in (_url_key(article.get("url", "")), _title_key(article.get("title", ""))) if k]
+        existing = next((index_by_key[k] for k in keys if k in index_by_key), None)
+        if existing is None:
+            index_by_key.update({k: len(kept) for k in keys})
+            kept.append(article)
+            continue
+        if len(article.get("description") or "") > len(kept[existing].get("description") or ""):
+            kept[existing] = article
+        index_by_key.update({k: existing for k in keys})
+    return kept
+
+
+def _document_tokens(article: Dict[str, Any]) -> List[str]:
+    return tokenize(article.get("title", "")) * TITLE_WEIGHT + tokenize(article.get("description", ""))
+
+
+def _bm25_numpy(docs: List[List[str]], terms: List[str]):
+    """(scores, matched-term counts) for every doc; only query-term columns are materialized."""
+    column = {t: i for i, t in enumerate(terms)}
+    rows, cols = [], []
+    for r, tokens in enumerate(docs):
+        for token in tokens:
+            c = column.get(token)
+            if c is not None:
+                rows.append(r)
+                cols.append(c)
+    lengths = np.fromiter((len(d) for d in docs), dtype=np.float64, count=len(docs))
+    tf = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(docs), len(terms)), dtype=np.float64
+    )
+    tf.sum_duplicates()
+
+    n = len(docs)
+    df = np.bincount(tf.indices, minlength=len(terms))
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+
+    avgdl = lengths.mean() if n and lengths.mean() > 0 else 1.0
+    norm = K1 * (1 - B + B * lengths / avgdl)
+    row_of = np.repeat(np.arange(n), np.diff(tf.indptr))
+    weighted = tf.copy()
+    weighted.data = tf.data * (K1 + 1) / (tf.data + norm[row_of])
+
+    scores = np.asarray(weighted @ idf).ravel()
+    matched = np.diff(tf.indptr)
+    return scores.tolist(), matched.tolist()
+
+
+def _bm25_python(docs: List[List[str]], terms: List[str]):
+    term_set = set(terms)
+    counts = []
+    for tokens in docs:
+        tf: Dict[str, int] = {}
+        for token in tokens:
+            if token in term_set:
+                tf[token] = tf.get(token, 0) + 1
+        counts.append(tf)
+
+    n = len(docs)
+    df = {t: sum(1 for c in counts if t in c) for t in terms}
+    idf = {t: math.log1p((n - df[t] + 0.5) / (df[t] + 0.5)) for t in terms}
+    avgdl = (sum(len(d) for d in docs) / n) or 1.0
+
+    scores, matched = [], []
+    for tokens, tf in zip(docs, counts):
+        norm = K1 * (1 - B + B * len(tokens) / avgdl)
+        scores.append(sum(idf[t] * f * (K1 + 1) / (f + norm) for t, f in tf.items()))
+        matched.append(len(tf))
+    return scores, matched
+
+
+def rank_articles(query: str, candidates: Iterable[Dict[str, Any]], top_k: int = 20,
+                  min_matched: int = 1, extra_terms: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Deduplicate candidates and return the top_k by BM25 score (one per story), each annotated with
+    `relevance_score`. Articles matching fewer than `min_matched` distinct query terms are dropped.
+    """
+    articles = dedupe(candidates)
+    terms = list(dict.fromkeys(tokenize(query) + [t for term in (extra_terms or []) for t in tokenize(term)]))
+    if not articles or not terms:
+        return articles[:top_k]
+
+    docs = [_document_tokens(a) for a in articles]
+    scorer = _bm25_numpy if NUMPY_AVAILABLE else _bm25_python
+    scores, matched = scorer(docs, terms)
+
+    order = sorted(
+        (i for i in range(len(articles)) if matched[i] >= min_matched),
+        key=lambda i: scores[i],
+        reverse=True,
+    )
+
+    # Walk best-first keeping one article per story (stored cluster id, else MinHash similarity)
+    ranked, clusters, signatures = [], set(), []
+    for i in order:
+        cluster_id = articles[i].get("story_cluster_id")
+        if cluster_id and cluster_id in clusters:
+            continue
+        signature = articles[i].get("minhash") or story_clusters.minhash(story_clusters.article_text(articles[i]))
+        if any(story_clusters.similarity(signature, s) >= story_clusters.SIMILARITY_THRESHOLD for s in signatures):
+            continue
+        ranked.append(i)
+        signatures.append(signature)
+        if cluster_id:
+            clusters.add(cluster_id)
+        if len(ranked) >= top_k:
+            break
+
+    logger.info(f"RANK: {len(articles)} candidates -> {len(ranked)} kept for {terms[:8]}")
+    return [{**articles[i], "relevance_score": round(float(scores[i]), 4)} for i in ranked]
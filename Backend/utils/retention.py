@@ -0,0 +1,92 @@
+"""
+News Retention Policy
+Single source of truth for how long articles are kept. By default MongoDB
+expires them itself through a TTL index on news.fetchedAt; with archiving
+enabled the TTL is dropped and the scheduler's retention job moves expired
+articles to news_archive instead of deleting them
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from pymongo import DESCENDING, IndexModel
+from pymongo.errors import BulkWriteError
+
+from utils import http_cache
+
+logger = logging.getLogger("retention")
+
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "7"))
+ARCHIVE_ENABLED = os.getenv("NEWS_ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes")
+# How long archived articles are kept; 0 keeps them forever
+ARCHIVE_RETENTION_DAYS = int(os.getenv("NEWS_ARCHIVE_RETENTION_DAYS", "0"))
+ARCHIVE_BATCH_SIZE = 500
+
+
+def _ttl_seconds(days: int) -> Dict[str, int]:
+    return {"expireAfterSeconds": days * 24 * 3600} if days > 0 else {}
+
+
+def news_fetched_at_index() -> IndexModel:
+    """news.fetchedAt serves the newest-first reads and, unless archiving, doubles as the TTL index."""
+    ttl = {} if ARCHIVE_ENABLED else _ttl_seconds(NEWS_RETENTION_DAYS)
+    return IndexModel([("fetchedAt", DESCENDING)], name="fetchedAt_desc", **ttl)
+
+
+def archive_indexes():
+    return [
+        IndexModel([("archivedAt", DESCENDING)], name="archivedAt_desc", **_ttl_seconds(ARCHIVE_RETENTION_DAYS)),
+        IndexModel([("fetchedAt", DESCENDING)], name="fetchedAt_desc"),
+    ]
+
+
+def _archive_expired(db, cutoff: datetime) -> int:
+    news = db["news"]
+    archive = db["news_archive"]
+    moved = 0
+    while True:
+        batch = list(news.find({"fetchedAt": {"$lt": cutoff}}).limit(ARCHIVE_BATCH_SIZE))
+        if not batch:
+            return moved
+        archived_at = datetime.utcnow()
+        for doc in batch:
+            doc["archivedAt"] = archived_at
+        try:
+            archive.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Already archived by an earlier interrupted run; anything else is a real failure
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        news.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        moved += len(batch)
+
+
+def run_retention(db) -> Dict[str, Any]:
+    """
+    Apply the retention policy once (called by the ingestion scheduler).
+    In TTL mode MongoDB deletes expired articles itself, so this only reports the backlog
+    still waiting for the TTL monitor.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=NEWS_RETENTION_DAYS)
+    if ARCHIVE_ENABLED:
+        moved = _archive_expired(db, cutoff)
+        if moved:
+            http_cache.bump("news")
+            logger.info(f"RETENTION: Archived {moved} articles older than {NEWS_RETENTION_DAYS} days")
+        return {"mode": "archive", "archived": moved}
+
+    pending = db["news"].count_documents({"fetchedAt": {"$lt": cutoff}})
+    if pending:
+        # TTL deletions bypass our write paths; invalidate cached listings for what is about to expire
+        http_cache.bump("news")
+    return {"mode": "ttl", "pending_expiry": pending}
+
+
+def get_policy() -> Dict[str, Any]:
+    return {
+        "retention_days": NEWS_RETENTION_DAYS,
+        "mode": "archive" if ARCHIVE_ENABLED else "ttl",
+        "archive_retention_days": ARCHIVE_RETENTION_DAYS if ARCHIVE_ENABLED else None,
+    }
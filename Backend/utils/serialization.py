@@ -0,0 +1,61 @@
+"""
+Response Serialization
+One JSON encoder for every response: orjson when installed (falls back to the
+standard library), with a `default` hook for the BSON types MongoDB hands back
+(ObjectId, Decimal128, Binary) so documents can be returned as-is instead of
+being walked to stringify `_id` first. Routes that return FastJSONResponse
+directly also skip FastAPI's jsonable_encoder pass
+"""
+
+import json
+import base64
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from bson import Binary, Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger("serialization")
+
+if ORJSON_AVAILABLE:
+    # Non-str dict keys (ints from counters, ObjectIds as keys) are coerced instead of raising
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        # Only reached on the stdlib path; orjson encodes datetimes natively in the same ISO form
+        return obj.isoformat()
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (bytes, Binary)):
+        return base64.b64encode(bytes(obj)).decode("ascii")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """UTF-8 JSON bytes for `obj`, understanding BSON types."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through `dumps`; also the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -5,17 +5,16 @@ NO blocking issues - professional API solution
 """
 
 import re
-import time
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from urllib.parse import urlparse
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+from utils import article_extraction, http_client, llm_gateway, provider_cache
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,17 +23,14 @@ NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-# Initialize AI client
-try:
-    ai_client = OpenAI(
-        api_key=NVIDIA_API_KEY,
-        base_url="https://integrate.api.nvidia.com/v1"
-    )
-    logger.info("SUCCESS: AI client initialized")
-except Exception as e:
-    logger.error(f"ERROR: Failed to initialize AI client: {e}")
-    ai_client = None
-
+CASE_STUDY_LLM_PARAMS = {
+    "endpoint": "case-study",
+    "temperature": 0.2,
+    "max_tokens": 4000,
+    "top_p": 0.8,
+    "timeout": 90,  # Increased timeout for larger model
+    "max_attempts": 2,
+}
 
 class WorkingJournalistScraper:
     """
@@ -42,14 +38,13 @@ class WorkingJournalistScraper:
     """
     
     def __init__(self):
-        self.session = requests.Session()
         self.serp_api_key = SERP_API_KEY
         self.youtube_api_key = YOUTUBE_API_KEY
         
         if not self.serp_api_key:
             logger.warning("WARNING: SERP_API_KEY not configured")
     
-    def serp_google_search(self, query: str, max_results: int = 30) -> List[Dict[str, str]]:
+    async def serp_google_search(self, query: str, max_results: int = 30) -> List[Dict[str, str]]:
         """
         Use SERP API to get real Google search results
         100% reliable, no blocking
@@ -71,7 +66,7 @@ class WorkingJournalistScraper:
                 'gl': 'us'
             }
             
-            response = self.session.get(url, params=params, timeout=15)
+            response = await provider_cache.get('serp', url, params=params, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -105,7 +100,7 @@ class WorkingJournalistScraper:
             logger.error(f"ERROR: SERP API failed: {e}")
             return []
     
-    def get_journalist_image(self, journalist_name: str) -> Optional[str]:
+    async def get_journalist_image(self, journalist_name: str) -> Optional[str]:
         """
         Scrape journalist's image from Google Images or Wikipedia
         """
@@ -124,7 +119,7 @@ class WorkingJournalistScraper:
                         'hl': 'en'
                     }
                     
-                    response = self.session.get(url, params=params, timeout=10)
+                    response = await provider_cache.get('serp', url, params=params, timeout=10)
                     if response.status_code == 200:
                         data = response.json()
                         images = data.get('images_results', [])
@@ -148,7 +143,7 @@ class WorkingJournalistScraper:
                     'format': 'json'
                 }
                 
-                response = self.session.get(api_url, params=search_params, timeout=10)
+                response = await provider_cache.get('wikipedia', api_url, params=search_params, timeout=10)
                 if response.status_code == 200 and response.text.strip():
                     search_data = response.json()
                     
@@ -164,7 +159,7 @@ class WorkingJournalistScraper:
                             'format': 'json'
                         }
                         
-                        image_response = self.session.get(api_url, params=image_params, timeout=10)
+                        image_response = await provider_cache.get('wikipedia', api_url, params=image_params, timeout=10)
                         if image_response.status_code == 200 and image_response.text.strip():
                             image_data = image_response.json()
                             
@@ -185,7 +180,7 @@ class WorkingJournalistScraper:
             logger.error(f"ERROR: Image search failed: {e}")
             return None
     
-    def wikipedia_api(self, journalist_name: str) -> Optional[Dict[str, Any]]:
+    async def wikipedia_api(self, journalist_name: str) -> Optional[Dict[str, Any]]:
         """
         Wikipedia API - always works - WITH IMAGE
         """
@@ -203,7 +198,7 @@ class WorkingJournalistScraper:
                 'format': 'json'
             }
             
-            response = self.session.get(api_url, params=search_params, timeout=10)
+            response = await provider_cache.get('wikipedia', api_url, params=search_params, timeout=10)
             
             # Check if response is valid JSON
             if response.status_code != 200 or not response.text.strip():
@@ -231,7 +226,7 @@ class WorkingJournalistScraper:
                 'format': 'json'
             }
             
-            content_response = self.session.get(api_url, params=content_params, timeout=10)
+            content_response = await provider_cache.get('wikipedia', api_url, params=content_params, timeout=10)
             
             if content_response.status_code != 200 or not content_response.text.strip():
                 logger.warning(f"WARNING: Wikipedia content returned empty")
@@ -260,7 +255,7 @@ class WorkingJournalistScraper:
             logger.error(f"ERROR: Wikipedia failed: {e}")
             return None
     
-    def youtube_search(self, journalist_name: str) -> List[Dict[str, str]]:
+    async def youtube_search(self, journalist_name: str) -> List[Dict[str, str]]:
         """
         Search YouTube for interviews, talks, and videos
         """
@@ -277,7 +272,7 @@ class WorkingJournalistScraper:
                 'order': 'relevance'
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = await provider_cache.get('youtube', url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -308,81 +303,25 @@ class WorkingJournalistScraper:
             logger.error(f"ERROR: YouTube search failed: {e}")
             return []
     
-    def scrape_article(self, url: str) -> Optional[Dict[str, Any]]:
+    async def scrape_article(self, url: str) -> Optional[Dict[str, Any]]:
         """
-        Scrape article content using BeautifulSoup - WITH IMAGES
+        Scrape article content through the shared extraction engine - WITH IMAGES
         """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            }
-            
-            response = self.session.get(url, headers=headers, timeout=10, allow_redirects=True)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract title
-            title = ""
-            for selector in ['h1', 'meta[property="og:title"]', 'title']:
-                elem = soup.select_one(selector)
-                if elem:
-                    title = elem.get('content', elem.get_text(strip=True))
-                    if title:
-                        break
-            
-            # Extract featured image
-            image_url = ""
-            for selector in ['meta[property="og:image"]', 'meta[name="twitter:image"]']:
-                elem = soup.select_one(selector)
-                if elem:
-                    image_url = elem.get('content', '')
-                    if image_url:
-                        break
-            
-            # Extract author and date
-            author = ""
-            published_date = ""
-            
-            for selector in ['meta[name="author"]', 'meta[property="article:author"]']:
-                elem = soup.select_one(selector)
-                if elem:
-                    author = elem.get('content', '')
-                    if author:
-                        break
-            
-            for selector in ['meta[property="article:published_time"]', 'time']:
-                elem = soup.select_one(selector)
-                if elem:
-                    published_date = elem.get('content', elem.get('datetime', elem.get_text(strip=True)))
-                    if published_date:
-                        break
-            
-            # Extract content
-            content = ""
-            for selector in ['article', 'div.article-content', 'div.story-body', 'main']:
-                elem = soup.select_one(selector)
-                if elem:
-                    for tag in elem.find_all(['script', 'style', 'nav', 'footer', 'aside']):
-                        tag.decompose()
-                    
-                    paragraphs = elem.find_all('p')
-                    if paragraphs:
-                        content = ' '.join([p.get_text(strip=True) for p in paragraphs])
-                        break
-            
-            word_count = len(content.split()) if content else 0
+            page = await article_extraction.fetch_article(url, headers=http_client.BROWSER_HEADERS, timeout=10)
+            content = page['content']
+            word_count = page['word_count']
             
             if word_count > 50:
                 return {
                     'url': url,
                     'domain': urlparse(url).netloc,
-                    'title': title,
+                    'title': page['title'],
                     'content': content[:2000],
                     'word_count': word_count,
-                    'image': image_url,
-                    'author': author,
-                    'published_date': published_date
+                    'image': page['image'],
+                    'author': page['author'],
+                    'published_date': page['published_date']
                 }
             
             return None
@@ -391,7 +330,7 @@ class WorkingJournalistScraper:
             logger.debug(f"Scrape failed {url}: {e}")
             return None
     
-    def comprehensive_search(self, journalist_name: str) -> Dict[str, Any]:
+    async def comprehensive_search(self, journalist_name: str) -> Dict[str, Any]:
         """
         Comprehensive search using SERP API + Wikipedia
         """
@@ -408,15 +347,15 @@ class WorkingJournalistScraper:
             }
             
             # Source 1: Get journalist profile image (Google Images via SERP API)
-            journalist_image = self.get_journalist_image(journalist_name)
+            journalist_image = await self.get_journalist_image(journalist_name)
             if journalist_image:
                 all_data['journalist_image'] = journalist_image
                 logger.info(f"SUCCESS: Journalist profile image found")
             
-            time.sleep(0.3)
+            await asyncio.sleep(0.3)
             
             # Source 2: Wikipedia (for bio and fallback image)
-            wikipedia_data = self.wikipedia_api(journalist_name)
+            wikipedia_data = await self.wikipedia_api(journalist_name)
             if wikipedia_data and wikipedia_data.get('extract'):
                 all_data['sections']['wikipedia'] = wikipedia_data
                 all_data['metadata']['sources_used'].append('Wikipedia')
@@ -430,7 +369,7 @@ class WorkingJournalistScraper:
             else:
                 # Wikipedia failed - use AI knowledge immediately for bio
                 logger.warning(f"WARNING: Wikipedia unavailable, using AI for biography")
-                if ai_client:
+                if llm_gateway.is_configured():
                     try:
                         prompt = f"""Provide a comprehensive 200-word biography of journalist {journalist_name} including:
 - Career background and current position
@@ -440,18 +379,17 @@ class WorkingJournalistScraper:
 
 Be factual and specific."""
 
-                        response = ai_client.chat.completions.create(
-                            model="qwen/qwen3-coder-480b-a35b-instruct",
-                            messages=[
+                        ai_bio = await llm_gateway.chat_completion(
+                            [
                                 {"role": "system", "content": "You are a journalism research expert."},
                                 {"role": "user", "content": prompt}
                             ],
+                            endpoint="case-study",
                             temperature=0.2,
                             max_tokens=400,
-                            timeout=30
+                            timeout=30,
+                            max_attempts=1,
                         )
-                        
-                        ai_bio = response.choices[0].message.content.strip()
                         all_data['sections']['wikipedia'] = {
                             'extract': ai_bio,
                             'source': 'AI Knowledge'
@@ -462,7 +400,7 @@ Be factual and specific."""
                     except Exception as e:
                         logger.error(f"AI bio fallback failed: {e}")
             
-            time.sleep(0.2)  # Reduced delay
+            await asyncio.sleep(0.2)  # Reduced delay
             
             # Source 3: OPTIMIZED SERP searches for articles (fewer queries, less delay)
             search_queries = [
@@ -475,7 +413,7 @@ Be factual and specific."""
             seen_urls = set()
             
             for query in search_queries:
-                results = self.serp_google_search(query, max_results=12)  # Reduced from 15
+                results = await self.serp_google_search(query, max_results=12)  # Reduced from 15
                 
                 if results:
                     all_data['metadata']['sources_used'].append(f'Google ({query[:40]}...)')
@@ -493,7 +431,7 @@ Be factual and specific."""
                             
                             seen_urls.add(result['url'])
                 
-                time.sleep(0.3)  # REDUCED from 0.5s for speed
+                await asyncio.sleep(0.3)  # REDUCED from 0.5s for speed
                 
                 if len(all_articles) >= 20:  # Reduced from 25
                     break
@@ -506,7 +444,7 @@ Be factual and specific."""
             # Source 4: YouTube Videos (OPTIONAL - skip if taking too long)
             try:
                 logger.info("🎥 Searching YouTube...")
-                youtube_videos = self.youtube_search(journalist_name)
+                youtube_videos = await self.youtube_search(journalist_name)
                 if youtube_videos:
                     all_data['sections']['youtube_videos'] = youtube_videos[:5]  # Limit to 5
                     all_data['metadata']['sources_used'].append('YouTube')
@@ -515,7 +453,7 @@ Be factual and specific."""
             except Exception as e:
                 logger.warning(f"YouTube search skipped: {e}")
             
-            time.sleep(0.2)  # Minimal delay
+            await asyncio.sleep(0.2)  # Minimal delay
             
             logger.info(f"\nSUCCESS: === SEARCH COMPLETE ===")
             logger.info(f"STATS: Total: {all_data['metadata']['total_results']} results")
@@ -527,28 +465,24 @@ Be factual and specific."""
             logger.error(f"ERROR: Search failed: {e}")
             return None
     
-    def generate_case_study(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def build_case_study_messages(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
         """
-        Generate AI case study - OPTIMIZED for speed while keeping comprehensive output
+        Build the case study prompt from search results (shared by the streaming endpoint)
         """
-        if not ai_client:
-            return None
+        journalist_name = data['journalist_name']
+        sections = data['sections']
+        
+        # ULTRA-MINIMAL for MAXIMUM SPEED
+        bio = sections.get('wikipedia', {}).get('extract', '')[:600]  # Reduced from 800
         
-        try:
-            journalist_name = data['journalist_name']
-            sections = data['sections']
-            
-            # ULTRA-MINIMAL for MAXIMUM SPEED
-            bio = sections.get('wikipedia', {}).get('extract', '')[:600]  # Reduced from 800
-            
 
-            # Top 3 articles only
-            articles = "\n".join([
-                f"{i+1}. {a.get('title', 'Untitled')}"
-                for i, a in enumerate(sections.get('articles', [])[:3])
-            ])
-            
-            prompt = f"""Create comprehensive educational case study for journalist {journalist_name}.
+        # Top 3 articles only
+        articles = "\n".join([
+            f"{i+1}. {a.get('title', 'Untitled')}"
+            for i, a in enumerate(sections.get('articles', [])[:3])
+        ])
+        
+        prompt = f"""Create comprehensive educational case study for journalist {journalist_name}.
 
 BIO: {bio}
 
@@ -592,66 +526,59 @@ RECOMMENDED RESOURCES
 
 Be comprehensive but concise."""
 
+        return [
+            {
+                "role": "system",
+                "content": "You are a journalism educator. Create comprehensive, well-structured case studies."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def assemble_case_study(self, data: Dict[str, Any], analysis: str) -> Dict[str, Any]:
+        """
+        Wrap generated analysis with the search metadata returned to the frontend
+        """
+        return {
+            'journalist_name': data['journalist_name'],
+            'case_study_analysis': analysis,
+            'journalist_image': data.get('journalist_image', ''),
+            'raw_data': data,
+            'generation_timestamp': datetime.now().isoformat(),
+            'data_sources_count': data['metadata']['total_results'],
+            'sources_used': data['metadata']['sources_used']
+        }
+    
+    async def generate_case_study(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate AI case study - OPTIMIZED for speed while keeping comprehensive output
+        """
+        if not llm_gateway.is_configured():
+            return None
+        
+        try:
+            messages = self.build_case_study_messages(data)
+
             logger.info(f"AI: Generating comprehensive case study...")
             
             # FAST RETRY LOGIC - optimized for 1-2 minute response
-            max_retries = 2  # Reduced from 3
-            for attempt in range(1, max_retries + 1):
-                try:
-                    logger.info(f"AI: Attempt {attempt}/{max_retries}")
-                    
-                    response = ai_client.chat.completions.create(
-                        model="qwen/qwen3-coder-480b-a35b-instruct",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a journalism educator. Create comprehensive, well-structured case studies."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        temperature=0.2,
-                        max_tokens=4000,
-                        top_p=0.8,
-                        timeout=90  # Increased timeout for larger model
-                    )
-                    
-                    analysis = response.choices[0].message.content.strip()
-                    logger.info(f"AI: SUCCESS on attempt {attempt}")
-                    break
-                    
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if '504' in error_str or 'timeout' in error_str or 'gateway' in error_str:
-                        if attempt < max_retries:
-                            wait_time = 2  # Quick 2s retry
-                            logger.warning(f"AI: Timeout on attempt {attempt}, quick retry in {wait_time}s...")
-                            time.sleep(wait_time)
-                        else:
-                            logger.error(f"AI: All {max_retries} attempts failed with timeout")
-                            raise Exception("AI service timeout after retries. Please try again in a few moments.")
-                    else:
-                        logger.error(f"AI: Non-timeout error: {e}")
-                        raise
+            try:
+                analysis = await llm_gateway.chat_completion(messages, **CASE_STUDY_LLM_PARAMS)
+                logger.info(f"AI: Case study generated")
+            except llm_gateway.LLMTimeoutError:
+                logger.error(f"AI: All attempts failed with timeout")
+                raise Exception("AI service timeout after retries. Please try again in a few moments.")
             
-            return {
-                'journalist_name': journalist_name,
-                'case_study_analysis': analysis,
-                'journalist_image': data.get('journalist_image', ''),
-                'raw_data': data,
-                'generation_timestamp': datetime.now().isoformat(),
-                'data_sources_count': data['metadata']['total_results'],
-                'sources_used': data['metadata']['sources_used']
-            }
+            return self.assemble_case_study(data, analysis)
             
         except Exception as e:
             logger.error(f"ERROR: AI generation failed: {e}")
             return None
 
 
-def generate_journalist_case_study(journalist_name: str) -> Dict[str, Any]:
+async def generate_journalist_case_study(journalist_name: str) -> Dict[str, Any]:
     """
     Main function using SERP API + Wikipedia
     """
@@ -662,7 +589,7 @@ def generate_journalist_case_study(journalist_name: str) -> Dict[str, Any]:
         scraper = WorkingJournalistScraper()
         
         # Step 1: Search
-        data = scraper.comprehensive_search(journalist_name)
+        data = await scraper.comprehensive_search(journalist_name)
         
         if not data or data['metadata']['total_results'] < 1:
             return {
@@ -671,7 +598,7 @@ def generate_journalist_case_study(journalist_name: str) -> Dict[str, Any]:
             }
         
         # Step 2: AI case study
-        case_study = scraper.generate_case_study(data)
+        case_study = await scraper.generate_case_study(data)
         
         if not case_study:
             return {
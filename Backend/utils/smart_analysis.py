@@ -1,45 +1,19 @@
 # smart_analysis.py
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from openai import OpenAI
+
+from utils import llm_gateway
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
-MONGO_URI = os.getenv("MONGO_URI")
 
 if not NVIDIA_API_KEY:
     logger.error("ERROR: NVIDIA_API_KEY not found in environment!")
-if not MONGO_URI:
-    logger.error("ERROR: MONGO_URI not found in environment!")
-
-# MongoDB setup
-try:
-    client = MongoClient(MONGO_URI)
-    db = client["datahalo"]
-    news_collection = db["news"]
-    logger.info("SUCCESS: MongoDB connected for smart analysis")
-except Exception as e:
-    logger.error(f"ERROR: MongoDB connection failed: {e}")
-    client = None
-    db = None
-    news_collection = None
-
-# NVIDIA/OpenAI client
-try:
-    ai_client = OpenAI(
-        api_key=NVIDIA_API_KEY,
-        base_url="https://integrate.api.nvidia.com/v1"
-    )
-    logger.info("SUCCESS: NVIDIA AI client initialized")
-except Exception as e:
-    logger.error(f"ERROR: Failed to initialize AI client: {e}")
-    ai_client = None
 
 def get_perspective_prompt(pov):
     """Generate customized prompts based on perspective."""
@@ -96,66 +70,115 @@ def get_perspective_prompt(pov):
     
     return prompts.get(pov, prompts["general public"])
 
-def _select_articles_for_pov(articles, pov):
-    settings = {
-        "government exam aspirant": {
-            "allowed": {"general", "business", "technology", "science", "health"},
-            "excluded": {"entertainment", "sports"},
-            "caps": {"general": 18, "business": 14, "technology": 10, "science": 4, "health": 4},
-            "max": 50,
-        },
-        "finance analyst": {
-            "allowed": {"business", "technology", "science", "general", "health"},
-            "excluded": {"entertainment", "sports"},
-            "caps": {"business": 18, "technology": 12, "science": 10, "general": 10, "health": 8},
-            "max": 50,
-        },
-        "tech student": {
-            "allowed": {"technology", "science", "business", "general", "health"},
-            "excluded": {"entertainment", "sports"},
-            "caps": {"technology": 18, "science": 12, "business": 10, "general": 8, "health": 6},
-            "max": 50,
-        },
-        "business student": {
-            "allowed": {"business", "technology", "general", "science", "health"},
-            "excluded": {"entertainment", "sports"},
-            "caps": {"business": 18, "technology": 12, "general": 10, "science": 8, "health": 6},
-            "max": 50,
-        },
-        "journalism student": {
-            "allowed": {"general", "technology", "business", "science", "health", "sports", "entertainment"},
-            "excluded": set(),
-            "caps": {"general": 12, "technology": 8, "business": 8, "science": 6, "health": 6, "sports": 5, "entertainment": 5},
-            "max": 50,
-        },
-        "general public": {
-            "allowed": {"general", "technology", "business", "science", "health", "sports", "entertainment"},
-            "excluded": set(),
-            "caps": {"general": 14, "technology": 8, "business": 8, "science": 6, "health": 6, "sports": 5, "entertainment": 5},
-            "max": 45,
-        },
-    }
+# Per-perspective category filters, per-category caps and overall article budget
+POV_SETTINGS = {
+    "government exam aspirant": {
+        "allowed": {"general", "business", "technology", "science", "health"},
+        "excluded": {"entertainment", "sports"},
+        "caps": {"general": 18, "business": 14, "technology": 10, "science": 4, "health": 4},
+        "max": 50,
+    },
+    "finance analyst": {
+        "allowed": {"business", "technology", "science", "general", "health"},
+        "excluded": {"entertainment", "sports"},
+        "caps": {"business": 18, "technology": 12, "science": 10, "general": 10, "health": 8},
+        "max": 50,
+    },
+    "tech student": {
+        "allowed": {"technology", "science", "business", "general", "health"},
+        "excluded": {"entertainment", "sports"},
+        "caps": {"technology": 18, "science": 12, "business": 10, "general": 8, "health": 6},
+        "max": 50,
+    },
+    "business student": {
+        "allowed": {"business", "technology", "general", "science", "health"},
+        "excluded": {"entertainment", "sports"},
+        "caps": {"business": 18, "technology": 12, "general": 10, "science": 8, "health": 6},
+        "max": 50,
+    },
+    "journalism student": {
+        "allowed": {"general", "technology", "business", "science", "health", "sports", "entertainment"},
+        "excluded": set(),
+        "caps": {"general": 12, "technology": 8, "business": 8, "science": 6, "health": 6, "sports": 5, "entertainment": 5},
+        "max": 50,
+    },
+    "general public": {
+        "allowed": {"general", "technology", "business", "science", "health", "sports", "entertainment"},
+        "excluded": set(),
+        "caps": {"general": 14, "technology": 8, "business": 8, "science": 6, "health": 6, "sports": 5, "entertainment": 5},
+        "max": 45,
+    },
+}
+
+# Articles fetched per category; headroom so story-cluster dedup and the fill pass still have enough
+CANDIDATES_PER_CATEGORY_FACTOR = 2
+
+FEED_PROJECTION = {
+    "title": 1, "description": 1, "url": 1, "source": 1, "category": 1,
+    "publishedAt": 1, "fetchedAt": 1, "story_cluster_id": 1,
+}
+
+
+def pov_settings(pov):
+    return POV_SETTINGS.get((pov or "").lower(), POV_SETTINGS["general public"])
+
+
+def _category_branch(category, start_date, end_date, limit):
+    # Equality on category then a fetchedAt range/sort: walks category_fetchedAt and stops at the limit
+    return [
+        {"$match": {"category": category, "fetchedAt": {"$gte": start_date, "$lte": end_date}}},
+        {"$sort": {"fetchedAt": -1}},
+        {"$limit": limit},
+        {"$project": FEED_PROJECTION},
+    ]
+
+
+def pov_candidates_pipeline(collection_name, pov, start_date, end_date):
+    """
+    One aggregation returning the newest articles per allowed category: an indexed match/sort/limit
+    branch per category, combined with $unionWith, so each branch reads only its cap's worth of
+    documents however many articles the window holds.
+    """
+    cfg = pov_settings(pov)
+    per_category = cfg["max"] * CANDIDATES_PER_CATEGORY_FACTOR
+    first, *rest = sorted(cfg["allowed"])
+    pipeline = _category_branch(first, start_date, end_date, per_category)
+    for category in rest:
+        pipeline.append({"$unionWith": {
+            "coll": collection_name,
+            "pipeline": _category_branch(category, start_date, end_date, per_category),
+        }})
+    return pipeline
+
+
+def fetch_pov_candidates(collection, pov, start_date, end_date):
+    """Run pov_candidates_pipeline and return article dicts, newest first."""
+    articles = list(collection.aggregate(pov_candidates_pipeline(collection.name, pov, start_date, end_date)))
+    articles.sort(key=lambda a: a.get("fetchedAt") or datetime.min, reverse=True)
+    for article in articles:
+        article["id"] = str(article.pop("_id"))
+    return articles
+
 
-    cfg = settings.get(pov.lower(), settings["general public"])
+def _select_articles_for_pov(articles, pov):
+    cfg = pov_settings(pov)
 
     def _article_dt(a):
-        ts = a.get("fetchedAt")
-        if ts:
-            try:
-                return datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
-            except:
-                pass
-        ts = a.get("publishedAt")
-        if ts:
-            try:
-                return datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
-            except:
-                pass
+        for field in ("fetchedAt", "publishedAt"):
+            ts = a.get(field)
+            if isinstance(ts, datetime):
+                return ts.replace(tzinfo=None)
+            if ts:
+                try:
+                    return datetime.fromisoformat(str(ts).replace("Z", "+00:00")).replace(tzinfo=None)
+                except ValueError:
+                    pass
         return datetime.min
 
+    # One article per story: syndicated copies share a story_cluster_id
     dedup = {}
     for a in articles:
-        u = a.get("url") or f"{a.get('title','')}:{a.get('source','')}"
+        u = a.get("story_cluster_id") or a.get("url") or f"{a.get('title','')}:{a.get('source','')}"
         if u not in dedup:
             dedup[u] = a
 
@@ -185,100 +208,97 @@ def _select_articles_for_pov(articles, pov):
             break
 
     if len(selected) < cfg["max"]:
+        taken = {id(a) for a in selected}
         for cat, items in buckets.items():
             if len(selected) >= cfg["max"]:
                 break
             for a in items:
                 if len(selected) >= cfg["max"]:
                     break
-                if a in selected:
+                if id(a) in taken:
                     continue
                 selected.append(a)
 
     return selected
 
-def smart_analyse(articles, pov="general public", region_context=None):
-    """
-    Analyze latest Indian news with in-depth, accurate insights.
-    Natural language, no formulas, focused on current affairs.
-    """
-    try:
-        # Auto-cleanup old articles
-        auto_cleanup_on_analysis()
-        
-        if not articles:
-            return "No articles available for analysis."
+SMART_ANALYSIS_LLM_PARAMS = {
+    "endpoint": "smart-feed",
+    "temperature": 0.4,
+    "max_tokens": 4500,
+    "top_p": 0.9,
+    "timeout": 300,  # 5 minutes for comprehensive analysis
+    "max_attempts": 3,
+}
+
+def build_smart_analysis_request(articles, pov="general public", region_context=None):
+    """Select articles for the perspective and build the prompt. Returns the context finalize needs."""
+    selected = _select_articles_for_pov(articles, pov)
+    articles_to_analyze = selected
+    total_articles = len(articles)
+    
+    logger.info(f"Analyzing {len(articles_to_analyze)} latest articles out of {total_articles} total")
+    
+    # Prepare articles with dates for context
+    article_texts = []
+    sources_set = set()
+    categories_set = set()
+    
+    for i, article in enumerate(articles_to_analyze, 1):
+        title = article.get('title', 'No title')
+        description = article.get('description') or 'No description'  # Handle None
+        source = article.get('source', 'Unknown')
+        category = article.get('category', 'general')
+        published = article.get('publishedAt', '')
         
-        if not ai_client:
-            return "AI analysis service is currently unavailable."
-
-        selected = _select_articles_for_pov(articles, pov)
-        articles_to_analyze = selected
-        total_articles = len(articles)
+        # Extract date for context
+        try:
+            pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
+            date_str = pub_date.strftime('%B %d, %Y')
+        except:
+            date_str = "Recent"
         
-        logger.info(f"Analyzing {len(articles_to_analyze)} latest articles out of {total_articles} total")
+        sources_set.add(source)
+        categories_set.add(category)
         
-        # Prepare articles with dates for context
-        article_texts = []
-        sources_set = set()
-        categories_set = set()
+        # Truncate description (safely handle None)
+        desc_truncated = description[:250] + "..." if description and len(description) > 250 else description
         
-        for i, article in enumerate(articles_to_analyze, 1):
-            title = article.get('title', 'No title')
-            description = article.get('description') or 'No description'  # Handle None
-            source = article.get('source', 'Unknown')
-            category = article.get('category', 'general')
-            published = article.get('publishedAt', '')
-            
-            # Extract date for context
-            try:
-                pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                date_str = pub_date.strftime('%B %d, %Y')
-            except:
-                date_str = "Recent"
-            
-            sources_set.add(source)
-            categories_set.add(category)
-            
-            # Truncate description (safely handle None)
-            desc_truncated = description[:250] + "..." if description and len(description) > 250 else description
-            
-            article_text = f"[{i}] ({date_str}) {title}\n    Source: {source}\n    {desc_truncated}\n"
-            article_texts.append(article_text)
+        article_text = f"[{i}] ({date_str}) {title}\n    Source: {source}\n    {desc_truncated}\n"
+        article_texts.append(article_text)
 
-        combined_text = "\n".join(article_texts)
-        
-        # Get perspective config
-        prompt_config = get_perspective_prompt(pov.lower())
-        
-        # Natural, in-depth analysis prompt
-        extra_focus = ""
-        if pov.lower() == "government exam aspirant":
-            extra_focus = "\nADDITIONAL INSTRUCTIONS FOR EXAM PREP:\n- Do not include entertainment or sports\n- Map topics to UPSC GS papers and key syllabus areas\n- Emphasize government schemes, constitutional articles, committees, reports, indices\n- Provide factual bullet points suitable for revision\n"
-        elif pov.lower() == "women commission":
-            extra_focus += "\nWOMEN-FOCUSED ACTION:\n- Prioritize incidents and developments related to women's safety and rights\n- Highlight legal protections, enforcement status, and gaps\n- Provide 4-6 clear administrative and policing action steps\n- Emphasize prevention, rapid response, survivor support, and accountability\n"
-        elif pov.lower() == "assistant commissioner of police":
-            extra_focus += "\nLAW & ORDER ACTION:\n- Focus on crime trends, hotspots, and enforcement effectiveness\n- Include cybercrime, fraud, and public safety updates\n- Provide 4-6 specific policing actions (deployment, surveillance, outreach, coordination)\n- Note FIR patterns, investigation progress, and resource needs\n"
-        elif pov.lower() == "ias officer":
-            extra_focus += "\nGOVERNANCE ACTION:\n- Emphasize implementation status of schemes and compliance risks\n- Identify inter-departmental coordination needs and bottlenecks\n- Provide 4-6 actionable administrative steps for service delivery improvement\n- Include monitoring metrics and citizen feedback mechanisms\n"
-        elif pov.lower() == "economist":
-            extra_focus += "\nECONOMY FOCUS:\n- Emphasize inflation, employment, trade, investment, sector performance\n- Link news to macro indicators and state-level implications\n- Provide 4-6 policy-relevant takeaways and risk signals\n"
-        elif pov.lower() == "social worker":
-            extra_focus += "\nWELFARE FOCUS:\n- Prioritize vulnerable groups, welfare delivery gaps, and local challenges\n- Provide 4-6 community-centric actions and NGO-government collaboration ideas\n- Emphasize health, education, and protection services\n"
-        elif pov.lower() == "block president":
-            extra_focus += "\nLOCAL DEVELOPMENT FOCUS:\n- Emphasize block/panchayat-level schemes and infrastructure status\n- Provide 4-6 citizen-facing actions to improve local service delivery\n- Include roads, water, electricity, health, and school improvements\n"
-
-        if region_context:
-            rc_state = (region_context.get("state") or "").strip()
-            rc_district = (region_context.get("district") or "").strip()
-            if rc_state or rc_district:
-                local_line = "\nREGIONAL FOCUS:" \
-                    + (f" Emphasize developments related to {rc_district}, " if rc_district else " ") \
-                    + (f"{rc_state}." if rc_state else "") \
-                    + " If limited local news, acknowledge and prioritize closest relevant Indian context (state-level, then national).\n"
-                extra_focus += local_line
-
-        user_prompt = f"""You are analyzing INDIAN current affairs for {pov}. Focus ONLY on news directly related to India - Indian politics, economy, society, policies, and India's international relations.{extra_focus}
+    combined_text = "\n".join(article_texts)
+    
+    # Get perspective config
+    prompt_config = get_perspective_prompt(pov.lower())
+    
+    # Natural, in-depth analysis prompt
+    extra_focus = ""
+    if pov.lower() == "government exam aspirant":
+        extra_focus = "\nADDITIONAL INSTRUCTIONS FOR EXAM PREP:\n- Do not include entertainment or sports\n- Map topics to UPSC GS papers and key syllabus areas\n- Emphasize government schemes, constitutional articles, committees, reports, indices\n- Provide factual bullet points suitable for revision\n"
+    elif pov.lower() == "women commission":
+        extra_focus += "\nWOMEN-FOCUSED ACTION:\n- Prioritize incidents and developments related to women's safety and rights\n- Highlight legal protections, enforcement status, and gaps\n- Provide 4-6 clear administrative and policing action steps\n- Emphasize prevention, rapid response, survivor support, and accountability\n"
+    elif pov.lower() == "assistant commissioner of police":
+        extra_focus += "\nLAW & ORDER ACTION:\n- Focus on crime trends, hotspots, and enforcement effectiveness\n- Include cybercrime, fraud, and public safety updates\n- Provide 4-6 specific policing actions (deployment, surveillance, outreach, coordination)\n- Note FIR patterns, investigation progress, and resource needs\n"
+    elif pov.lower() == "ias officer":
+        extra_focus += "\nGOVERNANCE ACTION:\n- Emphasize implementation status of schemes and compliance risks\n- Identify inter-departmental coordination needs and bottlenecks\n- Provide 4-6 actionable administrative steps for service delivery improvement\n- Include monitoring metrics and citizen feedback mechanisms\n"
+    elif pov.lower() == "economist":
+        extra_focus += "\nECONOMY FOCUS:\n- Emphasize inflation, employment, trade, investment, sector performance\n- Link news to macro indicators and state-level implications\n- Provide 4-6 policy-relevant takeaways and risk signals\n"
+    elif pov.lower() == "social worker":
+        extra_focus += "\nWELFARE FOCUS:\n- Prioritize vulnerable groups, welfare delivery gaps, and local challenges\n- Provide 4-6 community-centric actions and NGO-government collaboration ideas\n- Emphasize health, education, and protection services\n"
+    elif pov.lower() == "block president":
+        extra_focus += "\nLOCAL DEVELOPMENT FOCUS:\n- Emphasize block/panchayat-level schemes and infrastructure status\n- Provide 4-6 citizen-facing actions to improve local service delivery\n- Include roads, water, electricity, health, and school improvements\n"
+
+    if region_context:
+        rc_state = (region_context.get("state") or "").strip()
+        rc_district = (region_context.get("district") or "").strip()
+        if rc_state or rc_district:
+            local_line = "\nREGIONAL FOCUS:" \
+                + (f" Emphasize developments related to {rc_district}, " if rc_district else " ") \
+                + (f"{rc_state}." if rc_state else "") \
+                + " If limited local news, acknowledge and prioritize closest relevant Indian context (state-level, then national).\n"
+            extra_focus += local_line
+
+    user_prompt = f"""You are analyzing INDIAN current affairs for {pov}. Focus ONLY on news directly related to India - Indian politics, economy, society, policies, and India's international relations.{extra_focus}
 
 WHAT TO COVER:
 {prompt_config['focus']}
@@ -379,89 +399,66 @@ CRITICAL INSTRUCTIONS:
 
 If articles are old or not India-focused, acknowledge this and work with what's available."""
 
-        # Call NVIDIA API
-        logger.info(f"Starting AI analysis for {pov}")
-        
-        # Extended timeout and retry logic for comprehensive analysis
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                timeout_seconds = 300  # 5 minutes for comprehensive analysis
-                logger.info(f"AI: Attempt {attempt + 1}/{max_retries} - calling NVIDIA API (timeout: {timeout_seconds}s)...")
-                
-                response = ai_client.chat.completions.create(
-                    model="qwen/qwen3-coder-480b-a35b-instruct",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": prompt_config['system'] + " Write naturally in flowing prose. NO templates, NO formulas, NO markdown. Write like a professional analyst writing for educated readers who want depth and accuracy."
-                        },
-                        {
-                            "role": "user", 
-                            "content": user_prompt
-                        }
-                    ],
-                    temperature=0.4,
-                    max_tokens=4500,
-                    top_p=0.9,
-                    timeout=timeout_seconds
-                )
-                logger.info("AI: Request completed successfully!")
-                break  # Success
-                
-            except Exception as e:
-                error_str = str(e).lower()
-                if 'timeout' in error_str or 'timed out' in error_str:
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 10
-                        logger.warning(f"AI: Timeout on attempt {attempt + 1}/{max_retries}, retrying in {wait_time}s...")
-                        import time
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(f"AI: All {max_retries} attempts timed out - using fallback analysis")
-                        return generate_fallback_analysis(articles_to_analyze, pov)
-                else:
-                    logger.error(f"AI: Error on attempt {attempt + 1}: {str(e)}")
-                    if attempt < max_retries - 1:
-                        import time
-                        time.sleep(5)
-                    else:
-                        logger.error("AI: All retry attempts failed - using fallback")
-                        return generate_fallback_analysis(articles_to_analyze, pov)
-
-        analysis_content = response.choices[0].message.content.strip()
-        
-        # Clean up any formatting artifacts
-        analysis_content = analysis_content.replace("**", "")
-        analysis_content = analysis_content.replace("*", "")
-        analysis_content = analysis_content.replace("###", "")
-        analysis_content = analysis_content.replace("##", "")
-        analysis_content = analysis_content.replace("#", "")
-        
-        # Remove emojis
-        emoji_pattern = r'[\U0001F300-\U0001F9FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U00002600-\U000027BF\U0001F900-\U0001F9FF\U0001F1E0-\U0001F1FF]'
-        import re
-        analysis_content = re.sub(emoji_pattern, '', analysis_content)
-        
-        # Remove AI references
-        analysis_content = analysis_content.replace("AI analysis", "Analysis")
-        analysis_content = analysis_content.replace("AI-generated", "Professional")
-        analysis_content = analysis_content.replace("According to the AI", "Analysis shows")
-        analysis_content = analysis_content.replace("As an AI", "From an analytical perspective")
-        
-        # Build header
-        current_time = datetime.now().strftime('%B %d, %Y at %I:%M %p')
-        perspective_title = pov.title()
-        
-        analysis_scope = f"{len(articles_to_analyze)} latest articles"
-        if total_articles > len(articles_to_analyze):
-            analysis_scope += f" (from {total_articles} available)"
-        
-        from collections import Counter
-        cat_counts = Counter([(a.get('category') or 'general') for a in articles_to_analyze])
-        coverage = ", ".join([f"{k}: {v}" for k, v in sorted(cat_counts.items())])
+    messages = [
+        {
+            "role": "system", 
+            "content": prompt_config['system'] + " Write naturally in flowing prose. NO templates, NO formulas, NO markdown. Write like a professional analyst writing for educated readers who want depth and accuracy."
+        },
+        {
+            "role": "user", 
+            "content": user_prompt
+        }
+    ]
+    return {
+        "messages": messages,
+        "pov": pov,
+        "articles_to_analyze": articles_to_analyze,
+        "total_articles": total_articles,
+        "sources_set": sources_set
+    }
 
-        header = f"""
+def clean_stream_chunk(text):
+    """Per-delta version of the markdown stripping applied to the final text."""
+    return text.replace("*", "").replace("#", "")
+
+def finalize_smart_analysis(analysis_content, request_ctx):
+    """Strip formatting artifacts from the model output and wrap it in the report header/footer."""
+    pov = request_ctx["pov"]
+    articles_to_analyze = request_ctx["articles_to_analyze"]
+    total_articles = request_ctx["total_articles"]
+    sources_set = request_ctx["sources_set"]
+
+    # Clean up any formatting artifacts
+    analysis_content = analysis_content.replace("**", "")
+    analysis_content = analysis_content.replace("*", "")
+    analysis_content = analysis_content.replace("###", "")
+    analysis_content = analysis_content.replace("##", "")
+    analysis_content = analysis_content.replace("#", "")
+    
+    # Remove emojis
+    emoji_pattern = r'[\U0001F300-\U0001F9FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U00002600-\U000027BF\U0001F900-\U0001F9FF\U0001F1E0-\U0001F1FF]'
+    import re
+    analysis_content = re.sub(emoji_pattern, '', analysis_content)
+    
+    # Remove AI references
+    analysis_content = analysis_content.replace("AI analysis", "Analysis")
+    analysis_content = analysis_content.replace("AI-generated", "Professional")
+    analysis_content = analysis_content.replace("According to the AI", "Analysis shows")
+    analysis_content = analysis_content.replace("As an AI", "From an analytical perspective")
+    
+    # Build header
+    current_time = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+    perspective_title = pov.title()
+    
+    analysis_scope = f"{len(articles_to_analyze)} latest articles"
+    if total_articles > len(articles_to_analyze):
+        analysis_scope += f" (from {total_articles} available)"
+    
+    from collections import Counter
+    cat_counts = Counter([(a.get('category') or 'general') for a in articles_to_analyze])
+    coverage = ", ".join([f"{k}: {v}" for k, v in sorted(cat_counts.items())])
+
+    header = f"""
 ================================================================================================
                   CURRENT AFFAIRS ANALYSIS - INDIA
                   Perspective: {perspective_title}
@@ -477,18 +474,46 @@ policies, economy, politics, and society. Based on most recent articles.
 ================================================================================
 
 """
-        
-        footer = f"""
+    
+    footer = f"""
 
 ================================================================================
                     DataHalo Current Affairs Analysis
 ================================================================================
 """
+    
+    final_analysis = header + analysis_content + footer
+    
+    logger.info(f"Analysis complete: {len(final_analysis)} chars, {len(sources_set)} sources")
+    return final_analysis
+
+
+async def smart_analyse(articles, pov="general public", region_context=None):
+    """
+    Analyze latest Indian news with in-depth, accurate insights.
+    Natural language, no formulas, focused on current affairs.
+    """
+    try:
+        if not articles:
+            return "No articles available for analysis."
         
-        final_analysis = header + analysis_content + footer
+        if not llm_gateway.is_configured():
+            return "AI analysis service is currently unavailable."
+
+        request_ctx = build_smart_analysis_request(articles, pov, region_context)
+
+        # Call NVIDIA API
+        logger.info(f"Starting AI analysis for {pov}")
         
-        logger.info(f"Analysis complete: {len(final_analysis)} chars, {len(sources_set)} sources")
-        return final_analysis
+        # Extended timeout for comprehensive analysis; retries and backoff live in the gateway
+        try:
+            analysis_content = await llm_gateway.chat_completion(request_ctx["messages"], **SMART_ANALYSIS_LLM_PARAMS)
+            logger.info("AI: Request completed successfully!")
+        except llm_gateway.LLMError as e:
+            logger.error(f"AI: All retry attempts failed ({e}) - using fallback analysis")
+            return generate_fallback_analysis(request_ctx["articles_to_analyze"], pov)
+
+        return finalize_smart_analysis(analysis_content, request_ctx)
 
     except Exception as e:
         logger.error(f"Analysis error: {e}", exc_info=True)
@@ -501,48 +526,6 @@ Please try again. If issue persists, contact support.
 
 ================================================================================"""
 
-def cleanup_old_articles(days_old=7):
-    """Delete articles older than specified days."""
-    if news_collection is None:
-        logger.error("Cannot cleanup - database not available")
-        return 0
-    
-    try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-        
-        logger.info(f"Cleaning articles older than {days_old} days (before {cutoff_date.strftime('%Y-%m-%d')})")
-        
-        result = news_collection.delete_many({
-            "fetchedAt": {"$lt": cutoff_date}
-        })
-        
-        deleted_count = result.deleted_count
-        
-        if deleted_count > 0:
-            logger.info(f"Deleted {deleted_count} old articles")
-        
-        remaining = news_collection.count_documents({})
-        logger.info(f"Remaining: {remaining} articles")
-        
-        return deleted_count
-        
-    except Exception as e:
-        logger.error(f"Cleanup failed: {e}")
-        return 0
-
-
-def auto_cleanup_on_analysis():
-    """Auto cleanup before analysis."""
-    try:
-        deleted = cleanup_old_articles(days_old=7)
-        if deleted > 0:
-            logger.info(f"Auto-cleanup: Removed {deleted} old articles")
-        return deleted
-    except Exception as e:
-        logger.error(f"Auto-cleanup error: {e}")
-        return 0
-
-
 def generate_fallback_analysis(articles, pov):
     """Generate a basic analysis without AI when API fails."""
     try:
@@ -0,0 +1,297 @@
+"""
+Smart-Feed Digests
+Materialized /smart-feed analyses, one per (pov, state, district, days bucket).
+Each digest records a fingerprint of the article set it was generated from;
+a request whose freshly selected articles hash to the same fingerprint is
+served straight from MongoDB without an LLM call. A changed selection serves
+the previous digest flagged `stale` while a single background task rebuilds it,
+and ingestion of new articles triggers a debounced refresh of recently
+requested digests so most reads find a fresh one
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils import llm_gateway
+from utils.smart_analysis import (
+    build_smart_analysis_request,
+    finalize_smart_analysis,
+    generate_fallback_analysis,
+    SMART_ANALYSIS_LLM_PARAMS,
+)
+
+logger = logging.getLogger("smart_digests")
+
+# Requested day windows snap up to one of these so nearby values share a digest
+DAY_BUCKETS = (1, 3, 7, 14, 30)
+# A digest older than this is stale even if its article set is unchanged (the header carries a timestamp)
+MAX_AGE_S = int(os.getenv("SMART_DIGEST_MAX_AGE", str(6 * 3600)))
+# Only digests requested within this window are refreshed after ingestion
+ACTIVE_WINDOW_S = int(os.getenv("SMART_DIGEST_ACTIVE_WINDOW", str(24 * 3600)))
+# Never regenerate the same digest more often than this, whatever ingestion does (LLM budget)
+MIN_REFRESH_INTERVAL_S = int(os.getenv("SMART_DIGEST_MIN_REFRESH", "600"))
+# Wait for ingestion jobs that finish close together before refreshing
+REFRESH_DEBOUNCE_S = float(os.getenv("SMART_DIGEST_DEBOUNCE", "60"))
+# Unrequested digests are dropped by the TTL index after this long
+RETENTION_DAYS = int(os.getenv("SMART_DIGEST_RETENTION_DAYS", "7"))
+
+CollectArticles = Callable[[str, int, str, str], Awaitable[List[Dict[str, Any]]]]
+
+_collection = None
+_collect: Optional[CollectArticles] = None
+_inflight: Dict[str, asyncio.Task] = {}
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_pending = False
+_stats = {"fresh": 0, "stale": 0, "built": 0, "background_builds": 0, "unchanged_checks": 0, "errors": 0}
+
+
+def init_smart_digests(database, collect_articles: CollectArticles):
+    """Attach storage and the coroutine that gathers a feed's candidate articles (called from main)."""
+    global _collection, _collect
+    _collection = database["smart_digests"]
+    _collect = collect_articles
+    logger.info("SUCCESS: Smart-feed digests attached")
+
+
+def days_bucket(days: int) -> int:
+    for bucket in DAY_BUCKETS:
+        if days <= bucket:
+            return bucket
+    return DAY_BUCKETS[-1]
+
+
+def _key_parts(pov: str, days: int, state: str, district: str) -> Dict[str, Any]:
+    return {
+        "pov": (pov or "general public").strip().lower(),
+        "state": (state or "").strip().lower(),
+        "district": (district or "").strip().lower(),
+        "days": days_bucket(days),
+    }
+
+
+def _key(parts: Dict[str, Any]) -> str:
+    return f"{parts['pov']}|{parts['state']}|{parts['district']}|{parts['days']}"
+
+
+def fingerprint(articles: List[Dict[str, Any]]) -> str:
+    """Order-independent hash of the selected article ids (stored id, else URL)."""
+    ids = sorted(str(a.get("id") or a.get("url") or a.get("title", "")) for a in articles)
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+def prepare(pov: str, days: int, state: str, district: str, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Select articles and build the prompt for a feed; cheap, no LLM call."""
+    parts = _key_parts(pov, days, state, district)
+    request_ctx = build_smart_analysis_request(articles, pov, region_context={"state": state, "district": district})
+    return {
+        "key": _key(parts),
+        "parts": parts,
+        "pov": pov,
+        "request_ctx": request_ctx,
+        "fingerprint": fingerprint(request_ctx["articles_to_analyze"]),
+    }
+
+
+def _age_s(doc: Dict[str, Any]) -> float:
+    return (datetime.utcnow() - doc["generated_at"]).total_seconds()
+
+
+def is_fresh(doc: Optional[Dict[str, Any]], prepared: Dict[str, Any]) -> bool:
+    return bool(doc) and doc.get("fingerprint") == prepared["fingerprint"] and _age_s(doc) < MAX_AGE_S
+
+
+def _load(key: str) -> Optional[Dict[str, Any]]:
+    # Touch on read so the refresher and the TTL index see which digests are still wanted
+    return _collection.find_one_and_update({"_id": key}, {"$set": {"last_requested_at": datetime.utcnow()}})
+
+
+async def load(prepared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if _collection is None:
+        return None
+    return await asyncio.to_thread(_load, prepared["key"])
+
+
+def _store(prepared: Dict[str, Any], summary: str) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    doc = {
+        **prepared["parts"],
+        "fingerprint": prepared["fingerprint"],
+        "summary": summary,
+        "articles_analyzed": len(prepared["request_ctx"]["articles_to_analyze"]),
+        "generated_at": now,
+    }
+    if _collection is not None:
+        _collection.update_one(
+            {"_id": prepared["key"]},
+            {"$set": doc, "$setOnInsert": {"last_requested_at": now}},
+            upsert=True,
+        )
+    return doc
+
+
+async def save(prepared: Dict[str, Any], summary: str) -> Dict[str, Any]:
+    """Persist a completed analysis (also used by the streaming path once its stream finishes)."""
+    return await asyncio.to_thread(_store, prepared, summary)
+
+
+async def _build(prepared: Dict[str, Any]) -> Dict[str, Any]:
+    request_ctx = prepared["request_ctx"]
+    started = time.time()
+    content = await llm_gateway.chat_completion(request_ctx["messages"], **SMART_ANALYSIS_LLM_PARAMS)
+    doc = await save(prepared, finalize_smart_analysis(content, request_ctx))
+    logger.info(f"DIGEST: Built '{prepared['key']}' in {time.time() - started:.1f}s")
+    return doc
+
+
+def _build_once(prepared: Dict[str, Any]) -> asyncio.Task:
+    """Single-flight per digest key: concurrent misses and refreshes share one LLM call."""
+    key = prepared["key"]
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_build(prepared))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+def _refresh_in_background(prepared: Dict[str, Any]):
+    task = _build_once(prepared)
+
+    def _log_failure(t: asyncio.Task):
+        if not t.cancelled() and t.exception() is not None:
+            _stats["errors"] += 1
+            logger.error(f"DIGEST: Background rebuild of '{prepared['key']}' failed: {t.exception()}")
+    task.add_done_callback(_log_failure)
+
+
+def response(doc: Dict[str, Any], pov: str, stale: bool = False, refreshing: bool = False) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "perspective": pov,
+        "articlesAnalyzed": doc["articles_analyzed"],
+        "summary": doc["summary"],
+        "days": doc["days"],
+        "generated_at": doc["generated_at"].isoformat(),
+        "age_s": round(_age_s(doc), 1),
+        "stale": stale,
+        "refreshing": refreshing,
+    }
+
+
+async def get_digest(pov: str, days: int, state: str, district: str, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Feed response for the request: the stored digest when its article set is unchanged, the previous
+    digest marked stale (with a rebuild started) when it changed, or a newly built one on a miss.
+    """
+    prepared = prepare(pov, days, state, district, articles)
+    doc = await load(prepared)
+
+    if is_fresh(doc, prepared):
+        _stats["fresh"] += 1
+        return response(doc, pov)
+
+    if not llm_gateway.is_configured():
+        if doc:
+            return response(doc, pov, stale=True)
+        return {"status": "success", "perspective": pov, "articlesAnalyzed": 0,
+                "summary": "AI analysis service is currently unavailable.", "stale": False, "refreshing": False}
+
+    if doc:
+        _stats["stale"] += 1
+        _refresh_in_background(prepared)
+        return response(doc, pov, stale=True, refreshing=True)
+
+    try:
+        # shield: a client disconnecting must not throw away an LLM call other requests may be waiting on
+        doc = await asyncio.shield(_build_once(prepared))
+        _stats["built"] += 1
+        return response(doc, pov)
+    except llm_gateway.LLMError as e:
+        _stats["errors"] += 1
+        logger.error(f"AI: Digest build failed ({e}) - using fallback analysis")
+        articles_to_analyze = prepared["request_ctx"]["articles_to_analyze"]
+        return {
+            "status": "success",
+            "perspective": pov,
+            "articlesAnalyzed": len(articles_to_analyze),
+            "summary": generate_fallback_analysis(articles_to_analyze, pov),
+            "stale": False,
+            "refreshing": False,
+        }
+
+
+def _active_digests() -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return list(_collection.find(
+        {
+            "last_requested_at": {"$gte": now - timedelta(seconds=ACTIVE_WINDOW_S)},
+            "generated_at": {"$lte": now - timedelta(seconds=MIN_REFRESH_INTERVAL_S)},
+        },
+        {"summary": 0},
+    ))
+
+
+async def refresh_active() -> Dict[str, int]:
+    """Rebuild recently requested digests whose article selection changed. Sequential to keep LLM load flat."""
+    summary = {"checked": 0, "rebuilt": 0, "failed": 0}
+    if _collection is None or _collect is None or not llm_gateway.is_configured():
+        return summary
+
+    for doc in await asyncio.to_thread(_active_digests):
+        summary["checked"] += 1
+        try:
+            articles = await _collect(doc["pov"], doc["days"], doc["state"], doc["district"])
+            prepared = prepare(doc["pov"], doc["days"], doc["state"], doc["district"], articles)
+            if prepared["fingerprint"] == doc.get("fingerprint"):
+                _stats["unchanged_checks"] += 1
+                continue
+            await _build_once(prepared)
+            _stats["background_builds"] += 1
+            summary["rebuilt"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _stats["errors"] += 1
+            summary["failed"] += 1
+            logger.error(f"DIGEST: Refresh of '{doc['_id']}' failed: {e}")
+
+    logger.info(f"DIGEST: Refresh checked {summary['checked']}, rebuilt {summary['rebuilt']}, failed {summary['failed']}")
+    return summary
+
+
+async def _debounced_refresh():
+    global _refresh_pending, _refresh_task
+    try:
+        while True:
+            await asyncio.sleep(REFRESH_DEBOUNCE_S)
+            _refresh_pending = False
+            await refresh_active()
+            if not _refresh_pending:
+                break
+    finally:
+        _refresh_task = None
+
+
+def notify_ingested(category: str = "all"):
+    """Called after ingestion stored new articles; schedules one debounced refresh of active digests."""
+    global _refresh_task, _refresh_pending
+    if _collection is None or _collect is None:
+        return
+    _refresh_pending = True
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_debounced_refresh())
+        logger.info(f"DIGEST: New '{category}' articles, refresh scheduled in {REFRESH_DEBOUNCE_S:.0f}s")
+
+
+def get_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "building": len(_inflight),
+        "refresh_scheduled": _refresh_task is not None,
+        "max_age_s": MAX_AGE_S,
+    }
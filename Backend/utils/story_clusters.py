@@ -0,0 +1,153 @@
+"""
+Near-Duplicate Story Clustering
+Syndicated wire copy reaches us from many outlets under different URLs. Each
+article gets a MinHash signature over word-bigram shingles of title +
+description, split into LSH bands. The band hashes are stored on the document
+(`minhash_bands`, indexed), so MongoDB doubles as the LSH index: at ingestion
+one query per page finds candidates sharing a band, and an article joins the
+`story_cluster_id` of its most similar recent candidate when the estimated
+Jaccard similarity clears SIMILARITY_THRESHOLD
+"""
+
+import os
+import re
+import random
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("story_clusters")
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 16 bands x 4 rows: ~50% candidate rate at Jaccard 0.5, ~98% at 0.8
+SHINGLE_SIZE = 2
+SIMILARITY_THRESHOLD = float(os.getenv("STORY_SIMILARITY_THRESHOLD", "0.6"))
+# Only cluster with stories seen recently; wire copy is re-run within days, not weeks
+WINDOW_DAYS = int(os.getenv("STORY_CLUSTER_WINDOW_DAYS", "3"))
+
+# Projection that keeps the LSH signature out of API responses
+INTERNAL_FIELDS = {"minhash": 0, "minhash_bands": 0}
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are persisted, so the permutations must be identical across processes/restarts
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str) -> set:
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def minhash(text: str) -> List[int]:
+    """NUM_PERM minimum hash values (each < 2**61, so they fit MongoDB int64); [] for empty text."""
+    hashes = [_hash64(s) % _PRIME for s in shingles(text)]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def bands(signature: List[int]) -> List[int]:
+    """One signed 64-bit key per band; the band index is hashed in so bands never collide."""
+    keys = []
+    for i in range(BANDS):
+        rows = signature[i * ROWS:(i + 1) * ROWS]
+        key = _hash64(f"{i}:" + ",".join(map(str, rows)))
+        keys.append(key - (1 << 64) if key >= (1 << 63) else key)
+    return keys
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    if not a or not b:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def cluster_ids(articles: List[Dict[str, Any]], known: Iterable[Dict[str, Any]] = (),
+                signatures: Optional[List[List[int]]] = None) -> List[Optional[str]]:
+    """
+    Cluster id for every article, in order. Articles keep an existing story_cluster_id; otherwise
+    they join the most similar `known` or earlier article above SIMILARITY_THRESHOLD, or start a
+    new cluster. `known` entries need `minhash` and `story_cluster_id`.
+    """
+    if signatures is None:
+        signatures = [minhash(article_text(a)) for a in articles]
+
+    buckets: Dict[int, List[int]] = {}
+    seen: List[List[int]] = []
+    ids: List[Optional[str]] = []
+
+    def add(signature: List[int], cluster_id: Optional[str]):
+        seen.append(signature)
+        ids.append(cluster_id)
+        if signature and cluster_id:
+            for key in bands(signature):
+                buckets.setdefault(key, []).append(len(seen) - 1)
+
+    for doc in known:
+        if doc.get("minhash") and doc.get("story_cluster_id"):
+            add(doc["minhash"], doc["story_cluster_id"])
+    known_count = len(seen)
+
+    for article, signature in zip(articles, signatures):
+        cluster_id = article.get("story_cluster_id")
+        if not cluster_id and signature:
+            best, best_score = None, SIMILARITY_THRESHOLD
+            for key in bands(signature):
+                for idx in buckets.get(key, ()):
+                    score = similarity(signature, seen[idx])
+                    if score >= best_score:
+                        best, best_score = idx, score
+            # A new cluster is named after its first member's signature
+            cluster_id = ids[best] if best is not None else format(_hash64(",".join(map(str, signature))), "016x")
+        add(signature, cluster_id)
+
+    return ids[known_count:]
+
+
+def annotate(collection, articles: List[Dict[str, Any]]) -> int:
+    """
+    Set minhash, minhash_bands and story_cluster_id on a page of articles before they are stored,
+    matching against recent stored articles with a single band lookup. Returns how many joined
+    an existing cluster.
+    """
+    if not articles:
+        return 0
+    signatures = [minhash(article_text(a)) for a in articles]
+    all_bands = sorted({key for s in signatures if s for key in bands(s)})
+
+    known = []
+    if collection is not None and all_bands:
+        since = datetime.utcnow() - timedelta(days=WINDOW_DAYS)
+        known = list(collection.find(
+            {"minhash_bands": {"$in": all_bands}, "fetchedAt": {"$gte": since}},
+            {"_id": 0, "minhash": 1, "story_cluster_id": 1},
+        ))
+
+    known_ids = {doc.get("story_cluster_id") for doc in known}
+    joined = 0
+    for article, signature, cluster_id in zip(articles, signatures, cluster_ids(articles, known, signatures)):
+        article["minhash"] = signature
+        article["minhash_bands"] = bands(signature) if signature else []
+        article["story_cluster_id"] = cluster_id
+        if cluster_id in known_ids:
+            joined += 1
+
+    if joined:
+        logger.info(f"STORIES: {joined}/{len(articles)} articles joined existing story clusters")
+    return joined
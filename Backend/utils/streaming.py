@@ -0,0 +1,63 @@
+"""
+Server-Sent Events helpers
+Turns an LLM token stream into an SSE response: `token` events carry deltas as
+they arrive, a final `done` event carries the same payload the non-streaming
+endpoint returns, and failures surface as an `error` event
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+from utils import llm_gateway
+
+logger = logging.getLogger("streaming")
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx/render proxies from buffering the stream
+}
+
+
+def format_event(data: Any, event: Optional[str] = None) -> str:
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def completion_events(
+    chunks: AsyncIterator[str],
+    on_complete: Callable[[str], Awaitable[Dict[str, Any]]],
+    transform: Optional[Callable[[str], str]] = None,
+) -> AsyncIterator[str]:
+    """
+    Forward each delta as a `token` event, then hand the full text to `on_complete`
+    (which persists it and builds the final response) and emit that as `done`.
+    """
+    parts = []
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            text = transform(chunk) if transform else chunk
+            if text:
+                yield format_event({"delta": text}, "token")
+
+        result = await on_complete("".join(parts))
+        yield format_event(result, "done")
+
+    except llm_gateway.LLMTimeoutError as e:
+        logger.error(f"STREAM: Timed out: {e}")
+        yield format_event({"status": "error", "message": "AI request timed out. Please try again."}, "error")
+    except Exception as e:
+        logger.error(f"STREAM: Failed: {e}", exc_info=True)
+        yield format_event({"status": "error", "message": str(e)}, "error")
+
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
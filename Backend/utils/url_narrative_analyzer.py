@@ -4,142 +4,97 @@ Comprehensive analysis of news stories from URLs including timeline, manipulatio
 Enhanced with AI-powered article understanding
 """
 
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, Any, List, Optional
 import os
 import re
+import time
 from collections import Counter, defaultdict
-import json
+from utils import article_enrichment, article_extraction, headline_graph, llm_gateway, provider_cache, stage_graph
+from utils.lexicon import Lexicon
+from utils.stage_graph import Stage
 
 logger = logging.getLogger("url_narrative_analyzer")
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
 
+# Keyword sets for the timeline, clustering and sentiment passes, compiled once; "improv*" is a stem
+NARRATIVE_LEXICON = Lexicon({
+    # Timeline (headline only)
+    'timeline_negative': ['crisis', 'scandal', 'controversy', 'issue', 'problem', 'concern', 'critical'],
+    'timeline_positive': ['success', 'achievement', 'growth', 'progress', 'improv*', 'win', 'victory'],
+    # Source clustering
+    'cluster_negative': ['crisis', 'scandal', 'controversy', 'issue', 'problem', 'concern', 'critical',
+                         'failure', 'threat', 'danger', 'risk', 'alarming', 'troubling', 'devastating'],
+    'cluster_positive': ['success', 'achievement', 'growth', 'progress', 'improv*', 'win', 'victory',
+                         'breakthrough', 'triumph', 'advancement', 'innovation', 'excellence'],
+    'alarmist': ['urgent', 'crisis', 'emergency', 'catastrophe', 'disaster', 'shocking', 'alarming'],
+    'dismissive': ['overblown', 'exaggerated', 'myth', 'false alarm', 'nothing to see'],
+    # Sentiment map, weighted 3/2/1
+    'negative_strong': ['crisis', 'scandal', 'disaster', 'catastrophe', 'devastating', 'alarming', 'shocking', 'outrage'],
+    'negative_moderate': ['controversy', 'issue', 'problem', 'concern', 'critical', 'failure', 'threat', 'danger'],
+    'negative_mild': ['question', 'doubt', 'challenge', 'difficulty', 'setback'],
+    'positive_strong': ['breakthrough', 'triumph', 'revolutionary', 'excellent', 'outstanding', 'phenomenal'],
+    'positive_moderate': ['success', 'achievement', 'growth', 'progress', 'improv*', 'win', 'victory'],
+    'positive_mild': ['better', 'good', 'positive', 'forward', 'advance'],
+}, plurals=True)
 
-def extract_article_content(url: str) -> Dict[str, Any]:
-    """Extract article content and metadata from URL with enhanced parsing."""
+SENTIMENT_WEIGHTS = {'strong': 3, 'moderate': 2, 'mild': 1}
+
+# How much of an enriched article's body the keyword passes read
+ENRICHED_TEXT_CHARS = 3000
+
+
+def _headline_text(article: Dict[str, Any]) -> str:
+    """
+    Title plus description (plus the opening of the body for enriched related articles);
+    clustering and sentiment scan the same string, so the second scan is a memo hit.
+    """
+    text = (article.get('title', '') or '') + ' ' + (article.get('description', '') or '')
+    if article.get('enriched'):
+        text += ' ' + (article.get('content', '') or '')[:ENRICHED_TEXT_CHARS]
+    return text
+
+
+async def extract_article_content(url: str) -> Dict[str, Any]:
+    """Extract article content and metadata from URL (JSON-LD, then OpenGraph, then page structure)."""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract title (try multiple methods)
-        title = None
-        if soup.find('h1'):
-            title = soup.find('h1').get_text(strip=True)
-        elif soup.find('meta', attrs={'property': 'og:title'}):
-            title = soup.find('meta', attrs={'property': 'og:title'}).get('content', '')
-        elif soup.find('title'):
-            title = soup.find('title').get_text(strip=True)
+        page = await article_extraction.fetch_article(url, headers=headers, timeout=15)
         
-        # Extract description/summary
-        description = None
-        meta_desc = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
-        if meta_desc:
-            description = meta_desc.get('content', '')
+        title = page['title']
+        description = page['description']
         
         # Extract source/publisher
-        source = None
-        meta_source = soup.find('meta', attrs={'property': 'og:site_name'}) or soup.find('meta', attrs={'name': 'author'})
-        if meta_source:
-            source = meta_source.get('content', '')
-        else:
+        source = page['site_name'] or page['author']
+        if not source:
             # Extract from URL
             from urllib.parse import urlparse
             domain = urlparse(url).netloc
             source = domain.replace('www.', '').replace('.com', '').replace('.in', '').replace('.org', '').title()
         
-        # Extract publish date
-        published_date = None
-        meta_date = soup.find('meta', attrs={'property': 'article:published_time'}) or soup.find('meta', attrs={'name': 'publishdate'}) or soup.find('time')
-        if meta_date:
-            published_date = meta_date.get('content', '') or meta_date.get('datetime', '')
-        
-        # Extract article body (ENHANCED - multiple strategies)
-        article_body = []
-        
-        # Strategy 1: Try article tag first
-        article_tag = soup.find('article')
-        if article_tag:
-            paragraphs = article_tag.find_all('p')
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                if len(text) > 40:  # Substantial paragraphs
-                    article_body.append(text)
-        
-        # Strategy 2: If no content, try main content areas
-        if len(article_body) < 3:
-            content_areas = soup.find_all(['div'], class_=re.compile(r'(story|article|content|body|post|entry)', re.I))
-            for area in content_areas[:5]:  # Check first 5 matching divs
-                paragraphs = area.find_all('p')
-                for p in paragraphs:
-                    text = p.get_text(strip=True)
-                    if len(text) > 40 and text not in [a for a in article_body]:
-                        article_body.append(text)
-        
-        # Strategy 3: If still no content, get ALL paragraphs
-        if len(article_body) < 3:
-            all_paragraphs = soup.find_all('p')
-            for p in all_paragraphs:
-                text = p.get_text(strip=True)
-                # Filter out navigation, footer, header text
-                if (len(text) > 40 and 
-                    text not in [a for a in article_body] and
-                    not any(skip in text.lower() for skip in ['cookie', 'subscribe', 'newsletter', 'follow us', 'share this'])):
-                    article_body.append(text)
-        
-        # Strategy 4: If still empty, try getting text from specific tags
-        if len(article_body) < 2:
-            # Look for story/article specific containers
-            for tag in ['div', 'section', 'main']:
-                containers = soup.find_all(tag, attrs={'id': re.compile(r'(story|article|content|main)', re.I)})
-                for container in containers:
-                    text = container.get_text(separator=' ', strip=True)
-                    if len(text) > 200:
-                        # Split into sentences
-                        sentences = re.split(r'[.!?]\s+', text)
-                        article_body.extend([s.strip() + '.' for s in sentences if len(s.strip()) > 40][:10])
-                        break
-                if article_body:
-                    break
-        
         # Get full content (first 20 paragraphs for better context)
+        article_body = page['paragraphs']
         content = ' '.join(article_body[:20])
         
         # If still no content, use description as fallback
         if not content and description:
             content = description
         
-        logger.info(f"INFO: Extracted {len(article_body)} paragraphs, {len(content.split())} words")
+        logger.info(f"INFO: Extracted {len(article_body)} paragraphs via {page['method']}, {len(content.split())} words")
         
         # Extract main topic/subject from title and content
-        main_topic = _extract_main_topic(title, description or content[:500])
-        
-        # Extract keywords/tags
-        keywords = []
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'}) or soup.find('meta', attrs={'property': 'article:tag'})
-        if meta_keywords:
-            keywords = [k.strip() for k in meta_keywords.get('content', '').split(',')]
-        
-        # Extract author
-        author = None
-        meta_author = soup.find('meta', attrs={'name': 'author'}) or soup.find('meta', attrs={'property': 'article:author'})
-        if meta_author:
-            author = meta_author.get('content', '')
+        main_topic = _extract_main_topic(title or '', description or content[:500])
         
         word_count = len(content.split())
         
         # Log extraction results
         if word_count > 0:
-            logger.info(f"SUCCESS: Extracted article: '{title[:60]}...' from {source} ({word_count} words)")
+            logger.info(f"SUCCESS: Extracted article: '{(title or '')[:60]}...' from {source} ({word_count} words)")
         else:
             logger.warning(f"WARNING: Low content extracted from {source}: Only {word_count} words - using description as fallback")
             # Use description as content if article body extraction failed
@@ -149,16 +104,20 @@ def extract_article_content(url: str) -> Dict[str, Any]:
         
         return {
             'url': url,
+            # Publisher's canonical address (lets AMP/mobile/tracking variants share cached results)
+            'canonical_url': page['canonical_url'] or None,
             'title': title or 'No title found',
             'description': description or content[:500],
             'source': source or 'Unknown Source',
-            'author': author,
-            'published_date': published_date or datetime.utcnow().isoformat(),
+            'author': page['author'] or None,
+            'published_date': page['published_date'] or datetime.utcnow().isoformat(),
             'content': content,
-            'keywords': keywords,
+            'keywords': page['keywords'],
+            'image': page['image'],
             'main_topic': main_topic,
             'word_count': word_count,
             'success': True,
+            'extraction_method': page['method'],
             'extraction_quality': 'good' if word_count > 200 else 'moderate' if word_count > 50 else 'limited'
         }
         
@@ -235,14 +194,11 @@ Provide analysis in this JSON format:
 
 Keep it simple, factual, and easy to understand."""
 
-        headers = {
-            "Authorization": f"Bearer {ai_api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-                "model": "qwen/qwen3-coder-480b-a35b-instruct",
-            "messages": [
+        logger.info("AI: Calling AI for article analysis...")
+        
+        # Extended timeout (5 minutes for thorough article analysis); retries live in the gateway
+        content = await llm_gateway.chat_completion(
+            [
                 {
                     "role": "system",
                     "content": "You are a helpful news analyst who explains news stories in simple, clear language. Focus on facts: what happened, why it matters, and what comes next."
@@ -252,65 +208,26 @@ Keep it simple, factual, and easy to understand."""
                     "content": prompt
                 }
             ],
-            "temperature": 0.3,
-            "top_p": 0.9,
-            "max_tokens": 1200  # Reduced to speed up response
-        }
-
-        logger.info("AI: Calling AI for article analysis...")
-        
-        # Extended timeout and retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                timeout_seconds = 300  # 5 minutes for thorough article analysis
-                logger.info(f"AI: Attempt {attempt + 1}/{max_retries} (timeout: {timeout_seconds}s)")
-                
-                response = requests.post(
-                    "https://integrate.api.nvidia.com/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=timeout_seconds
-                )
-                response.raise_for_status()
-                logger.info("AI: Article analysis completed successfully!")
-                break  # Success, exit retry loop
-                
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 10
-                    logger.warning(f"AI: Timeout on attempt {attempt + 1}/{max_retries}, waiting {wait_time}s before retry...")
-                    import time
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"AI: All {max_retries} attempts timed out - analysis taking longer than expected")
-                    raise
-            except requests.exceptions.RequestException as e:
-                logger.error(f"AI: Request error on attempt {attempt + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    import time
-                    time.sleep(5)
-                else:
-                    raise
-
-        ai_response = response.json()
-        content = ai_response["choices"][0]["message"]["content"]
+            endpoint="url-narrative",
+            validate=llm_gateway.extract_json,
+            temperature=0.3,
+            top_p=0.9,
+            max_tokens=1200,  # Reduced to speed up response
+            timeout=300,
+            max_attempts=3,
+        )
+        logger.info("AI: Article analysis completed successfully!")
 
-        # Parse JSON from response
-        json_match = re.search(r'\{[\s\S]*\}', content)
-        if json_match:
-            analysis = json.loads(json_match.group(0))
-            logger.info("SUCCESS: AI article analysis complete")
-            return analysis
-        else:
-            return json.loads(content)
+        analysis = llm_gateway.extract_json(content)
+        logger.info("SUCCESS: AI article analysis complete")
+        return analysis
             
     except Exception as e:
         logger.error(f"AI analysis failed: {str(e)}")
         return {}
 
 
-def find_related_articles(original_article: Dict[str, Any], days: int = 14, serp_api_key: str = None) -> List[Dict[str, Any]]:
+async def find_related_articles(original_article: Dict[str, Any], days: int = 14, serp_api_key: str = None) -> List[Dict[str, Any]]:
     """Find related articles about the same story using SERP API (Google News search)."""
     try:
         # Extract key terms from title
@@ -336,7 +253,7 @@ def find_related_articles(original_article: Dict[str, Any], days: int = 14, serp
                     "hl": "en"
                 }
                 
-                response = requests.get(serp_url, params=params, timeout=20)
+                response = await provider_cache.get("serp", serp_url, params=params, timeout=20)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -377,7 +294,7 @@ def find_related_articles(original_article: Dict[str, Any], days: int = 14, serp
                 "to": end_date.strftime("%Y-%m-%d")
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = await provider_cache.get("newsapi", url, params=params, timeout=15)
             
             # Check for NewsAPI errors
             if response.status_code == 401:
@@ -435,11 +352,9 @@ def analyze_timeline(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         articles_on_date = timeline_data[date]
         
         # Detect sentiment (simplified)
-        negative_keywords = ['crisis', 'scandal', 'controversy', 'issue', 'problem', 'concern', 'critical']
-        positive_keywords = ['success', 'achievement', 'growth', 'progress', 'improve', 'win', 'victory']
-        
-        neg_count = sum(1 for a in articles_on_date if any(k in a.get('title', '').lower() for k in negative_keywords))
-        pos_count = sum(1 for a in articles_on_date if any(k in a.get('title', '').lower() for k in positive_keywords))
+        scans = [NARRATIVE_LEXICON.scan(a.get('title', '') or '') for a in articles_on_date]
+        neg_count = sum(1 for scan in scans if scan.counts['timeline_negative'])
+        pos_count = sum(1 for scan in scans if scan.counts['timeline_positive'])
         
         if neg_count > pos_count:
             sentiment = "Negative"
@@ -458,8 +373,12 @@ def analyze_timeline(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return timeline
 
 
-def detect_manipulation(articles: List[Dict[str, Any]], timeline: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Enhanced detection of potential narrative manipulation indicators with deeper analysis."""
+def detect_manipulation(articles: List[Dict[str, Any]], timeline: List[Dict[str, Any]],
+                        headline_clusters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Enhanced detection of potential narrative manipulation indicators with deeper analysis.
+    `headline_clusters` is a precomputed headline_graph.build_graph(articles); built here when omitted.
+    """
     indicators = {
         'coordinated_timing': False,
         'source_clustering': False,
@@ -605,34 +524,24 @@ def detect_manipulation(articles: List[Dict[str, Any]], timeline: List[Dict[str,
             manipulation_score += 5
             indicators['explanation'].append(f"Statistical outlier detected in coverage pattern")
     
-    # 5. NEW: Language Uniformity Detection (headline similarity)
-    titles = [a.get('title', '').lower() for a in articles if a.get('title')]
-    if len(titles) >= 5:
+    # 5. Language Uniformity Detection (headline similarity graph; catches paraphrased copies too)
+    if headline_clusters is None:
+        headline_clusters = headline_graph.build_graph(articles)
+    indicators['headline_clusters'] = headline_clusters['clusters']
+    if len([a for a in articles if a.get('title')]) >= 5:
         max_possible_score += 15
-        
-        # Extract common phrases (3+ words)
-        common_phrases = []
-        for title in titles:
-            words = title.split()
-            for i in range(len(words) - 2):
-                phrase = ' '.join(words[i:i+3])
-                if len(phrase) > 15:  # Substantial phrase
-                    common_phrases.append(phrase)
-        
-        if common_phrases:
-            phrase_counts = Counter(common_phrases)
-            most_common_phrase, phrase_freq = phrase_counts.most_common(1)[0]
-            phrase_ratio = phrase_freq / len(titles)
-            
-            if phrase_ratio > 0.4:
-                indicators['language_uniformity'] = True
+        largest = next((c for c in headline_clusters['clusters'] if c['source_count'] > 1), None)
+        share = headline_clusters['largest_multi_source_share']
+        if largest and share > 0.25:
+            indicators['language_uniformity'] = True
+            example = largest['headlines'][0]
+            if share > 0.4:
                 manipulation_score += 15
-                indicators['explanation'].append(f"Identical language: '{most_common_phrase}' appears in {int(phrase_ratio*100)}% of headlines - copy-paste journalism")
+                indicators['explanation'].append(f"Near-identical headlines: {largest['size']} articles from {largest['source_count']} sources ({int(share*100)}% of coverage) say the same thing, e.g. '{example}' - copy-paste journalism")
                 indicators['suspicious_patterns'].append("Uniform language suggests single talking point source")
-            elif phrase_ratio > 0.25:
-                indicators['language_uniformity'] = True
+            else:
                 manipulation_score += 10
-                indicators['explanation'].append(f"Repeated phrasing: '{most_common_phrase}' in {int(phrase_ratio*100)}% of headlines")
+                indicators['explanation'].append(f"Repeated phrasing: {largest['size']} articles from {largest['source_count']} sources ({int(share*100)}% of coverage) share a headline, e.g. '{example}'")
                 indicators['suspicious_patterns'].append("Similar language patterns across sources")
     
     # Calculate confidence score (0-100)
@@ -716,25 +625,16 @@ def analyze_source_clustering(articles: List[Dict[str, Any]]) -> Dict[str, Any]:
     alarmist_sources = defaultdict(list)
     dismissive_sources = defaultdict(list)
     
-    # Expanded keyword sets for better detection
-    negative_keywords = ['crisis', 'scandal', 'controversy', 'issue', 'problem', 'concern', 'critical', 
-                         'failure', 'threat', 'danger', 'risk', 'alarming', 'troubling', 'devastating']
-    positive_keywords = ['success', 'achievement', 'growth', 'progress', 'improve', 'win', 'victory', 
-                         'breakthrough', 'triumph', 'advancement', 'innovation', 'excellence']
-    alarmist_keywords = ['urgent', 'crisis', 'emergency', 'catastrophe', 'disaster', 'shocking', 'alarming']
-    dismissive_keywords = ['overblown', 'exaggerated', 'myth', 'false alarm', 'nothing to see']
-    
     for article in articles:
         title = article.get('title', '') or ''
-        description = article.get('description', '') or ''
-        title_lower = (title + ' ' + description).lower()
         source = article.get('source', 'Unknown')
         
         # Count keyword matches for more accurate classification
-        neg_count = sum(1 for k in negative_keywords if k in title_lower)
-        pos_count = sum(1 for k in positive_keywords if k in title_lower)
-        alarm_count = sum(1 for k in alarmist_keywords if k in title_lower)
-        dismiss_count = sum(1 for k in dismissive_keywords if k in title_lower)
+        scan = NARRATIVE_LEXICON.scan(_headline_text(article))
+        neg_count = scan.distinct('cluster_negative')
+        pos_count = scan.distinct('cluster_positive')
+        alarm_count = scan.distinct('alarmist')
+        dismiss_count = scan.distinct('dismissive')
         
         # Classify based on dominant sentiment
         if alarm_count >= 2:
@@ -828,39 +728,15 @@ def analyze_sentiment_map(articles: List[Dict[str, Any]]) -> Dict[str, Any]:
         'sentiment_shifts': []
     }
     
-    # Expanded and weighted keyword sets
-    negative_keywords = {
-        'strong': ['crisis', 'scandal', 'disaster', 'catastrophe', 'devastating', 'alarming', 'shocking', 'outrage'],
-        'moderate': ['controversy', 'issue', 'problem', 'concern', 'critical', 'failure', 'threat', 'danger'],
-        'mild': ['question', 'doubt', 'challenge', 'difficulty', 'setback']
-    }
-    
-    positive_keywords = {
-        'strong': ['breakthrough', 'triumph', 'revolutionary', 'excellent', 'outstanding', 'phenomenal'],
-        'moderate': ['success', 'achievement', 'growth', 'progress', 'improve', 'win', 'victory'],
-        'mild': ['better', 'good', 'positive', 'forward', 'advance']
-    }
-    
     for article in articles:
         title = article.get('title', '') or ''
-        description = article.get('description', '') or ''
-        text_lower = (title + ' ' + description).lower().strip()
+        scan = NARRATIVE_LEXICON.scan(_headline_text(article))
         source = article.get('source', '') or 'Unknown'
         date = article.get('published_date', '')[:10] if article.get('published_date') else 'Unknown'
         
-        # Calculate sentiment with intensity scoring
-        neg_score = 0
-        pos_score = 0
-        
-        # Weight negative sentiment
-        neg_score += sum(3 for k in negative_keywords['strong'] if k in text_lower)
-        neg_score += sum(2 for k in negative_keywords['moderate'] if k in text_lower)
-        neg_score += sum(1 for k in negative_keywords['mild'] if k in text_lower)
-        
-        # Weight positive sentiment
-        pos_score += sum(3 for k in positive_keywords['strong'] if k in text_lower)
-        pos_score += sum(2 for k in positive_keywords['moderate'] if k in text_lower)
-        pos_score += sum(1 for k in positive_keywords['mild'] if k in text_lower)
+        # Calculate sentiment with intensity scoring (each distinct keyword counts once, weighted)
+        neg_score = sum(weight * scan.distinct(f'negative_{level}') for level, weight in SENTIMENT_WEIGHTS.items())
+        pos_score = sum(weight * scan.distinct(f'positive_{level}') for level, weight in SENTIMENT_WEIGHTS.items())
         
         # Determine sentiment category and intensity
         if neg_score > 0 and pos_score > 0:
@@ -1057,7 +933,10 @@ def _extract_related_topics(articles: List[Dict[str, Any]]) -> List[str]:
     return related_topics if related_topics else ["News", "Media", "Coverage"]
 
 
-async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, days: int = 14) -> Dict[str, Any]:
+async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, days: int = 14,
+                                enrich: bool = False, original_article: Optional[Dict[str, Any]] = None,
+                                ai_analysis: Optional[Dict[str, Any]] = None,
+                                include_inputs: bool = False) -> Dict[str, Any]:
     """
     Main function to perform comprehensive URL-based narrative analysis
     
@@ -1066,6 +945,10 @@ async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, da
         serp_api_key: SerpAPI key for finding related articles  
         ai_api_key: NVIDIA API key for AI analysis
         days: Number of days to look back for related articles
+        enrich: Fetch the full text of the top related articles before sentiment and clustering
+        original_article: Extraction to reuse instead of downloading the URL again
+        ai_analysis: AI insights to reuse instead of calling the LLM again (partial refresh)
+        include_inputs: Also return the full extraction and AI insights under "inputs" (for the result cache)
     
     Returns:
         Complete analysis including AI insights, timeline, manipulation detection, sentiment mapping, and source clustering
@@ -1073,44 +956,89 @@ async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, da
     try:
         logger.info(f"SEARCH: Starting comprehensive URL narrative analysis for: {url}")
         
-        # Step 1: Extract article content from URL
-        logger.info("FILE: Step 1: Extracting article content...")
-        original_article = extract_article_content(url)
-        
-        if not original_article.get("success") or not original_article.get("title"):
-            raise ValueError(f"Could not extract article content from URL: {original_article.get('error', 'Unknown error')}")
-        
-        logger.info(f"SUCCESS: Article extracted: '{original_article['title'][:60]}...' ({original_article.get('word_count', 0)} words)")
-        
-        # Step 2: AI Analysis of the original article
-        logger.info("AI: Step 2: Performing AI analysis of article content...")
-        ai_analysis = await analyze_article_with_ai(original_article, ai_api_key)
-        
-        # Step 3: Find related articles across different outlets
-        logger.info(f"FIND: Step 3: Searching for related articles (last {days} days)...")
-        related_articles = find_related_articles(original_article, days, serp_api_key)
-        logger.info(f"SUCCESS: Found {len(related_articles)} related articles")
-        
-        # Combine original with related articles
-        all_articles = [original_article] + related_articles
-        
-        # Step 4: Analyze timeline
-        logger.info("📅 Step 4: Analyzing coverage timeline...")
-        timeline = analyze_timeline(all_articles)
-        
-        # Step 5: Detect manipulation indicators
-        logger.info("SEARCH: Step 5: Detecting manipulation indicators...")
-        manipulation_indicators = detect_manipulation(all_articles, timeline)
-        
-        # Step 6: Analyze sentiment mapping
-        logger.info("😊 Step 6: Mapping sentiment across sources...")
-        sentiment_map = analyze_sentiment_map(all_articles)
-        
-        # Step 7: Analyze source clustering
-        logger.info("NEWS: Step 7: Analyzing source clusters and narrative angles...")
-        source_clustering = analyze_source_clustering(all_articles)
+        # Steps 1-7 as a dependency graph: the AI read of the article and the SERP search both
+        # only need the extraction, and the CPU analyses start as soon as related articles arrive,
+        # overlapping with the LLM wait
+        async def extract(_):
+            if original_article is not None:
+                logger.info("FILE: Step 1: Reusing extracted article content")
+                article = original_article
+            else:
+                logger.info("FILE: Step 1: Extracting article content...")
+                article = await extract_article_content(url)
+            # Checked for reused extractions too: a caller may hand over a failed one
+            if not article.get("success") or not article.get("title"):
+                raise ValueError(f"Could not extract article content from URL: {article.get('error', 'Unknown error')}")
+            if original_article is None:
+                logger.info(f"SUCCESS: Article extracted: '{article['title'][:60]}...' ({article.get('word_count', 0)} words)")
+            return article
+
+        async def ai_analysis_stage(r):
+            if ai_analysis:
+                logger.info("AI: Step 2: Reusing AI analysis of article content")
+                return ai_analysis
+            logger.info("AI: Step 2: Performing AI analysis of article content...")
+            return await analyze_article_with_ai(r["extract"], ai_api_key)
+
+        async def related_stage(r):
+            logger.info(f"FIND: Step 3: Searching for related articles (last {days} days)...")
+            found = await find_related_articles(r["extract"], days, serp_api_key)
+            logger.info(f"SUCCESS: Found {len(found)} related articles")
+            # Combine original with related articles
+            return [r["extract"]] + found
+
+        async def enrich_stage(r):
+            if not enrich:
+                return r["related"]
+            logger.info("FILE: Step 3b: Fetching full text of top related articles...")
+            # The original article is already full text; only the related ones are enriched
+            return r["related"][:1] + await article_enrichment.enrich_articles(
+                r["related"][1:], extract_article_content)
+
+        def timeline_stage(r):
+            logger.info("📅 Step 4: Analyzing coverage timeline...")
+            return analyze_timeline(r["related"])
+
+        def headline_graph_stage(r):
+            logger.info("SEARCH: Step 4b: Building headline similarity graph...")
+            return headline_graph.build_graph(r["related"])
+
+        def manipulation_stage(r):
+            logger.info("SEARCH: Step 5: Detecting manipulation indicators...")
+            return detect_manipulation(r["related"], r["timeline"], r["headline_graph"])
+
+        def sentiment_stage(r):
+            logger.info("😊 Step 6: Mapping sentiment across sources...")
+            return analyze_sentiment_map(r["enrich"])
+
+        def clustering_stage(r):
+            logger.info("NEWS: Step 7: Analyzing source clusters and narrative angles...")
+            return analyze_source_clustering(r["enrich"])
+
+        results, stage_timings = await stage_graph.run_stages([
+            Stage("extract", extract),
+            Stage("ai_analysis", ai_analysis_stage, deps=("extract",)),
+            Stage("related", related_stage, deps=("extract",)),
+            Stage("enrich", enrich_stage, deps=("related",)),
+            # Timeline and manipulation only use titles, sources and dates, so they do not wait for enrichment
+            Stage("timeline", timeline_stage, deps=("related",)),
+            Stage("headline_graph", headline_graph_stage, deps=("related",)),
+            Stage("manipulation", manipulation_stage, deps=("timeline", "headline_graph")),
+            Stage("sentiment", sentiment_stage, deps=("enrich",)),
+            Stage("clustering", clustering_stage, deps=("enrich",)),
+        ])
+
+        original_article = results["extract"]
+        ai_analysis = results["ai_analysis"]
+        all_articles = results["enrich"]
+        related_articles = all_articles[1:]
+        timeline = results["timeline"]
+        manipulation_indicators = results["manipulation"]
+        sentiment_map = results["sentiment"]
+        source_clustering = results["clustering"]
         
         # Step 8: Compile comprehensive analysis with clear explanations
+        compile_started = time.perf_counter()
         logger.info("STATS: Step 8: Compiling comprehensive analysis...")
         
         # Build clear narrative explanations
@@ -1165,6 +1093,7 @@ async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, da
             "coverageSummary": {
                 "totalArticles": len(all_articles),
                 "relatedArticles": len(related_articles),
+                "enrichedArticles": sum(1 for a in related_articles if a.get('enriched')),
                 "totalSources": source_clustering.get('total_sources', 0),
                 "timeframe": f"{days} days",
                 "description": coverage_description,
@@ -1260,14 +1189,22 @@ async def analyze_url_narrative(url: str, serp_api_key: str, ai_api_key: str, da
         # Step 9: Generate export data for researchers
         logger.info("📦 Step 9: Generating export data...")
         export_data = generate_export_data(analysis_result)
+        stage_timings["stages"]["compile"] = {
+            "start_ms": stage_timings["total_ms"],
+            "duration_ms": round((time.perf_counter() - compile_started) * 1000, 1),
+        }
         
         logger.info(f"SUCCESS: URL narrative analysis complete! {len(all_articles)} articles analyzed across {source_clustering.get('total_sources', 0)} sources")
         
-        return {
+        result = {
             "status": "success",
             "analysis": analysis_result,
-            "export": export_data
+            "export": export_data,
+            "stageTimings": stage_timings
         }
+        if include_inputs:
+            result["inputs"] = {"original_article": original_article, "ai_analysis": ai_analysis}
+        return result
         
     except Exception as e:
         import traceback